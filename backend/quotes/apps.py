@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class QuotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quotes'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import checks, instrumentation, signals  # noqa: F401
+        connection_created.connect(instrumentation.install)
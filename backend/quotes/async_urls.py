@@ -0,0 +1,17 @@
+"""
+Async read endpoints (quotes.views.async_reads), mounted in front of
+quotes.urls by takehome.asgi_urls. They share the DRF routes' names, so
+reverse() and the metrics' view labels are the same under ASGI.
+"""
+from django.urls import path
+
+from .views import async_reads
+
+urlpatterns = [
+    path('api/quotes/', async_reads.quote_list, name='quote-list'),
+    path('api/quotes/<int:pk>/', async_reads.quote_detail, name='quote-detail'),
+    path('api/logs/', async_reads.log_list, name='log-list'),
+    path('api/logs/by_quote/', async_reads.log_by_quote, name='log-by-quote'),
+    path('api/logs/by_action/', async_reads.log_by_action, name='log-by-action'),
+    path('api/user/', async_reads.user_info, name='user-info'),
+]
@@ -0,0 +1,179 @@
+"""
+Buffered, commit-aware writer for IntegrationLog entries.
+
+``audit.log(...)`` replaces inline ``IntegrationLog.objects.create`` calls.
+How an entry is written depends on the guarantee configured for its action
+in ``settings.AUDIT_LOG_GUARANTEES``:
+
+``transactional`` (default)
+    Inside ``transaction.atomic()`` entries are collected per transaction
+    (per savepoint) and written with a single ``bulk_create`` when it
+    commits; a rollback discards them. Outside a transaction they are
+    collected for the current request by ``AuditLogMiddleware`` and
+    written in one ``bulk_create`` when the response is ready.
+``immediate``
+    Written straight away, inside whatever transaction is open.
+``background``
+    Handed to a background thread after commit and written in batches.
+    Best effort: entries still queued when the process dies are lost.
+"""
+import atexit
+import contextvars
+import queue
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from . import list_cache, stats
+from .models import IntegrationLog
+
+TRANSACTIONAL = 'transactional'
+IMMEDIATE = 'immediate'
+BACKGROUND = 'background'
+
+_request_buffer = contextvars.ContextVar('audit_request_buffer', default=None)
+_local = threading.local()
+
+
+def guarantee_for(action):
+    return settings.AUDIT_LOG_GUARANTEES.get(action, settings.AUDIT_LOG_DEFAULT_GUARANTEE)
+
+
+def log(user, quote, action, status, payload, response=None):
+    """Record an integration log entry; returns the (possibly not yet saved) IntegrationLog."""
+    entry = IntegrationLog(user=user, quote=quote, action=action, status=status, payload=payload, response=response)
+    guarantee = guarantee_for(action)
+    if guarantee == BACKGROUND:
+        transaction.on_commit(lambda: _background_writer.put(entry))
+        return entry
+    buffer = None if guarantee == IMMEDIATE else _current_buffer()
+    if buffer is None:
+        entry.save()
+    else:
+        buffer.append(entry)
+    return entry
+
+
+def _write(entries):
+    with transaction.atomic():
+        IntegrationLog.objects.bulk_create(entries)
+        stats.record_logs(entries)
+        list_cache.invalidate_logs({entry.user_id for entry in entries})
+
+
+@contextmanager
+def request_scope():
+    """Collect entries logged outside a transaction and write them in one bulk_create on exit."""
+    entries = []
+    token = _request_buffer.set(entries)
+    try:
+        yield entries
+    finally:
+        _request_buffer.reset(token)
+        if entries:
+            _write(entries)
+
+
+@asynccontextmanager
+async def arequest_scope():
+    """``request_scope`` for async requests."""
+    entries = []
+    token = _request_buffer.set(entries)
+    try:
+        yield entries
+    finally:
+        _request_buffer.reset(token)
+        if entries:
+            await sync_to_async(_write)(entries)
+
+
+class _TransactionBuffer:
+    def __init__(self, connection, key):
+        self.connection = connection
+        self.key = key
+        self.entries = []
+
+    def flush(self):
+        _transaction_buffers().pop(self.key, None)
+        if self.entries:
+            _write(self.entries)
+
+    def is_pending(self):
+        # Django drops on_commit callbacks of rolled-back (savepoint) blocks.
+        return any(func == self.flush for _, func, _ in self.connection.run_on_commit)
+
+
+def _transaction_buffers():
+    if not hasattr(_local, 'buffers'):
+        _local.buffers = {}
+    return _local.buffers
+
+
+def _current_buffer():
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return _request_buffer.get()
+
+    buffers = _transaction_buffers()
+    for key, stale in list(buffers.items()):
+        if not stale.is_pending():
+            del buffers[key]
+    key = tuple(connection.savepoint_ids)
+    buffer = buffers.get(key)
+    if buffer is None:
+        buffer = buffers[key] = _TransactionBuffer(connection, key)
+        transaction.on_commit(buffer.flush)
+    return buffer.entries
+
+
+class _BackgroundWriter:
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, entry):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+                self._thread.start()
+        self.queue.put(entry)
+
+    def _run(self):
+        while True:
+            entries = [self.queue.get()]
+            deadline = time.monotonic() + settings.AUDIT_LOG_BACKGROUND_INTERVAL_SECONDS
+            while len(entries) < settings.AUDIT_LOG_BACKGROUND_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entries.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            close_old_connections()
+            _write(entries)
+
+    def _drain(self, limit):
+        entries = []
+        while len(entries) < limit:
+            try:
+                entries.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return entries
+
+    def flush(self):
+        """Write whatever is queued from the calling thread (used at exit and in tests)."""
+        entries = self._drain(float('inf'))
+        if entries:
+            _write(entries)
+
+
+_background_writer = _BackgroundWriter()
+flush_background = _background_writer.flush
+atexit.register(flush_background)
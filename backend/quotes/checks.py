@@ -0,0 +1,40 @@
+"""
+System checks (``python manage.py check``, also run by ``migrate``) for
+caches that must be shared by every worker process.
+
+A LocMemCache lives in one process. For the "lists" cache that means a
+generation bump only reaches the worker that made the write, and the
+others serve stale lists (and 304s) until the entry times out. For the
+"auth" cache a logout, a deactivation or a revoked staff flag is only seen
+by the worker that made it until the entry times out. For the "throttle"
+cache every worker keeps its own token buckets, which multiplies the login
+and registration limits by the number of workers. All of this is fine for
+``runserver``, so the check only fails with DEBUG off.
+"""
+from django.conf import settings
+from django.core import checks
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+    shared = [
+        (settings.LIST_CACHE_ALIAS, 'quotes.E003', 'other workers keep serving lists a write invalidated',
+         'LIST_CACHE_BACKEND'),
+        (settings.AUTH_CACHE_ALIAS, 'quotes.E001', 'logouts and user changes do not reach the other workers',
+         'AUTH_CACHE_BACKEND'),
+        (settings.THROTTLE_CACHE_ALIAS, 'quotes.E002', 'every worker keeps its own login and registration limits',
+         'THROTTLE_CACHE_BACKEND'),
+    ]
+    return [
+        checks.Error(
+            f'The {alias} cache is a LocMemCache, so {consequence}.',
+            hint=f'Set {setting} to a FileBasedCache or a Redis cache.',
+            id=check_id,
+        )
+        for alias, check_id, consequence, setting in shared
+        if settings.CACHES[alias]['BACKEND'] == LOCMEM_BACKEND
+    ]
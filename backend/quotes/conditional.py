@@ -0,0 +1,87 @@
+"""
+ETag / Last-Modified validators for read endpoints.
+
+Collections are validated with one aggregate query over the visible
+queryset (newest modification time, highest id, row count), so an
+unchanged collection is answered with 304 before anything is serialized.
+They get an ETag but no Last-Modified: deleting a row does not move the
+newest modification time, so If-Modified-Since would answer 304 with a
+stale list.
+
+Objects with a ``version`` column (Quote) are tagged by their version, so
+a write endpoint can check an ``If-Match`` header against the row it is
+about to update (``precondition_failed``).
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def _etag(request, *parts, location=None):
+    # The URL is part of the tag: pages, filters and absolute file URLs all depend on it.
+    key = '|'.join(str(part) for part in (request.build_absolute_uri(location), *parts))
+    return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+
+def _collection_aggregates(modified_field):
+    return {'last_modified': Max(modified_field), 'last_id': Max('id'), 'count': Count('id')}
+
+
+def _collection_validators(request, stats):
+    last_modified = stats['last_modified']
+    return _etag(request, last_modified and last_modified.isoformat(), stats['last_id'], stats['count']), None
+
+
+def collection_validators(request, queryset, modified_field):
+    """Return (etag, last_modified) for ``queryset`` using a single aggregate query."""
+    return _collection_validators(request, queryset.order_by().aggregate(**_collection_aggregates(modified_field)))
+
+
+async def acollection_validators(request, queryset, modified_field):
+    """``collection_validators`` for async views."""
+    return _collection_validators(
+        request, await queryset.order_by().aaggregate(**_collection_aggregates(modified_field))
+    )
+
+
+def object_validators(request, obj, modified_field, location=None):
+    """(etag, last_modified) for ``obj`` as served at ``location`` (default: the request's own URL)."""
+    last_modified = getattr(obj, modified_field)
+    revision = getattr(obj, 'version', None) or last_modified.isoformat()
+    return _etag(request, obj.pk, revision, location=location), last_modified
+
+
+def not_modified(request, validators):
+    """The 304 (or 412) response the request's If-None-Match / If-Modified-Since call for, or None."""
+    etag, last_modified = validators
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def precondition_failed(request, validators):
+    """True when the request's If-Match / If-Unmodified-Since do not hold for ``validators``."""
+    response = not_modified(request, validators)
+    return response is not None and response.status_code == 412
+
+
+def set_validators(response, validators):
+    etag, last_modified = validators
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+    return response
+
+
+def conditional_response(request, validators, render):
+    """
+    Answer with 304 when the request's If-None-Match / If-Modified-Since
+    still match ``validators``; otherwise call ``render()``. Either way the
+    response carries the ETag and Last-Modified headers.
+    """
+    response = not_modified(request, validators)
+    if response is None:
+        response = render()
+    return set_validators(response, validators)
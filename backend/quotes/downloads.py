@@ -0,0 +1,156 @@
+"""
+Permission-checked downloads of quote documents.
+
+Blob names carry the content hash (see quotes.storage), so it doubles as
+a strong ETag. Range requests are answered with 206 for a single byte
+range; multiple ranges are ignored and the whole file is sent, which
+HTTP allows. With ``settings.DOCUMENT_SENDFILE`` set, only the headers
+are produced here and the front proxy sends the bytes:
+
+- ``x-accel-redirect`` (nginx): the file is served from the internal
+  location ``DOCUMENT_ACCEL_PREFIX`` + storage name.
+- ``x-sendfile`` (Apache mod_xsendfile, lighttpd): the absolute path.
+
+The proxy handles Range and If-Range itself in that mode.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote as urlquote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .storage import BLOB_PREFIX, document_storage
+
+READ_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOB_NAME_RE = re.compile(rf'^{BLOB_PREFIX}/[0-9a-f]{{2}}/([0-9a-f]{{64}})\.\w+$')
+
+
+def document_url(request, quote_id):
+    url = reverse('quote-document', args=[quote_id])
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def download_filename(quote, name):
+    return f'quote-{quote.pk}-document{os.path.splitext(name)[1].lower()}'
+
+
+def validators(storage, name):
+    """(etag, last-modified timestamp, size) of a stored document. Raises FileNotFoundError."""
+    stat = os.stat(storage.path(name))
+    match = BLOB_NAME_RE.match(name)
+    # Files stored before content addressing have no digest in their name.
+    tag = match.group(1) if match else f'{name}:{stat.st_size}:{stat.st_mtime_ns}'
+    return quote_etag(tag), int(stat.st_mtime), stat.st_size
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) inclusive for a single satisfiable byte range, or
+    None to send the whole file. Raises ValueError for an unsatisfiable one.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None:
+        # Malformed or multiple ranges: ignored.
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _if_range_matches(request, etag, timestamp):
+    value = request.headers.get('If-Range')
+    if value is None:
+        return True
+    if value.startswith(('"', 'W/')):
+        # Weak tags never match If-Range.
+        return value == etag
+    return parse_http_date_safe(value) == timestamp
+
+
+def _read(file, start, length):
+    try:
+        file.seek(start)
+        while length:
+            data = file.read(min(READ_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        file.close()
+
+
+def _headers(response, etag, timestamp, filename):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(timestamp)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = 'private, no-cache'
+    response['Content-Disposition'] = f"attachment; filename*=UTF-8''{urlquote(filename)}"
+    return response
+
+
+def _sendfile(storage, name, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.DOCUMENT_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = urlquote(settings.DOCUMENT_ACCEL_PREFIX.rstrip('/') + '/' + name)
+    else:
+        response['X-Sendfile'] = storage.path(name)
+    return response
+
+
+def serve_document(request, quote):
+    """Build the download response for ``quote``'s document. Raises Http404 if it has none."""
+    name = quote.supporting_document.name
+    if not name:
+        raise Http404('This quote has no supporting document.')
+    storage = document_storage()
+    try:
+        etag, timestamp, size = validators(storage, name)
+    except FileNotFoundError:
+        raise Http404('The supporting document is missing from storage.')
+
+    filename = download_filename(quote, name)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        return _headers(response, etag, timestamp, filename)
+    if settings.DOCUMENT_SENDFILE:
+        return _headers(_sendfile(storage, name, content_type), etag, timestamp, filename)
+
+    byte_range = None
+    if request.headers.get('Range') and _if_range_matches(request, etag, timestamp):
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return _headers(response, etag, timestamp, filename)
+
+    if byte_range is None:
+        # FileResponse hands the file to the server's wsgi.file_wrapper (sendfile(2) under gunicorn).
+        response = FileResponse(storage.open(name, 'rb'), content_type=content_type)
+        return _headers(response, etag, timestamp, filename)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_read(storage.open(name, 'rb'), start, length), status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    return _headers(response, etag, timestamp, filename)
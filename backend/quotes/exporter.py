@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .rows import log_shaper, log_values, quote_shaper, quote_values
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def parse_bound(value, end=False):
+    """
+    Parse a ``since``/``until`` query value (ISO date or datetime) into an
+    aware datetime. A bare date used as an ``end`` bound covers that whole
+    day. Raises ValueError when the value cannot be parsed.
+    """
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        if end:
+            day += timedelta(days=1)
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_bounds(query_params):
+    """Read ``since``/``until`` from the query string. Raises ValueError with a client-facing message."""
+    try:
+        return parse_bound(query_params.get('since')), parse_bound(query_params.get('until'), end=True)
+    except ValueError as e:
+        raise ValueError(f'Invalid date: {e}. Use YYYY-MM-DD or an ISO 8601 datetime.')
+
+
+def filter_created_at(queryset, since, until):
+    """Keep rows with since <= created_at < until; either bound may be None."""
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+    return queryset
+
+
+def log_rows(queryset, chunk_size):
+    """Yield log rows shaped like IntegrationLogSerializer output, reading ``chunk_size`` rows at a time."""
+    shape = log_shaper()
+    for row in log_values(queryset).iterator(chunk_size=chunk_size):
+        yield shape(row)
+
+
+def quote_rows(queryset, chunk_size, request):
+    """Yield quote rows shaped like QuoteSerializer output, reading ``chunk_size`` rows at a time."""
+    shape = quote_shaper(request)
+    for row in quote_values(queryset).iterator(chunk_size=chunk_size):
+        yield shape(row)
+
+
+def encode_ndjson(rows, fields, batch_size):
+    # One encoder for the whole export; json.dumps(cls=...) would build one per row.
+    encode = DjangoJSONEncoder().encode
+    batch = []
+    for row in rows:
+        batch.append(encode(row))
+        if len(batch) >= batch_size:
+            yield '\n'.join(batch) + '\n'
+            batch = []
+    if batch:
+        yield '\n'.join(batch) + '\n'
+
+
+def encode_csv(rows, fields, batch_size):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow({
+            key: json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (dict, list)) else value
+            for key, value in row.items()
+        })
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+ENCODERS = {
+    'ndjson': encode_ndjson,
+    'csv': encode_csv,
+}
+
+
+def streaming_export(rows, fields, fmt, filename, batch_size):
+    response = StreamingHttpResponse(ENCODERS[fmt](rows, fields, batch_size), content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
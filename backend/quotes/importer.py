@@ -0,0 +1,118 @@
+import csv
+import json
+
+from django.db import transaction
+
+from . import list_cache, stats
+from .models import IntegrationLog, Quote
+from .serializers import QuoteSerializer
+
+IMPORT_FIELDS = ['opportunity_id', 'customer_name', 'customer_email', 'customer_company']
+MAX_REPORTED_REJECTIONS = 1000
+
+FORMATS = {
+    'csv': 'csv',
+    'text/csv': 'csv',
+    'ndjson': 'ndjson',
+    'jsonl': 'ndjson',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+
+def detect_format(value):
+    """Map a content type or file extension to 'csv'/'ndjson', or None."""
+    if not value:
+        return None
+    return FORMATS.get(value.split(';')[0].strip().lower())
+
+
+class UndecodableLine(ValueError):
+    def __init__(self, line_number):
+        super().__init__(f'Line {line_number} is not valid UTF-8.')
+        self.line_number = line_number
+
+
+def decode_lines(byte_lines):
+    """Decode raw byte lines as UTF-8 (dropping a leading BOM), raising UndecodableLine with the line number."""
+    for line_number, line in enumerate(byte_lines, start=1):
+        try:
+            # A newline byte never occurs inside a multi-byte UTF-8 sequence, so each line decodes on its own.
+            yield line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            raise UndecodableLine(line_number) from None
+
+
+def iter_rows(byte_lines, fmt):
+    """Yield (line_number, row) pairs from an iterable of raw byte lines, one row at a time."""
+    lines = decode_lines(byte_lines)
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row
+
+
+def import_quotes(byte_lines, fmt, user, chunk_size):
+    """
+    Validate each row with QuoteSerializer and insert valid quotes, with
+    their CREATE logs, in ``chunk_size`` batches. Only the current chunk is
+    held in memory. Returns a report of imported and rejected rows.
+
+    A line that is not UTF-8 stops the import: the rows before it are kept
+    and the report gets an ``error`` and the ``line``.
+    """
+    report = {'imported': 0, 'rejected_count': 0, 'rejected': []}
+    chunk = []
+    try:
+        for line_number, row in iter_rows(byte_lines, fmt):
+            if not isinstance(row, dict):
+                _reject(report, line_number, {'non_field_errors': ['Row is not a valid object.']})
+                continue
+            serializer = QuoteSerializer(data={field: row.get(field) or '' for field in IMPORT_FIELDS})
+            if not serializer.is_valid():
+                _reject(report, line_number, serializer.errors)
+                continue
+            chunk.append((line_number, Quote(submitted_by=user, **serializer.validated_data)))
+            if len(chunk) >= chunk_size:
+                _flush(chunk, user, report)
+                chunk = []
+    except UndecodableLine as e:
+        report = {'error': f'{e} The import stopped there.', 'line': e.line_number, **report}
+    if chunk:
+        _flush(chunk, user, report)
+    return report
+
+
+def _reject(report, line_number, errors):
+    report['rejected_count'] += 1
+    if len(report['rejected']) < MAX_REPORTED_REJECTIONS:
+        report['rejected'].append({'line': line_number, 'errors': errors})
+
+
+def _flush(chunk, user, report):
+    with transaction.atomic():
+        quotes = Quote.objects.bulk_create([quote for _, quote in chunk])
+        IntegrationLog.objects.bulk_create(
+            IntegrationLog(
+                user=user,
+                quote=quote,
+                action='CREATE',
+                status=quote.status,
+                payload={field: getattr(quote, field) for field in IMPORT_FIELDS} | {'line': line_number},
+                response={'message': 'Quote imported successfully'}
+            )
+            for (line_number, _), quote in zip(chunk, quotes)
+        )
+        stats.record_quotes_created(quotes)
+        list_cache.invalidate_quotes([user.id])
+        list_cache.invalidate_logs([user.id])
+    report['imported'] += len(quotes)
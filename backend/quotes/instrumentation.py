@@ -0,0 +1,87 @@
+"""
+Per-request profiling: SQL, serializer and integration time.
+
+Every connection gets a pass-through execute wrapper when it is opened.
+``profile()`` makes it count and time queries, and makes ``timed(name)``
+blocks add to the request's totals. The profile lives in a context
+variable, which ``sync_to_async`` carries into its worker threads, so
+async views are profiled too. Outside ``profile()`` all of this is a
+no-op.
+
+Nested ``timed`` blocks of the same name count once: a serializer that
+renders a nested serializer is timed from the outermost call. Queries a
+serializer triggers count both as ``db`` and as ``serialize`` time.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+_profile = contextvars.ContextVar('instrumentation_profile', default=None)
+
+DB = 'db'
+SERIALIZE = 'serialize'
+INTEGRATION = 'integration'
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.durations = {DB: 0.0, SERIALIZE: 0.0, INTEGRATION: 0.0}
+        self._depth = {}
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def _execute(execute, sql, params, many, context):
+    current = _profile.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current.queries += 1
+        current.durations[DB] += time.perf_counter() - started
+
+
+def install(sender, connection, **kwargs):
+    """``connection_created`` receiver."""
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _execute)
+
+
+@contextmanager
+def profile():
+    current = RequestProfile()
+    token = _profile.set(current)
+    try:
+        yield current
+    finally:
+        _profile.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to the current profile's ``name`` total."""
+    current = _profile.get()
+    if current is None or current._depth.get(name):
+        yield
+        return
+    current._depth[name] = 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.durations[name] = current.durations.get(name, 0.0) + time.perf_counter() - started
+        current._depth[name] = 0
+
+
+class TimedSerializerMixin:
+    """Times ``to_representation`` as serializer time in the request profile."""
+
+    def to_representation(self, instance):
+        with timed(SERIALIZE):
+            return super().to_representation(instance)
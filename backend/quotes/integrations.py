@@ -0,0 +1,196 @@
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import instrumentation
+
+
+class IntegrationError(Exception):
+    def __init__(self, message, state=None):
+        super().__init__(message)
+        self.state = state or {}
+
+
+class NotSentError(IntegrationError):
+    """The call was refused before anything was sent; ``retry_after`` is when it may be worth retrying."""
+
+    def __init__(self, message, state=None, retry_after=0):
+        super().__init__(message, state)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(NotSentError):
+    pass
+
+
+class BulkheadFullError(NotSentError):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self._opened_at = None
+        # The thread making the half-open trial call, if one is in flight.
+        self._trial_thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Closed lets everything through; half-open lets a single trial call through."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._trial_thread is None:
+                self._trial_thread = threading.get_ident()
+                return True
+            return False
+
+    def retry_after(self):
+        """Seconds until an open circuit lets a trial call through."""
+        if self._opened_at is None:
+            return 0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def release(self):
+        """End the calling thread's trial if it finished without recording an outcome, so another can run."""
+        with self._lock:
+            if self._trial_thread == threading.get_ident():
+                self._trial_thread = None
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self._opened_at = None
+            self._trial_thread = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._trial_thread is not None or self.consecutive_failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_thread = None
+
+
+class IntegrationClient:
+    """
+    Outbound JSON client for one integration. Keeps a keep-alive connection
+    pool per host, applies connect/read deadlines, fails fast while the
+    circuit is open and rejects calls beyond ``max_in_flight``. With an
+    ``api_token`` (quotes.tokens) every call sends ``Authorization: Token``.
+    """
+
+    def __init__(self, name, connect_timeout, read_timeout, pool_size, max_in_flight,
+                 failure_threshold, reset_timeout, api_token=''):
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._bulkhead = threading.BoundedSemaphore(max_in_flight)
+        self._in_flight_lock = threading.Lock()
+        self.adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        if api_token:
+            self.session.headers['Authorization'] = f'Token {api_token}'
+
+    def state(self):
+        pools = self.adapter.poolmanager.pools
+        return {
+            'integration': self.name,
+            'circuit': self.breaker.state,
+            'consecutive_failures': self.breaker.consecutive_failures,
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight,
+            'pool_maxsize': self.pool_size,
+            'connections_opened': sum(pools[key].num_connections for key in pools.keys()),
+        }
+
+    def post(self, url, json=None):
+        """POST ``json`` to ``url`` and return the decoded JSON body, or raise IntegrationError."""
+        if not self._bulkhead.acquire(blocking=False):
+            raise BulkheadFullError(f'{self.name}: too many calls in flight', self.state())
+        try:
+            if not self.breaker.allow():
+                raise CircuitOpenError(
+                    f'{self.name}: circuit open, failing fast', self.state(), retry_after=self.breaker.retry_after()
+                )
+            with self._in_flight_lock:
+                self.in_flight += 1
+            try:
+                with instrumentation.timed(instrumentation.INTEGRATION):
+                    return self._send(url, json)
+            finally:
+                # _send records the outcome of every call it expects; an unexpected error must not keep the trial.
+                self.breaker.release()
+                with self._in_flight_lock:
+                    self.in_flight -= 1
+        finally:
+            self._bulkhead.release()
+
+    def _send(self, url, json):
+        try:
+            response = self.session.post(url, json=json, timeout=self.timeout)
+            response.raise_for_status()
+            result = response.json()
+        except requests.exceptions.HTTPError as e:
+            # A 4xx means the remote is up and rejected this request; only 5xx counts against the circuit.
+            if e.response is not None and e.response.status_code < 500:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise IntegrationError(str(e), self.state()) from e
+        except requests.exceptions.RequestException as e:
+            self.breaker.record_failure()
+            raise IntegrationError(str(e), self.state()) from e
+        self.breaker.record_success()
+        return result
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """Return the process-wide client for ``name`` (a key of settings.INTEGRATION_CLIENTS)."""
+    with _clients_lock:
+        if name not in _clients:
+            config = settings.INTEGRATION_CLIENTS[name]
+            _clients[name] = IntegrationClient(
+                name,
+                connect_timeout=config['CONNECT_TIMEOUT_SECONDS'],
+                read_timeout=config['READ_TIMEOUT_SECONDS'],
+                pool_size=config['POOL_SIZE'],
+                max_in_flight=config['MAX_IN_FLIGHT'],
+                failure_threshold=config['FAILURE_THRESHOLD'],
+                reset_timeout=config['RESET_TIMEOUT_SECONDS'],
+                api_token=config['API_TOKEN'],
+            )
+        return _clients[name]
+
+
+def reset_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            client.session.close()
+        _clients.clear()
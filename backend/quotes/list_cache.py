@@ -0,0 +1,147 @@
+"""
+Cache for the quote and log list responses.
+
+Entries live in the ``settings.LIST_CACHE_ALIAS`` cache (a FileBasedCache
+shared by the workers of the host by default, bounded by MAX_ENTRIES).
+Each entry stores the page data together with its ETag/Last-Modified
+validators, so a hit costs no queries at all. The generations must be
+shared too: a per-process cache would keep serving a list another worker
+invalidated until the entry times out (``quotes.checks`` rejects that with
+DEBUG off).
+
+Keys carry a generation per scope: ``quotes``/``logs`` for one user, plus
+a staff-wide scope that admins share. Writes bump the generations of the
+owner's and the staff scope once the transaction commits, which orphans
+the old entries; culling or the timeout reclaims them.
+"""
+import hashlib
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .conditional import conditional_response, not_modified, set_validators
+from .renderers import json_response
+
+QUOTES = 'quotes'
+LOGS = 'logs'
+STAFF = 'staff'
+
+
+def _cache():
+    return caches[settings.LIST_CACHE_ALIAS]
+
+
+def _generation_key(namespace, scope):
+    return f'list-cache:gen:{namespace}:{scope}'
+
+
+def _generation(namespace, scope):
+    key = _generation_key(namespace, scope)
+    cache = _cache()
+    # A fresh random value rather than 0: an evicted counter must never bring back old entries.
+    cache.add(key, uuid.uuid4().hex, timeout=None)
+    return cache.get(key)
+
+
+def _scope(user):
+    return STAFF if user.is_staff else user.pk
+
+
+def cache_key(request, namespace):
+    scope = _scope(request.user)
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f'list-cache:{namespace}:{scope}:{_generation(namespace, scope)}:{url}'
+
+
+def invalidate(namespace, user_ids):
+    """After commit, drop cached lists of ``namespace`` for these users and for staff."""
+    scopes = {STAFF, *(user_id for user_id in user_ids if user_id is not None)}
+
+    def bump():
+        cache = _cache()
+        cache.set_many({_generation_key(namespace, scope): uuid.uuid4().hex for scope in scopes}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_quotes(user_ids):
+    invalidate(QUOTES, user_ids)
+
+
+def invalidate_logs(user_ids):
+    invalidate(LOGS, user_ids)
+
+
+def _count(name):
+    cache = _cache()
+    key = f'list-cache:{name}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); counters are best effort.
+        pass
+
+
+def stats():
+    counters = _cache().get_many(['list-cache:hits', 'list-cache:misses'])
+    return {
+        'hits': counters.get('list-cache:hits', 0),
+        'misses': counters.get('list-cache:misses', 0),
+    }
+
+
+def _lookup(request, namespace):
+    key = cache_key(request, namespace)
+    cached = _cache().get(key)
+    _count('hits' if cached is not None else 'misses')
+    return key, cached
+
+
+def cached_list(request, namespace, validators, render):
+    """
+    Serve a list response from the cache, or compute ``validators()`` and
+    ``render()`` and store the result. Conditional requests are answered
+    with 304 either way.
+    """
+    key, cached = _lookup(request, namespace)
+    if cached is not None:
+        cached_validators, data = cached
+        response = conditional_response(request, cached_validators, lambda: Response(data))
+        response['X-Cache'] = 'HIT'
+        return response
+
+    current = validators()
+    response = conditional_response(request, current, render)
+    if response.status_code == 200:
+        _cache().set(key, (current, response.data))
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+async def acached_list(request, namespace, validators, render):
+    """
+    ``cached_list`` for async views: ``validators`` and ``render`` are
+    coroutine functions, and ``render`` returns the response data.
+    """
+    # The cache round trips share one thread hop; the cache's a* methods would take one each.
+    key, cached = await sync_to_async(_lookup)(request, namespace)
+    if cached is not None:
+        cached_validators, data = cached
+        response = conditional_response(request, cached_validators, lambda: json_response(data))
+        response['X-Cache'] = 'HIT'
+        return response
+
+    current = await validators()
+    response = not_modified(request, current)
+    if response is None:
+        data = await render()
+        await sync_to_async(_cache().set)(key, (current, data))
+        response = json_response(data)
+    response = set_validators(response, current)
+    response['X-Cache'] = 'MISS'
+    return response
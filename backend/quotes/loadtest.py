@@ -0,0 +1,296 @@
+"""
+Seeding and load testing against a running server.
+
+``seed`` creates sales users ``loadtest-sales-<n>`` and admins
+``loadtest-admin-<n>`` with quotes and integration logs
+(``python manage.py seed_data``). ``run`` drives a server with those
+accounts (``python manage.py loadtest``). Each scenario runs in its own
+phase, in which ``concurrency`` logged-in clients share ``requests``
+calls. Latency and throughput are measured on the client. Queries per
+request and the server's own timings come from the ``X-Query-Count`` and
+``Server-Timing`` headers, so start the server with
+``PROFILING_HEADERS=True`` to get them. ``compare`` diffs two result
+files and reports regressions.
+"""
+import random
+import statistics
+import subprocess
+import threading
+import time
+from urllib.parse import urljoin
+
+import requests
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import list_cache, stats
+from .models import IntegrationLog, Quote
+
+USERNAME_PREFIX = 'loadtest'
+LOG_ACTIONS = ['CREATE', 'STATUS', 'UPLOAD', 'ERP_SUCCESS', 'ERP_FAILURE']
+SEED_STATUSES = ['Pending Review', 'Pending Review', 'Approved', 'Rejected', 'Converted']
+PDF = b'%PDF-1.4\n% load test document\n'
+
+
+def sales_username(n):
+    return f'{USERNAME_PREFIX}-sales-{n}'
+
+
+def admin_username(n):
+    return f'{USERNAME_PREFIX}-admin-{n}'
+
+
+def seed(users, admins, quotes, logs, password, batch_size=2000, rng_seed=0):
+    """Create the load test accounts and data, replacing any from a previous run. Returns the row counts."""
+    rng = random.Random(rng_seed)
+    with transaction.atomic():
+        previous = User.objects.filter(username__startswith=f'{USERNAME_PREFIX}-')
+        IntegrationLog.objects.filter(user__in=previous).delete()
+        previous.delete()
+
+        # One hash for every account: hashing is the slow part of creating users.
+        encoded = make_password(password)
+        User.objects.bulk_create(
+            [User(username=sales_username(n), password=encoded) for n in range(users)]
+            + [User(username=admin_username(n), password=encoded, is_staff=True) for n in range(admins)]
+        )
+        sales_ids = list(User.objects.filter(username__startswith=f'{USERNAME_PREFIX}-sales-').values_list('id', flat=True))
+
+        for start in range(0, quotes, batch_size):
+            Quote.objects.bulk_create(
+                Quote(
+                    opportunity_id=f'LT-{n:08d}',
+                    customer_name=f'Customer {n}',
+                    customer_email=f'buyer{n}@example.com',
+                    customer_company=f'Company {n % 500}',
+                    status=rng.choice(SEED_STATUSES),
+                    submitted_by_id=rng.choice(sales_ids),
+                )
+                for n in range(start, min(start + batch_size, quotes))
+            )
+        seeded = list(Quote.objects.filter(submitted_by_id__in=sales_ids).values_list('id', 'submitted_by_id', 'status'))
+
+        for start in range(0, logs, batch_size):
+            batch = []
+            for _ in range(start, min(start + batch_size, logs)):
+                quote_id, user_id, quote_status = rng.choice(seeded)
+                batch.append(IntegrationLog(
+                    user_id=user_id, quote_id=quote_id, action=rng.choice(LOG_ACTIONS), status=quote_status,
+                    payload={'source': 'loadtest'},
+                ))
+            IntegrationLog.objects.bulk_create(batch)
+
+        # bulk_create bypasses the signals that maintain these.
+        stats.rebuild()
+        list_cache.invalidate_quotes(sales_ids)
+        list_cache.invalidate_logs(sales_ids)
+    return {'users': users, 'admins': admins, 'quotes': quotes, 'logs': logs}
+
+
+class Client:
+    def __init__(self, base_url, username, password):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.session = requests.Session()
+        self.quote_ids = []
+
+    def url(self, path):
+        return urljoin(self.base_url, path)
+
+    def login(self, session=None):
+        session = session or self.session
+        response = session.post(self.url('/api/login/'), json={'username': self.username, 'password': self.password})
+        if response.status_code != 200:
+            raise RuntimeError(f'Login as {self.username} failed: {response.status_code} {response.text[:200]}')
+        return response
+
+    def get(self, path, **kwargs):
+        return self.session.get(self.url(path), **kwargs)
+
+    def post(self, path, **kwargs):
+        # Session-authenticated writes need the CSRF token that login() set.
+        headers = {'X-CSRFToken': self.session.cookies.get('csrftoken', ''), 'Referer': self.base_url}
+        return self.session.post(self.url(path), headers=headers, **kwargs)
+
+
+def _quote_ids(client):
+    return [row['id'] for row in client.get('/api/quotes/?page_size=100').json()['results']]
+
+
+def _login(client, n):
+    # A fresh session per call, so the client's own session stays valid.
+    return client.login(requests.Session())
+
+
+def _create_quote(client, n):
+    return client.post('/api/quotes/', data={
+        'opportunity_id': f'LT-NEW-{n}', 'customer_name': f'Load Test {n}', 'customer_email': f'new{n}@example.com',
+    })
+
+
+def _upload_file(client, n):
+    quote_id = client.quote_ids[n % len(client.quote_ids)]
+    # Distinct content per request, so every upload writes a new blob.
+    document = ('loadtest.pdf', PDF + str(n).encode(), 'application/pdf')
+    return client.post(f'/api/quotes/{quote_id}/upload_file/', files={'supporting_document': document})
+
+
+def _set_status(client, n):
+    quote_id = client.quote_ids[n % len(client.quote_ids)]
+    return client.post(f'/api/quotes/{quote_id}/set_status/', json={'status': 'Approved' if n % 2 else 'Rejected'})
+
+
+# name: (role, request)
+SCENARIOS = {
+    'login': ('sales', _login),
+    'quote-list': ('sales', lambda client, n: client.get('/api/quotes/')),
+    'quote-detail': ('sales', lambda client, n: client.get(f'/api/quotes/{client.quote_ids[n % len(client.quote_ids)]}/')),
+    'quote-search': ('sales', lambda client, n: client.get(f'/api/quotes/?search=customer+{n % 100}')),
+    'quote-create': ('sales', _create_quote),
+    'upload-file': ('sales', _upload_file),
+    'set-status': ('admin', _set_status),
+    'log-list': ('sales', lambda client, n: client.get('/api/logs/')),
+    'log-by-quote': ('sales', lambda client, n: client.get(f'/api/logs/by_quote/?quote_id={client.quote_ids[n % len(client.quote_ids)]}')),
+    'log-by-action': ('admin', lambda client, n: client.get('/api/logs/by_action/?action=STATUS')),
+    'user-info': ('sales', lambda client, n: client.get('/api/user/')),
+}
+
+
+def _percentile(cuts, p):
+    return round(cuts[p - 1] * 1000, 2)
+
+
+def server_timing(header):
+    """``{'db': 4.1, ...}`` (milliseconds) from a Server-Timing header."""
+    timings = {}
+    for metric in header.split(','):
+        name, *params = [part.strip() for part in metric.split(';')]
+        for param in params:
+            if param.startswith('dur='):
+                timings[name] = float(param[4:])
+    return timings
+
+
+def run_scenario(name, clients, total):
+    """Run ``total`` calls of one scenario spread over ``clients`` (one thread each)."""
+    _, call = SCENARIOS[name]
+    latencies, queries, errors, timings = [], [], [], {}
+    lock = threading.Lock()
+    issued = iter(range(total))
+
+    def worker(client):
+        while True:
+            with lock:
+                n = next(issued, None)
+            if n is None:
+                return
+            started = time.perf_counter()
+            try:
+                response = call(client, n)
+                error = None if response.status_code < 400 else f'{response.status_code} {response.text[:100]}'
+            except requests.RequestException as e:
+                response, error = None, str(e)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if error:
+                    errors.append(error)
+                if response is not None and 'X-Query-Count' in response.headers:
+                    queries.append(int(response.headers['X-Query-Count']))
+                if response is not None and 'Server-Timing' in response.headers:
+                    for metric, duration in server_timing(response.headers['Server-Timing']).items():
+                        timings.setdefault(metric, []).append(duration)
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'first_errors': errors[:3],
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(latencies) / duration, 2) if duration else None,
+        'latency_ms': {
+            'p50': _percentile(cuts, 50),
+            'p95': _percentile(cuts, 95),
+            'p99': _percentile(cuts, 99),
+            'mean': round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+            'max': round(max(latencies) * 1000, 2) if latencies else None,
+        },
+        'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+        'server_timing_ms': {metric: round(statistics.fmean(values), 2) for metric, values in timings.items()},
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(base_url, scenarios, concurrency, total, users, admins, password, progress=None):
+    """Log in ``concurrency`` clients per role and run each scenario. Returns the JSON-ready results."""
+    clients = {}
+    for role, username in [('sales', sales_username), ('admin', admin_username)]:
+        if not any(SCENARIOS[name][0] == role for name in scenarios):
+            continue
+        count = users if role == 'sales' else admins
+        clients[role] = [Client(base_url, username(n % count), password) for n in range(concurrency)]
+        # Logging in hashes a password per client; keep that out of the measurements.
+        for client in clients[role]:
+            client.login()
+            client.quote_ids = _quote_ids(client)
+            if not client.quote_ids:
+                raise RuntimeError(f'{client.username} sees no quotes; run seed_data first.')
+
+    results = {}
+    for name in scenarios:
+        results[name] = run_scenario(name, clients[SCENARIOS[name][0]], total)
+        if progress:
+            progress(name, results[name])
+    return {
+        'commit': _git_commit(),
+        'started_at': timezone.now().isoformat(),
+        'base_url': base_url,
+        'concurrency': concurrency,
+        'requests_per_scenario': total,
+        'scenarios': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Return (scenario, metric, baseline, current, change) for every metric
+    that got worse by more than ``threshold`` (a fraction) between two
+    result files: p95/p99 latency and queries up, throughput down.
+    """
+    regressions = []
+    for name, now in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            continue
+        metrics = [
+            ('latency p95', before['latency_ms']['p95'], now['latency_ms']['p95'], 1),
+            ('latency p99', before['latency_ms']['p99'], now['latency_ms']['p99'], 1),
+            ('throughput', before['throughput_rps'], now['throughput_rps'], -1),
+            ('queries', before['queries_per_request'], now['queries_per_request'], 1),
+        ]
+        for metric, old, new, direction in metrics:
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            # Any extra query is a regression; timings get the noise threshold.
+            limit = 0 if metric == 'queries' else threshold
+            if change * direction > limit:
+                regressions.append((name, metric, old, new, change))
+    return regressions
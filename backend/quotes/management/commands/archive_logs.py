@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from quotes.models import IntegrationLog
+from quotes.retention import archive_logs
+
+
+class Command(BaseCommand):
+    help = 'Move integration logs older than the retention period into compressed archive files and delete them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.LOG_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.LOG_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches (default: until done).')
+        parser.add_argument('--archive-dir', default=str(settings.LOG_ARCHIVE_DIR))
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be archived.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        if options['dry_run']:
+            count = IntegrationLog.objects.filter(created_at__lt=cutoff).count()
+            self.stdout.write(f'{count} log(s) created before {cutoff.isoformat()} would be archived.')
+            return
+
+        archived, path = archive_logs(cutoff, options['archive_dir'], options['batch_size'], options['max_batches'])
+        if path is None:
+            self.stdout.write(f'No logs created before {cutoff.isoformat()}.')
+        else:
+            self.stdout.write(f'Archived {archived} log(s) to {path}.')
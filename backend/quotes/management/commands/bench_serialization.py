@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from quotes.models import IntegrationLog, Quote
+from quotes.renderers import FastJSONRenderer
+from quotes.rows import log_shaper, log_values, quote_shaper, quote_values
+from quotes.serializers import IntegrationLogSerializer, QuoteSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows per second of ModelSerializer + JSONRenderer with the read-only fast path '
+        '(quotes.rows + FastJSONRenderer) on the newest quotes and logs, including the query.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3, help='Best of this many runs.')
+
+    def _best(self, repeat, render):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = render()
+            timings.append(time.perf_counter() - started)
+        return min(timings), body
+
+    def handle(self, *args, **options):
+        # Fresh querysets on every call: a reused one would answer runs 2..N from its result cache.
+        def quotes():
+            return Quote.objects.order_by('-created_at', '-id')[:options['rows']]
+
+        def logs():
+            return IntegrationLog.objects.select_related('user', 'quote').order_by('-created_at', '-id')[:options['rows']]
+
+        cases = [
+            ('quotes', quotes,
+             lambda: JSONRenderer().render(QuoteSerializer(quotes(), many=True, context={'request': None}).data),
+             lambda: FastJSONRenderer().render(list(map(quote_shaper(None), quote_values(quotes()))))),
+            ('logs', logs,
+             lambda: JSONRenderer().render(IntegrationLogSerializer(logs(), many=True).data),
+             lambda: FastJSONRenderer().render(list(map(log_shaper(), log_values(logs()))))),
+        ]
+        for name, queryset, serializer, fast in cases:
+            rows = queryset().count()
+            if not rows:
+                self.stdout.write(f'{name}: no rows (run seed_data first)')
+                continue
+            slow_seconds, slow_body = self._best(options['repeat'], serializer)
+            fast_seconds, fast_body = self._best(options['repeat'], fast)
+            self.stdout.write(
+                f'{name:6} {rows} rows  serializer {rows / slow_seconds:9.0f} rows/s  '
+                f'fast path {rows / fast_seconds:9.0f} rows/s  ({slow_seconds / fast_seconds:.1f}x)  '
+                f'identical output: {"yes" if slow_body == fast_body else "NO"}'
+            )
@@ -0,0 +1,59 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from takehome.openapi import generate
+
+METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch')
+
+
+def _operations(schema):
+    return {
+        f'{method.upper()} {path}': operation
+        for path, item in schema.get('paths', {}).items()
+        for method, operation in item.items() if method in METHODS
+    }
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema served at /swagger.json and write it to OPENAPI_SCHEMA_FILE.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(settings.OPENAPI_SCHEMA_FILE))
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Do not write; fail if the file differs from the schema generated from the code.',
+        )
+
+    def handle(self, *args, **options):
+        body = generate()
+        path = options['output']
+        if not options['check']:
+            with open(path, 'wb') as f:
+                f.write(body)
+            self.stdout.write(f'Wrote the OpenAPI schema to {path} ({len(body)} bytes).')
+            return
+
+        try:
+            with open(path, 'rb') as f:
+                current = f.read()
+        except FileNotFoundError:
+            raise CommandError(f'{path} does not exist; run python manage.py build_openapi.')
+        if current == body:
+            self.stdout.write(f'{path} is up to date.')
+            return
+
+        try:
+            old = _operations(json.loads(current))
+        except ValueError:
+            raise CommandError(f'{path} is not a JSON schema; run python manage.py build_openapi.')
+        new = _operations(json.loads(body))
+        lines = [f'+ {name}' for name in sorted(new.keys() - old.keys())]
+        lines += [f'- {name}' for name in sorted(old.keys() - new.keys())]
+        lines += [f'~ {name}' for name in sorted(old.keys() & new.keys()) if old[name] != new[name]]
+        if not lines:
+            lines = ['~ definitions or metadata']
+        raise CommandError(
+            f'{path} is out of date with the code; run python manage.py build_openapi.\n' + '\n'.join(lines)
+        )
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from quotes.storage import collect_garbage, recount
+
+
+class Command(BaseCommand):
+    help = 'Delete stored quote documents that no quote references any more.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=settings.DOCUMENT_GC_GRACE_HOURS,
+                            help='Keep unreferenced blobs touched within this many hours.')
+        parser.add_argument('--recount', action='store_true',
+                            help='Recompute reference counts from the quote table first.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            self.stdout.write(f'Corrected {recount()} reference count(s).')
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        deleted, freed = collect_garbage(cutoff, dry_run=options['dry_run'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(f'{verb} {deleted} unreferenced document(s), {freed} bytes.')
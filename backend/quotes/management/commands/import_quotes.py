@@ -0,0 +1,36 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from quotes.importer import detect_format, import_quotes
+
+
+class Command(BaseCommand):
+    help = 'Import quotes from a CSV or NDJSON file, streaming it row by row.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help='Username that will own the imported quotes.')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=settings.QUOTE_IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        fmt = options['format'] or detect_format(path.suffix.lstrip('.'))
+        if fmt is None:
+            raise CommandError('Cannot tell the format from the file extension; pass --format.')
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        with path.open('rb') as f:
+            report = import_quotes(f, fmt, user, options['chunk_size'])
+
+        self.stdout.write(json.dumps(report, indent=2))
+        if 'error' in report:
+            raise CommandError(report['error'])
+        self.stdout.write(f"Imported {report['imported']} quote(s), rejected {report['rejected_count']}.")
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from quotes.tokens import issue
+
+
+class Command(BaseCommand):
+    help = (
+        'Print a signed token for a machine client of the ERP/CRM endpoints '
+        '(Authorization: Token <token>). Tokens are not stored; see quotes.tokens.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user named {options["username"]!r}.')
+        if not user.is_active:
+            raise CommandError(f'{user.username} is inactive.')
+        self.stdout.write(issue(user))
+        self.stderr.write(f'Valid for {settings.SIGNED_TOKEN_MAX_AGE_SECONDS} seconds.')
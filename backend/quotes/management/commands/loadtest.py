@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quotes.loadtest import SCENARIOS, compare, run
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a running server with the seed_data accounts and report latency percentiles, throughput, '
+        'queries per request and Server-Timing means (server started with PROFILING_HEADERS=True) for each scenario.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='e.g. http://127.0.0.1:8000')
+        parser.add_argument('--scenario', action='append', dest='scenarios', choices=list(SCENARIOS),
+                            help='Scenario to run (repeatable). Default: all.')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=500, help='Requests per scenario.')
+        parser.add_argument('--users', type=int, default=20, help='Sales users to spread the clients over.')
+        parser.add_argument('--admins', type=int, default=2)
+        parser.add_argument('--password', default='loadtest')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='Earlier results file to check for regressions against.')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Allowed slowdown before a timing counts as a regression (0.2 = 20%%).')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be positive.')
+
+        def progress(name, result):
+            latency = result['latency_ms']
+            self.stdout.write(
+                f'{name:14} {result["throughput_rps"]:8.1f} req/s  p50 {latency["p50"]:7.1f}ms  '
+                f'p95 {latency["p95"]:7.1f}ms  p99 {latency["p99"]:7.1f}ms  '
+                f'queries {result["queries_per_request"] if result["queries_per_request"] is not None else "-"}  '
+                f'errors {result["errors"]}'
+            )
+            if result['server_timing_ms']:
+                self.stdout.write('    server ' + '  '.join(f'{metric} {ms:.1f}ms' for metric, ms in result['server_timing_ms'].items()))
+            for error in result['first_errors']:
+                self.stdout.write(f'    {error}')
+
+        try:
+            results = run(
+                options['base_url'], options['scenarios'] or list(SCENARIOS), options['concurrency'],
+                options['requests'], options['users'], options['admins'], options['password'], progress=progress
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}.')
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = compare(baseline, results, options['threshold'])
+            for name, metric, old, new, change in regressions:
+                self.stdout.write(f'REGRESSION {name} {metric}: {old} -> {new} ({change:+.0%})')
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]} (commit {baseline.get("commit")}).')
+            self.stdout.write(f'No regressions against {options["compare"]}.')
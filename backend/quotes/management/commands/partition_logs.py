@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from quotes import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'Manage monthly range partitions of the integration log table (PostgreSQL only). '
+        'Run once with --convert, then regularly (e.g. daily) to create upcoming partitions '
+        'and drop empty ones past the retention period.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true', help='Rebuild the existing table as a partitioned table.')
+        parser.add_argument('--months-ahead', type=int, default=settings.LOG_PARTITION_MONTHS_AHEAD)
+        parser.add_argument('--retention-days', type=int, default=settings.LOG_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Log partitioning requires PostgreSQL.')
+
+        today = timezone.now().date()
+        if not partitioning.is_partitioned(connection):
+            if not options['convert']:
+                raise CommandError('The log table is not partitioned yet; run with --convert first.')
+            partitioning.convert_to_partitioned(connection, today, options['months_ahead'])
+            self.stdout.write('Converted the log table to monthly partitions.')
+
+        partitioning.ensure_partitions(connection, today, options['months_ahead'])
+        cutoff = today - timedelta(days=options['retention_days'])
+        for name in partitioning.drop_empty_partitions(connection, cutoff):
+            self.stdout.write(f'Dropped empty partition {name}.')
@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quotes.outbox import drain, release_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued integration jobs (ERP orders) from the outbox, retrying with exponential backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=settings.OUTBOX_POLL_INTERVAL_SECONDS)
+        parser.add_argument('--once', action='store_true', help='Drain the jobs that are due now and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_stale_jobs()
+            if released:
+                self.stdout.write(f'Released {released} stale job(s).')
+            delivered, failed = drain(options['batch_size'])
+            if delivered or failed:
+                self.stdout.write(f'Delivered {delivered} job(s), {failed} failed.')
+            if options['once']:
+                return
+            time.sleep(options['poll_interval'])
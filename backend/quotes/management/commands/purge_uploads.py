@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from quotes.uploads import purge_stale
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable upload sessions (and their partial files) that have not been touched within the TTL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-hours', type=int, default=settings.UPLOAD_SESSION_TTL_HOURS)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than_hours'])
+        deleted = purge_stale(cutoff)
+        self.stdout.write(f'Deleted {deleted} upload session(s) last updated before {cutoff.isoformat()}.')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from quotes.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the pipeline statistics summary tables from the quote and integration log tables.'
+
+    def handle(self, *args, **options):
+        counters = rebuild()
+        self.stdout.write(f'Rebuilt {counters} pipeline counter(s).')
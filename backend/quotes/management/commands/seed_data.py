@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from quotes.loadtest import seed
+
+
+class Command(BaseCommand):
+    help = 'Create load test users (loadtest-sales-N, loadtest-admin-N), quotes and logs, replacing earlier ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Sales users.')
+        parser.add_argument('--admins', type=int, default=2)
+        parser.add_argument('--quotes', type=int, default=10000)
+        parser.add_argument('--logs', type=int, default=50000)
+        parser.add_argument('--password', default='loadtest')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible data.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['admins'] < 1:
+            self.stderr.write('At least one sales user and one admin are needed.')
+            return
+        counts = seed(
+            options['users'], options['admins'], options['quotes'], options['logs'], options['password'],
+            rng_seed=options['seed']
+        )
+        self.stdout.write(
+            f'Created {counts["users"]} sales user(s), {counts["admins"]} admin(s), '
+            f'{counts["quotes"]} quote(s) and {counts["logs"]} log(s).'
+        )
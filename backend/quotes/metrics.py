@@ -0,0 +1,154 @@
+"""
+Request metrics in the Prometheus text format (GET /api/metrics/).
+
+``observe`` adds a request profile (quotes.instrumentation) to
+histograms labelled by URL name and method, plus a request counter that
+is also labelled by status. Everything is kept in process memory; no
+Prometheus client or push gateway is involved.
+
+A gunicorn or uvicorn worker only sees its own requests. With
+``settings.METRICS_DIR`` set, each process writes its totals to
+``<METRICS_DIR>/<pid>.json`` at most every ``METRICS_FLUSH_SECONDS``, and
+``render`` adds up every file in the directory, so a scrape of any worker
+covers all of them. Files of exited workers are kept, so totals do not go
+backwards when a worker is recycled. Empty the directory on deploy.
+"""
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from . import list_cache
+from .instrumentation import DB, INTEGRATION, SERIALIZE
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUESTS = 'http_requests_total'
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Time until the view returned a response.', SECONDS_BUCKETS),
+    'http_request_db_seconds': ('Time spent in SQL queries.', SECONDS_BUCKETS),
+    'http_request_db_queries': ('SQL queries per request.', QUERY_BUCKETS),
+    'http_request_serialize_seconds': ('Time spent in serializers.', SECONDS_BUCKETS),
+    'http_request_integration_seconds': ('Time spent calling external integrations.', SECONDS_BUCKETS),
+}
+
+_lock = threading.Lock()
+# (metric, ((label, value), ...)) -> request count, or for histograms [per-bucket counts..., +Inf count, sum]
+_samples = {}
+_last_flush = 0.0
+
+
+def _observe(metric, labels, value):
+    key = (metric, labels)
+    buckets = HISTOGRAMS[metric][1]
+    sample = _samples.get(key)
+    if sample is None:
+        sample = _samples[key] = [0] * (len(buckets) + 1) + [0.0]
+    index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+    sample[index] += 1
+    sample[-1] += value
+
+
+def observe(view, method, status, total, profile):
+    labels = (('view', view), ('method', method))
+    with _lock:
+        key = (REQUESTS, labels + (('status', str(status)),))
+        _samples[key] = _samples.get(key, 0) + 1
+        _observe('http_request_duration_seconds', labels, total)
+        _observe('http_request_db_seconds', labels, profile.durations[DB])
+        _observe('http_request_db_queries', labels, profile.queries)
+        _observe('http_request_serialize_seconds', labels, profile.durations[SERIALIZE])
+        _observe('http_request_integration_seconds', labels, profile.durations[INTEGRATION])
+    if settings.METRICS_DIR and time.monotonic() - _last_flush >= settings.METRICS_FLUSH_SECONDS:
+        flush()
+
+
+def _snapshot():
+    with _lock:
+        return [[metric, list(labels), value] for (metric, labels), value in _samples.items()]
+
+
+def flush():
+    """Write this process's totals to METRICS_DIR."""
+    global _last_flush
+    _last_flush = time.monotonic()
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    path = os.path.join(settings.METRICS_DIR, f'{os.getpid()}.json')
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(_snapshot(), f)
+    os.replace(f'{path}.tmp', path)
+
+
+def _load():
+    if not settings.METRICS_DIR:
+        return _snapshot()
+    flush()
+    rows = []
+    for name in os.listdir(settings.METRICS_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(settings.METRICS_DIR, name)) as f:
+                rows.extend(json.load(f))
+        except (OSError, ValueError):
+            # Being replaced by its worker right now; it is counted on the next scrape.
+            continue
+    return rows
+
+
+def collect():
+    """This process's samples, or every process's with METRICS_DIR set, keyed like ``_samples``."""
+    merged = {}
+    for metric, labels, value in _load():
+        key = (metric, tuple(tuple(pair) for pair in labels))
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, list):
+            merged[key] = [a + b for a, b in zip(merged[key], value)]
+        else:
+            merged[key] += value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    samples = collect()
+    lines = [f'# HELP {REQUESTS} Requests by URL name, method and status.', f'# TYPE {REQUESTS} counter']
+    lines += [f'{REQUESTS}{_labels(labels)} {value}' for (metric, labels), value in sorted(samples.items()) if metric == REQUESTS]
+
+    for metric, (description, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {metric} {description}', f'# TYPE {metric} histogram']
+        for (name, labels), value in sorted(samples.items()):
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], value[:-1]):
+                cumulative += count
+                lines.append(f'{metric}_bucket{_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{metric}_sum{_labels(labels)} {_number(value[-1])}')
+            lines.append(f'{metric}_count{_labels(labels)} {cumulative}')
+
+    # Counted in the list cache's own backend: per process with LocMemCache, shared with a file or network cache.
+    for name, value in list_cache.stats().items():
+        metric = f'list_cache_{name}_total'
+        lines += [f'# HELP {metric} Quote/log list cache {name}.', f'# TYPE {metric} counter', f'{metric} {value}']
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        _samples.clear()
@@ -0,0 +1,90 @@
+import json
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import audit, instrumentation, metrics
+
+logger = logging.getLogger('quotes.profiling')
+
+
+class AuditLogMiddleware:
+    """Writes the integration log entries a request records outside a transaction in one bulk insert."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Under ASGI a sync-only middleware would push every request below it onto a thread.
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with audit.request_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        async with audit.arequest_scope():
+            return await self.get_response(request)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles every request (quotes.instrumentation) and adds it to
+    quotes.metrics. With ``settings.PROFILING_HEADERS`` the response carries
+    ``Server-Timing`` and ``X-Query-Count``. A ``PROFILING_LOG_SAMPLE_RATE``
+    share of requests, and every request slower than
+    ``PROFILING_SLOW_REQUEST_MS``, is logged as JSON to ``quotes.profiling``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with instrumentation.profile() as profile:
+            response = self.get_response(request)
+        return self._record(request, response, profile)
+
+    async def __acall__(self, request):
+        with instrumentation.profile() as profile:
+            response = await self.get_response(request)
+        return self._record(request, response, profile)
+
+    def _record(self, request, response, profile):
+        total = profile.total
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        metrics.observe(view, request.method, response.status_code, total, profile)
+
+        durations = {'total': total, **profile.durations}
+        if settings.PROFILING_HEADERS:
+            response['Server-Timing'] = ', '.join(
+                f'{name};dur={seconds * 1000:.1f}' + (f';desc="{profile.queries} queries"' if name == instrumentation.DB else '')
+                for name, seconds in durations.items()
+            )
+            response['X-Query-Count'] = str(profile.queries)
+
+        slow = settings.PROFILING_SLOW_REQUEST_MS and total * 1000 >= settings.PROFILING_SLOW_REQUEST_MS
+        if slow or random.random() < settings.PROFILING_LOG_SAMPLE_RATE:
+            logger.info(json.dumps({
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': profile.queries,
+                **{f'{name}_ms': round(seconds * 1000, 2) for name, seconds in durations.items()},
+            }))
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+from quotes.operations import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('quotes', '0002_integrationlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name='integrationlog',
+            index=models.Index(fields=['-created_at', '-id'], name='log_created_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='integrationlog',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='log_user_created_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='integrationlog',
+            index=models.Index(fields=['quote', '-created_at', '-id'], name='log_quote_created_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='integrationlog',
+            index=models.Index(fields=['action', '-created_at', '-id'], name='log_action_created_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='quote',
+            index=models.Index(fields=['-created_at', '-id'], name='quote_created_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='quote',
+            index=models.Index(fields=['submitted_by', '-created_at', '-id'], name='quote_submitter_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('quotes', '0004_integrationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SalesRepStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='quote_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('quotes', models.BigIntegerField(default=0)),
+                ('converted', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:17
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+from quotes.operations import AddIndexConcurrentlyIfSupported, AddPostgresIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('quotes', '0005_pipeline_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name='quote',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='quote_status_created_idx'),
+        ),
+        AddPostgresIndexConcurrently(
+            model_name='quote',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('customer_name', 'customer_company', 'customer_email', 'opportunity_id', config='simple'), name='quote_search_idx'),
+        ),
+    ]
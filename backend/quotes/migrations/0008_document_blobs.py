@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:24
+
+import quotes.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0007_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quote',
+            name='supporting_document',
+            field=models.FileField(blank=True, null=True, storage=quotes.storage.document_storage, upload_to='quotes/'),
+        ),
+        migrations.CreateModel(
+            name='DocumentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(max_length=64)),
+                ('size', models.PositiveIntegerField()),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='blob_gc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0008_document_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quote',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
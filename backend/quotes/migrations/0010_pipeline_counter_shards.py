@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0009_quote_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipelinecounter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='pipelinecounter',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='pipelinecounter',
+            constraint=models.UniqueConstraint(fields=('name', 'shard'), name='pipeline_counter_shard_uniq'),
+        ),
+    ]
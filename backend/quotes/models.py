@@ -1,6 +1,12 @@
 
-from django.db import models
+import uuid
+from collections import Counter
+
+from django.db import models, transaction
+
+from .storage import document_storage, release, retain
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class IntegrationLog(models.Model):
     ACTION_CHOICES = [
@@ -16,6 +22,40 @@ class IntegrationLog(models.Model):
     response = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='log_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='log_user_created_idx'),
+            models.Index(fields=['quote', '-created_at', '-id'], name='log_quote_created_idx'),
+            models.Index(fields=['action', '-created_at', '-id'], name='log_action_created_idx'),
+        ]
+
+class QuoteQuerySet(models.QuerySet):
+    """
+    Keeps document blob reference counts (quotes.storage) right for bulk
+    writes, which send no save signals. ``delete()`` needs nothing here:
+    it sends post_delete per quote because receivers are connected.
+    """
+
+    def update(self, **kwargs):
+        if 'supporting_document' not in kwargs:
+            return super().update(**kwargs)
+        document = kwargs['supporting_document']
+        with transaction.atomic(using=self.db):
+            previous = Counter(self.order_by().select_for_update().values_list('supporting_document', flat=True))
+            updated = super().update(**kwargs)
+            for name, count in previous.items():
+                release(name, count)
+            retain(getattr(document, 'name', document), updated)
+        return updated
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        for name, count in Counter(obj.supporting_document.name for obj in objs if obj.supporting_document).items():
+            retain(name, count)
+        return objs
+
+
 class Quote(models.Model):
     opportunity_id = models.CharField(max_length=100)
     customer_name = models.CharField(max_length=255)
@@ -31,10 +71,139 @@ class Quote(models.Model):
         ],
         default='Pending Review'
     )
-    supporting_document = models.FileField(upload_to='quotes/', blank=True, null=True)
+    supporting_document = models.FileField(upload_to='quotes/', storage=document_storage, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     submitted_by = models.ForeignKey('auth.User', on_delete=models.CASCADE)
+    # Moves on with every write; the detail ETag is built from it (see set_status).
+    version = models.PositiveIntegerField(default=1)
+
+    objects = QuoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='quote_created_idx'),
+            models.Index(fields=['submitted_by', '-created_at', '-id'], name='quote_submitter_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='quote_status_created_idx'),
+            # The full-text GIN index 'quote_search_idx' is PostgreSQL only and lives in migration 0006.
+        ]
+
+    def __str__(self):
+        return f"{self.opportunity_id} - {self.customer_name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored document name as loaded, so signals can move blob reference counts on change.
+        instance._loaded_document = instance.__dict__.get('supporting_document')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        # Incremented in the database, so two writers that read the same version still end up with different ones.
+        self.version = models.F('version') + 1
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
+
+class IntegrationOutbox(models.Model):
+    TARGET_CHOICES = [
+        ('ERP', 'ERP Integration'),
+    ]
+    PENDING = 'PENDING'
+    PROCESSING = 'PROCESSING'
+    DONE = 'DONE'
+    DEAD = 'DEAD'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (DEAD, 'Dead Letter'),
+    ]
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    quote = models.ForeignKey(Quote, on_delete=models.SET_NULL, null=True, blank=True)
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+            models.Index(fields=['quote', 'status', 'id'], name='outbox_quote_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.target} #{self.id} ({self.status})"
+
+class PipelineCounter(models.Model):
+    """
+    Running total maintained by quotes.stats, e.g. 'status:Approved' or
+    'action:ERP_SUCCESS'. A total is split over shard rows and is their sum.
+    """
+    name = models.CharField(max_length=100)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'shard'], name='pipeline_counter_shard_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+class SalesRepStats(models.Model):
+    """Per-submitter quote totals maintained by quotes.stats."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='quote_stats')
+    quotes = models.BigIntegerField(default=0)
+    converted = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.quotes} quotes, {self.converted} converted"
+
+class UploadSession(models.Model):
+    """A resumable, chunked supporting-document upload (see quotes.uploads)."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    quote = models.ForeignKey(Quote, on_delete=models.CASCADE, related_name='upload_sessions')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveIntegerField()
+    received = models.PositiveIntegerField(default=0)
+    content_type = models.CharField(max_length=100, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='upload_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+class DocumentBlob(models.Model):
+    """One stored document in the content-addressed storage, with the number of quotes referencing it."""
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64)
+    size = models.PositiveIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='blob_gc_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.opportunity_id} - {self.customer_name}"
\ No newline at end of file
+        return f"{self.name} ({self.ref_count} refs)"
@@ -0,0 +1,42 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrentlyIfSupported(AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY on Postgres; a regular AddIndex on other backends (e.g. SQLite in development)."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class AddPostgresIndexConcurrently(AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY for PostgreSQL-only index types (GIN, ...); a
+    no-op on other backends.
+
+    The index is not added to the migration state, and the model does not
+    declare it either, so makemigrations sees nothing to do on any backend.
+    Were it in the state, SQLite would copy it into every table it rebuilds
+    for a later AlterField and fail on the PostgreSQL-only expression.
+    """
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def describe(self):
+        return f'Concurrently create PostgreSQL-only index {self.index.name} on model {self.model_name}'
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .integrations import IntegrationError, NotSentError, get_client
+from . import audit
+from .models import IntegrationOutbox
+
+
+def erp_order_job(user, quote):
+    """Build an unsaved ERP order job for the quote's current state."""
+    payload = {
+        'quote_id': quote.id,
+        'opportunity_id': quote.opportunity_id,
+        'customer_name': quote.customer_name,
+        'status': quote.status,
+        'updated_at': quote.updated_at.isoformat(),
+    }
+    return IntegrationOutbox(user=user, quote=quote, target='ERP', payload=payload)
+
+
+def enqueue_erp_order(user, quote):
+    """Record an ERP order job; call inside the transaction that changed the quote."""
+    job = erp_order_job(user, quote)
+    job.save()
+    return job
+
+
+def backoff_delay(attempts):
+    seconds = settings.OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.OUTBOX_BACKOFF_MAX_SECONDS))
+
+
+def release_stale_jobs():
+    """Hand jobs claimed by a worker that died mid-delivery back to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.OUTBOX_VISIBILITY_TIMEOUT_SECONDS)
+    return IntegrationOutbox.objects.filter(
+        status=IntegrationOutbox.PROCESSING, locked_at__lt=cutoff
+    ).update(status=IntegrationOutbox.PENDING, locked_at=None)
+
+
+def claim_batch(batch_size, due_before=None):
+    """
+    Claim up to ``batch_size`` jobs due by ``due_before`` (default: now). A job
+    is only eligible once every earlier job for the same quote has been
+    delivered or dead-lettered, so each quote's jobs reach the ERP in the
+    order they were written.
+    """
+    now = timezone.now()
+    due_before = due_before or now
+    earlier_open = IntegrationOutbox.objects.filter(
+        quote=OuterRef('quote'),
+        id__lt=OuterRef('id'),
+        status__in=[IntegrationOutbox.PENDING, IntegrationOutbox.PROCESSING],
+    )
+    with transaction.atomic():
+        jobs = list(
+            IntegrationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=IntegrationOutbox.PENDING, next_attempt_at__lte=due_before)
+            .exclude(Exists(earlier_open))
+            .order_by('id')[:batch_size]
+        )
+        IntegrationOutbox.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=IntegrationOutbox.PROCESSING, locked_at=now
+        )
+    return jobs
+
+
+def deliver(job):
+    """Send one job to its target and record the outcome. Returns True on success."""
+    client = get_client(job.target)
+    try:
+        result = client.post(settings.ERP_ORDERS_URL, json=job.payload)
+    except NotSentError as e:
+        # Nothing reached the ERP (open circuit, full bulkhead): put the job back without using up an attempt.
+        job.last_error = str(e)
+        job.locked_at = None
+        job.status = IntegrationOutbox.PENDING
+        job.next_attempt_at = timezone.now() + max(timedelta(seconds=e.retry_after), backoff_delay(1))
+        job.save(update_fields=['last_error', 'locked_at', 'status', 'next_attempt_at', 'updated_at'])
+        return False
+    except IntegrationError as e:
+        job.attempts += 1
+        job.last_error = str(e)
+        job.locked_at = None
+        with transaction.atomic():
+            if job.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                job.status = IntegrationOutbox.DEAD
+                _log_result(job, 'ERP_FAILURE', {'error': str(e), 'attempts': job.attempts, 'client': e.state})
+            else:
+                job.status = IntegrationOutbox.PENDING
+                job.next_attempt_at = timezone.now() + backoff_delay(job.attempts)
+            job.save(update_fields=['attempts', 'last_error', 'locked_at', 'status', 'next_attempt_at', 'updated_at'])
+        return False
+
+    job.attempts += 1
+    job.status = IntegrationOutbox.DONE
+    job.locked_at = None
+    if not isinstance(result, dict):
+        result = {'data': result}
+    with transaction.atomic():
+        job.save(update_fields=['attempts', 'status', 'locked_at', 'updated_at'])
+        _log_result(job, 'ERP_SUCCESS', {**result, 'client': client.state()})
+    return True
+
+
+def drain(batch_size):
+    """
+    Deliver the jobs due at call time batch by batch. Jobs that fail are
+    rescheduled for a later pass rather than retried in this one.
+    Returns (delivered, failed).
+    """
+    started_at = timezone.now()
+    delivered = failed = 0
+    while True:
+        jobs = claim_batch(batch_size, due_before=started_at)
+        if not jobs:
+            return delivered, failed
+        for job in jobs:
+            if deliver(job):
+                delivered += 1
+            else:
+                failed += 1
+
+
+def _log_result(job, action, response):
+    audit.log(
+        user=job.user,
+        quote=job.quote,
+        action=action,
+        status=job.payload.get('status', ''),
+        payload=job.payload,
+        response=response,
+    )
@@ -0,0 +1,59 @@
+import json
+
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+APPROXIMATE_TOTAL_CAP = 10000
+
+
+def approximate_count(queryset):
+    """Cheap row estimate: planner estimate on Postgres, a capped count elsewhere."""
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    return queryset[:APPROXIMATE_TOTAL_CAP].count()
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    total_query_param = 'include_total'
+
+    def get_ordering(self, request, queryset, view):
+        # Search results (quotes.search) come best match first.
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', '-created_at', '-id')
+        return super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.include_total = request.query_params.get(self.total_query_param, '').lower() in ('1', 'true', 'yes')
+        self.total_queryset = queryset
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        body = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.include_total:
+            body['approximate_total'] = approximate_count(self.total_queryset)
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['approximate_total'] = {
+            'type': 'integer',
+            'example': 123,
+        }
+        return response_schema
@@ -0,0 +1,25 @@
+from rest_framework.parsers import BaseParser
+
+
+class LineStreamParser(BaseParser):
+    """Hands the unread request body to the view so it can be consumed line by line."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
+
+
+class CSVStreamParser(LineStreamParser):
+    media_type = 'text/csv'
+
+
+class NDJSONStreamParser(LineStreamParser):
+    media_type = 'application/x-ndjson'
+
+
+class ChunkStreamParser(LineStreamParser):
+    """Raw upload chunks (PUT /api/quotes/{id}/uploads/{upload_id}/), read by the view as they arrive."""
+    media_type = 'application/offset+octet-stream'
+
+
+class OctetStreamParser(ChunkStreamParser):
+    media_type = 'application/octet-stream'
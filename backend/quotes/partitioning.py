@@ -0,0 +1,133 @@
+"""
+Monthly range partitioning of the IntegrationLog table on created_at (PostgreSQL only).
+
+Django has no notion of partitioned tables, so the conversion is done in SQL
+by the ``partition_logs`` command. The parent table keeps the model's name,
+columns, indexes and foreign keys; its primary key becomes (id, created_at),
+as Postgres requires the partition key in every unique constraint.
+"""
+from datetime import date
+
+from django.db import transaction
+
+from .models import IntegrationLog
+
+TABLE = IntegrationLog._meta.db_table
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def is_partitioned(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection):
+    """Return [(name, lower bound date)] for the monthly partitions, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            ORDER BY child.relname
+            """,
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f'{TABLE}_p'
+    return [
+        (name, date(int(name[len(prefix):][:4]), int(name[len(prefix):][4:]), 1))
+        for name in names if name.startswith(prefix)
+    ]
+
+
+def _create_month(cursor, month):
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(month)}" PARTITION OF "{TABLE}" '
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def ensure_partitions(connection, today, months_ahead):
+    """Create the partitions for the current month and ``months_ahead`` months after it."""
+    current = month_start(today)
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            _create_month(cursor, add_months(current, offset))
+
+
+def drop_empty_partitions(connection, before):
+    """Drop monthly partitions that end on or before ``before`` and hold no rows. Returns their names."""
+    dropped = []
+    with connection.cursor() as cursor:
+        for name, month in list_partitions(connection):
+            if add_months(month, 1) > before:
+                continue
+            cursor.execute(f'SELECT EXISTS (SELECT 1 FROM "{name}")')
+            if not cursor.fetchone()[0]:
+                cursor.execute(f'DROP TABLE "{name}"')
+                dropped.append(name)
+    return dropped
+
+
+def convert_to_partitioned(connection, today, months_ahead):
+    """
+    Rebuild the log table as a partitioned table in one transaction: copy
+    every row into monthly partitions (plus a default partition as a safety
+    net), then recreate the original indexes and foreign keys on the parent.
+    Takes an exclusive lock on the table for the duration of the copy.
+    """
+    old = f'{TABLE}_unpartitioned'
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+            [TABLE, f'{TABLE}_pkey'],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f'SELECT min(created_at), max(id) FROM "{TABLE}"')
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{old}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{old}" INCLUDING DEFAULTS, PRIMARY KEY (id, created_at)) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        month = month_start(oldest or today)
+        last = add_months(month_start(today), months_ahead)
+        while month <= last:
+            _create_month(cursor, month)
+            month = add_months(month, 1)
+        cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+        columns = ', '.join(f'"{field.column}"' for field in IntegrationLog._meta.concrete_fields)
+        cursor.execute(f'INSERT INTO "{TABLE}" ({columns}) SELECT {columns} FROM "{old}"')
+        cursor.execute(f'DROP TABLE "{old}"')
+
+        # The identity sequence went away with the old table; ids continue from a plain sequence.
+        cursor.execute(f'CREATE SEQUENCE "{TABLE}_id_seq" OWNED BY "{TABLE}".id')
+        cursor.execute(f"ALTER TABLE \"{TABLE}\" ALTER COLUMN id SET DEFAULT nextval('\"{TABLE}_id_seq\"')")
+        cursor.execute(f"SELECT setval('\"{TABLE}_id_seq\"', %s, %s)", [max_id or 1, max_id is not None])
+
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
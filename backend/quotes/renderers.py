@@ -0,0 +1,87 @@
+import json
+
+import orjson
+from django.http import HttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` output encoded with orjson. Types orjson does not
+    handle itself, and all dates and times, go through DRF's encoder, so
+    the bytes are the same. The one difference is the exponent spelling of
+    very large or small floats (``1e16`` instead of ``1e+16``). NaN and
+    infinities are not checked: orjson writes them as ``null`` where
+    ``JSONRenderer`` (``STRICT_JSON``) raises ValueError. Nothing served
+    through it holds such floats; JSON fields cannot store them on
+    PostgreSQL. Indented output, and anything orjson refuses (such as
+    integers over 64 bits), falls back to ``JSONRenderer``.
+    """
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.compact or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self._default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these two; they end a line in JavaScript.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def json_response(data, status=200):
+    """A JSON response with the same body as DRF's, for views outside DRF."""
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets export actions negotiate their streamed media type (``?format=`` or
+    ``Accept``). Exports bypass rendering by returning a streaming response,
+    so this only ever renders error payloads.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode(self.charset)
+
+
+class NDJSONExportRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVExportRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class DocumentRenderer(ExportRenderer):
+    """
+    Accepts any media type for document downloads, which answer with the
+    file itself; a client asking for ``application/pdf`` must not get 406.
+    """
+    media_type = '*/*'
+    format = None
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Passes the Prometheus text exposition through; errors are rendered as JSON."""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return json.dumps(data).encode(self.charset)
+
+
+EXPORT_RENDERERS = [NDJSONExportRenderer, CSVExportRenderer]
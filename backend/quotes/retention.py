@@ -0,0 +1,60 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from . import list_cache, stats
+from .models import IntegrationLog
+
+ARCHIVE_FIELDS = ['id', 'user_id', 'quote_id', 'action', 'status', 'payload', 'response', 'created_at']
+
+
+def archive_logs(cutoff, archive_dir, batch_size, max_batches=None):
+    """
+    Move logs created before ``cutoff`` into a gzipped NDJSON file under
+    ``archive_dir``, oldest first, ``batch_size`` rows at a time. Each batch
+    is flushed to disk before it is deleted, so a crash can at worst
+    archive a batch twice, never lose it. The pipeline counters lose the
+    deleted logs in the same transaction as the delete, so they keep
+    matching ``rebuild_stats``. Returns (rows archived, archive path or None).
+    """
+    archived = 0
+    batches = 0
+    path = None
+    archive = None
+    try:
+        while max_batches is None or batches < max_batches:
+            rows = list(
+                IntegrationLog.objects.filter(created_at__lt=cutoff)
+                .order_by('created_at', 'id')
+                .values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            if archive is None:
+                path, archive = _open_archive(archive_dir, cutoff)
+            archive.write(''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows).encode())
+            archive.flush()
+            os.fsync(archive.fileobj.fileno())
+            with transaction.atomic():
+                IntegrationLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+                stats.record_logs_deleted(row['action'] for row in rows)
+                list_cache.invalidate_logs({row['user_id'] for row in rows})
+            archived += len(rows)
+            batches += 1
+    finally:
+        if archive is not None:
+            archive.close()
+    return archived, path
+
+
+def _open_archive(archive_dir, cutoff):
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+    path = archive_dir / f'integration-logs-before-{cutoff:%Y%m%d}-{stamp}.ndjson.gz'
+    return path, gzip.open(path, 'xb')
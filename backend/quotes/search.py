@@ -0,0 +1,75 @@
+"""
+Search and filters for the quote list.
+
+On PostgreSQL ``search`` is a prefix full-text query against the
+``quote_search_idx`` GIN expression index, ranked with ts_rank. Other
+backends (SQLite in development) fall back to case-insensitive substring
+matching, ranking exact opportunity ID / email matches first.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+
+from .exporter import export_bounds, filter_created_at
+from .status import ALLOWED_STATUSES, normalize_status
+
+SEARCH_FIELDS = ('customer_name', 'customer_company', 'customer_email', 'opportunity_id')
+SEARCH_CONFIG = 'simple'
+MAX_SEARCH_TERMS = 8
+
+
+def search_vector():
+    # Must stay identical to the indexed expression ('quote_search_idx', migration 0006).
+    return SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG)
+
+
+def search_terms(text):
+    terms = [term.replace('\\', '').replace("'", '') for term in text.split()]
+    return [term for term in terms if term][:MAX_SEARCH_TERMS]
+
+
+def _postgres_search(queryset, terms):
+    # Every term must match as a prefix of some lexeme: 'acm' finds 'Acme', 'ana@' finds 'ana@acme.com'.
+    query = SearchQuery(' & '.join(f"'{term}':*" for term in terms), config=SEARCH_CONFIG, search_type='raw')
+    return queryset.alias(search=search_vector()).filter(search=query).annotate(
+        search_rank=Cast(SearchRank(search_vector(), query), FloatField())
+    )
+
+
+def _fallback_search(queryset, terms):
+    for term in terms:
+        matches = Q()
+        for field in SEARCH_FIELDS:
+            matches |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(matches)
+    text = ' '.join(terms)
+    return queryset.annotate(search_rank=Case(
+        When(Q(opportunity_id__iexact=text) | Q(customer_email__iexact=text), then=Value(2.0)),
+        When(customer_name__istartswith=text, then=Value(1.5)),
+        default=Value(1.0),
+        output_field=FloatField(),
+    ))
+
+
+def filter_quotes(queryset, query_params):
+    """
+    Apply ``search``, ``status``, ``since`` and ``until``. Searched querysets
+    get a ``search_rank`` annotation, which the paginator orders by.
+    Raises ValueError with a client-facing message for invalid values.
+    """
+    if query_params.get('status'):
+        quote_status = normalize_status(query_params['status'])
+        if quote_status is None:
+            raise ValueError(f'Invalid status. Must be one of {ALLOWED_STATUSES}')
+        queryset = queryset.filter(status=quote_status)
+
+    since, until = export_bounds(query_params)
+    queryset = filter_created_at(queryset, since, until)
+
+    terms = search_terms(query_params.get('search', ''))
+    if not terms:
+        return queryset
+    if connections[queryset.db].vendor == 'postgresql':
+        return _postgres_search(queryset, terms)
+    return _fallback_search(queryset, terms)
@@ -1,19 +1,32 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Quote, IntegrationLog
+from .downloads import document_url
+from .instrumentation import TimedSerializerMixin
 
 class LoginSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=150)
     password = serializers.CharField(max_length=128)
 
-class IntegrationLogSerializer(serializers.ModelSerializer):
+class IntegrationLogSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField()
     quote = serializers.StringRelatedField()
     
     class Meta:
         model = IntegrationLog
         fields = ['id', 'user', 'quote', 'action', 'status', 'payload', 'response', 'created_at']
-class QuoteSerializer(serializers.ModelSerializer):
+class DocumentField(serializers.FileField):
+    """Represents a stored document by its permission-checked download URL instead of a public media URL."""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return document_url(self.context.get('request'), value.instance.pk)
+
+
+class QuoteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    supporting_document = DocumentField(required=False, allow_null=True)
+
     class Meta:
         model = Quote
         fields = [
@@ -31,6 +44,21 @@ class QuoteSerializer(serializers.ModelSerializer):
         read_only_fields = ['status', 'created_at', 'updated_at', 'submitted_by', 'id']
 
 
+class CursorPageSerializer(serializers.Serializer):
+    """Documents a cursor-paginated list response (quotes.pagination) in the API schema."""
+    next = serializers.URLField(allow_null=True)
+    previous = serializers.URLField(allow_null=True)
+    approximate_total = serializers.IntegerField(required=False, help_text='Only with ?include_total=true')
+
+
+class QuotePageSerializer(CursorPageSerializer):
+    results = QuoteSerializer(many=True)
+
+
+class IntegrationLogPageSerializer(CursorPageSerializer):
+    results = IntegrationLogSerializer(many=True)
+
+
 class QuoteFileUploadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Quote
@@ -60,7 +88,7 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(username=validated_data['username'], password=validated_data['password'], email=validated_data.get('email', ''))
         return user
     
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'is_staff', 'first_name', 'last_name']
\ No newline at end of file
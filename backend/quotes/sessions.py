@@ -0,0 +1,172 @@
+"""
+Session and user resolution from a cache.
+
+With the database session backend and ``ModelBackend`` every
+authenticated request runs two queries before the view: the session row,
+then the user row. Both are kept in the ``settings.AUTH_CACHE_ALIAS``
+cache instead:
+
+- ``SessionStore`` (``SESSION_ENGINE = 'quotes.sessions'``) is Django's
+  ``cached_db`` store. Writes go to the database and the cache; reads come
+  from the cache and fall back to the database.
+- ``CachedModelBackend`` caches users by primary key. Saving or deleting a
+  user drops the entry (quotes.signals), so a new password or a changed
+  staff or active flag applies on the next request. ``QuerySet.update()``
+  sends no signal: call ``forget_user`` after one.
+
+A logout or a user change only reaches the other workers if they read the
+same cache, so the default AUTH_CACHE_BACKEND is a FileBasedCache shared by
+every worker on the host (a Redis cache for several hosts). Cache entries
+never outlive the cache's TIMEOUT, whatever the session expiry says.
+
+A cached user is a projection of the row without the password hash. It
+carries the session auth hashes instead, which are HMACs keyed with
+SECRET_KEY, and the password is loaded from the database if anything
+reads it.
+
+The database still holds every session. ``clearsessions`` deletes the
+expired ones ``SESSION_CLEANUP_BATCH_SIZE`` rows at a time.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.sessions.backends import cached_db
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+
+def _cache():
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+class _BoundedCache:
+    """Passes calls through to ``cache``, capping timeouts at its configured TIMEOUT."""
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def _timeout(self, timeout):
+        limit = self._cache.default_timeout
+        return timeout if limit is None else min(timeout, limit)
+
+    def set(self, key, value, timeout):
+        self._cache.set(key, value, self._timeout(timeout))
+
+    async def aset(self, key, value, timeout):
+        await self._cache.aset(key, value, self._timeout(timeout))
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'auth:session:'
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = _BoundedCache(caches[settings.AUTH_CACHE_ALIAS])
+
+    @classmethod
+    def clear_expired(cls):
+        purge_expired(settings.SESSION_CLEANUP_BATCH_SIZE)
+
+    @classmethod
+    async def aclear_expired(cls):
+        await sync_to_async(cls.clear_expired)()
+
+
+def purge_expired(batch_size, max_batches=None):
+    """Delete expired sessions ``batch_size`` at a time, so no single delete holds locks on a large part of the table."""
+    model = SessionStore.get_model_class()
+    now = timezone.now()
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        keys = list(model.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size])
+        if not keys:
+            break
+        deleted += model.objects.filter(session_key__in=keys).delete()[0]
+        batches += 1
+    return deleted
+
+
+def _to_entry(user):
+    """What is cached for ``user``: every column but the password, and the session auth hashes."""
+    return {
+        'fields': {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields if field.attname != 'password'
+        },
+        'auth_hash': user.get_session_auth_hash(),
+        'fallback_auth_hashes': list(user.get_session_auth_fallback_hash()),
+    }
+
+
+def _from_entry(entry):
+    fields = entry['fields']
+    user = get_user_model().from_db(DEFAULT_DB_ALIAS, list(fields), list(fields.values()))
+    user.get_session_auth_hash = lambda: entry['auth_hash']
+    user.get_session_auth_fallback_hash = lambda: iter(entry['fallback_auth_hashes'])
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` that reads the user of a session (or signed token) from the cache.
+
+    ``ModelBackend`` stays listed after it in AUTHENTICATION_BACKENDS so
+    that sessions signed in through it remain valid. A failed password check
+    here raises ``PermissionDenied`` to stop ``authenticate()`` from hashing
+    the password again in ``ModelBackend``.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None and password is not None:
+            raise PermissionDenied
+        return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        user = await super().aauthenticate(request, username=username, password=password, **kwargs)
+        if user is None and password is not None:
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        cache = _cache()
+        entry = cache.get(_user_key(user_id))
+        if entry is not None:
+            return _from_entry(entry)
+        user = super().get_user(user_id)
+        if user is not None:
+            cache.set(_user_key(user_id), _to_entry(user))
+        return user
+
+    async def aget_user(self, user_id):
+        cache = _cache()
+        entry = await cache.aget(_user_key(user_id))
+        if entry is not None:
+            return _from_entry(entry)
+        user = await super().aget_user(user_id)
+        if user is not None:
+            await cache.aset(_user_key(user_id), _to_entry(user))
+        return user
+
+
+def forget_user(user_id):
+    """
+    Drop the cached user now, and again once the transaction commits: a
+    request that reads the old row before the commit may cache it again.
+    """
+    _cache().delete(_user_key(user_id))
+    transaction.on_commit(lambda: _cache().delete(_user_key(user_id)))
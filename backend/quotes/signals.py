@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import list_cache, sessions, stats, storage
+from .models import IntegrationLog, Quote
+
+
+@receiver([post_save, post_delete], sender=Quote)
+def quote_changed(sender, instance, **kwargs):
+    list_cache.invalidate_quotes([instance.submitted_by_id])
+
+
+@receiver(post_save, sender=Quote)
+def quote_created(sender, instance, created, **kwargs):
+    if created:
+        stats.record_quotes_created([instance])
+
+
+@receiver(post_save, sender=Quote)
+def quote_document_changed(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_document', None) or ''
+    current = instance.supporting_document.name or ''
+    if loaded != current:
+        storage.release(loaded)
+        storage.retain(current)
+        instance._loaded_document = current
+
+
+@receiver(post_delete, sender=Quote)
+def quote_deleted(sender, instance, **kwargs):
+    stats.record_quotes_deleted([instance])
+    storage.release(instance.supporting_document.name)
+
+
+# post_save only: a delete receiver would stop Django from deleting logs with one DELETE per batch.
+# The paths that delete logs (quotes.retention) invalidate once per batch themselves.
+@receiver(post_save, sender=IntegrationLog)
+def log_changed(sender, instance, **kwargs):
+    list_cache.invalidate_logs([instance.user_id])
+
+
+@receiver(post_save, sender=IntegrationLog)
+def log_created(sender, instance, created, **kwargs):
+    if created:
+        stats.record_logs([instance])
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    sessions.forget_user(instance.pk)
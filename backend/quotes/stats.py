@@ -0,0 +1,158 @@
+"""
+Pipeline statistics kept in summary tables.
+
+``PipelineCounter`` holds the totals per status ('status:<value>') and per
+counted log action ('action:<ACTION>'); ``SalesRepStats`` holds one row per
+submitter. The write paths call the ``record_*`` functions inside their own
+transaction, so the counters commit or roll back with the change itself.
+``rebuild`` recomputes everything from the quote and log tables.
+
+Every quote creation and status change updates the same few counters, and
+an updated row stays locked until the writer commits. Each counter is
+therefore split over ``PIPELINE_COUNTER_SHARDS`` rows: a write adds to one
+picked at random and a read sums them, so concurrent writers rarely wait
+for each other.
+"""
+import random
+from collections import Counter
+
+from django.conf import settings
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import IntegrationLog, PipelineCounter, Quote, SalesRepStats
+from .status import ALLOWED_STATUSES, CONVERTED
+
+COUNTED_ACTIONS = ['ERP_SUCCESS', 'ERP_FAILURE', 'STATUS']
+
+
+def _increment(model, lookup, deltas):
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first.
+        model.objects.filter(**lookup).update(**changes)
+
+
+def _apply(counters, reps):
+    # Sorted so concurrent transactions lock the counter rows in the same order.
+    for name, delta in sorted(counters.items()):
+        if delta:
+            shard = random.randrange(settings.PIPELINE_COUNTER_SHARDS)
+            _increment(PipelineCounter, {'name': name, 'shard': shard}, {'value': delta})
+    for user_id, deltas in sorted(reps.items()):
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if deltas:
+            _increment(SalesRepStats, {'user_id': user_id}, deltas)
+
+
+def record_quotes_created(quotes):
+    counters = Counter()
+    reps = {}
+    for quote in quotes:
+        counters[f'status:{quote.status}'] += 1
+        rep = reps.setdefault(quote.submitted_by_id, Counter())
+        rep['quotes'] += 1
+        rep['converted'] += quote.status == CONVERTED
+    _apply(counters, reps)
+
+
+def record_status_changes(changes):
+    """``changes`` is an iterable of (quote, old_status, new_status)."""
+    counters = Counter()
+    reps = {}
+    for quote, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        counters[f'status:{old_status}'] -= 1
+        counters[f'status:{new_status}'] += 1
+        converted = (new_status == CONVERTED) - (old_status == CONVERTED)
+        if converted:
+            reps.setdefault(quote.submitted_by_id, Counter())['converted'] += converted
+    _apply(counters, reps)
+
+
+def record_quotes_deleted(quotes):
+    counters = Counter()
+    reps = {}
+    for quote in quotes:
+        counters[f'status:{quote.status}'] -= 1
+        rep = reps.setdefault(quote.submitted_by_id, Counter())
+        rep['quotes'] -= 1
+        rep['converted'] -= quote.status == CONVERTED
+    _apply(counters, reps)
+
+
+def record_logs(entries):
+    counters = Counter(f'action:{entry.action}' for entry in entries if entry.action in COUNTED_ACTIONS)
+    _apply(counters, {})
+
+
+def record_logs_deleted(actions):
+    """``actions`` holds the action of every deleted log."""
+    counters = Counter()
+    for action in actions:
+        if action in COUNTED_ACTIONS:
+            counters[f'action:{action}'] -= 1
+    _apply(counters, {})
+
+
+def rebuild():
+    """Recompute every summary row from the quote and log tables."""
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Hold off concurrent increments until the recomputed rows are committed.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'LOCK TABLE "{PipelineCounter._meta.db_table}", "{SalesRepStats._meta.db_table}" IN EXCLUSIVE MODE'
+                )
+        PipelineCounter.objects.all().delete()
+        SalesRepStats.objects.all().delete()
+
+        counters = [
+            PipelineCounter(name=f'status:{row["status"]}', value=row['count'])
+            for row in Quote.objects.order_by().values('status').annotate(count=Count('id'))
+        ]
+        counters += [
+            PipelineCounter(name=f'action:{row["action"]}', value=row['count'])
+            for row in IntegrationLog.objects.filter(action__in=COUNTED_ACTIONS)
+            .order_by().values('action').annotate(count=Count('id'))
+        ]
+        PipelineCounter.objects.bulk_create(counters)
+        SalesRepStats.objects.bulk_create(
+            SalesRepStats(user_id=row['submitted_by'], quotes=row['quotes'], converted=row['converted'])
+            for row in Quote.objects.order_by().values('submitted_by').annotate(
+                quotes=Count('id'), converted=Count('id', filter=Q(status=CONVERTED))
+            )
+        )
+    return len(counters)
+
+
+def summary():
+    """The dashboard payload, read from the summary tables only."""
+    counters = dict(PipelineCounter.objects.order_by().values('name').annotate(total=Sum('value')).values_list('name', 'total'))
+    by_status = {value: counters.get(f'status:{value}', 0) for value in ALLOWED_STATUSES}
+    total = sum(by_status.values())
+    erp_success = counters.get('action:ERP_SUCCESS', 0)
+    erp_failure = counters.get('action:ERP_FAILURE', 0)
+    return {
+        'total_quotes': total,
+        'quotes_by_status': by_status,
+        'conversion_rate': round(by_status[CONVERTED] / total, 4) if total else 0.0,
+        'status_changes': counters.get('action:STATUS', 0),
+        'erp': {
+            'success': erp_success,
+            'failure': erp_failure,
+            'success_rate': round(erp_success / (erp_success + erp_failure), 4) if erp_success + erp_failure else None,
+        },
+        'by_sales_rep': [
+            {'user_id': row['user_id'], 'username': row['user__username'], 'quotes': row['quotes'], 'converted': row['converted']}
+            for row in SalesRepStats.objects.filter(quotes__gt=0).order_by('-quotes', 'user_id')
+            .values('user_id', 'user__username', 'quotes', 'converted')
+        ],
+    }
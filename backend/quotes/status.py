@@ -0,0 +1,25 @@
+from .models import Quote
+
+STATUS_CHOICES = Quote._meta.get_field('status').choices
+ALLOWED_STATUSES = [value for value, label in STATUS_CHOICES]
+CONVERTED = 'Converted'
+# Statuses that produce an ERP order once a quote moves into them.
+ERP_TRIGGER_STATUSES = ['Approved', CONVERTED]
+
+
+def normalize_status(value):
+    """Map a submitted status (stored value or display label) to the stored value, or None if unknown."""
+    for stored, label in STATUS_CHOICES:
+        if value in (stored, label):
+            return stored
+    return None
+
+
+def transition_error(quote, new_status):
+    """Return why ``quote`` cannot move to ``new_status``, or None if the transition is allowed."""
+    if new_status == CONVERTED:
+        if quote.status != 'Approved':
+            return 'Quote must be approved before it can be converted.'
+        if not quote.supporting_document:
+            return 'A supporting document is required for conversion.'
+    return None
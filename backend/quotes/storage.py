@@ -0,0 +1,174 @@
+"""
+Content-addressable storage for quote documents.
+
+Every document is stored once, under ``quotes/blobs/<aa>/<sha256><ext>``,
+whatever name it was uploaded with. Saving content that is already stored
+skips the write. ``DocumentBlob`` rows count how many quotes reference
+each blob; the Quote signals (and ``QuoteQuerySet`` for bulk writes) keep
+them current and ``gc_documents`` deletes blobs nothing references any
+more.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+BLOB_PREFIX = 'quotes/blobs'
+READ_SIZE = 64 * 1024
+
+
+def document_storage():
+    return storages['documents']
+
+
+def blob_name(digest, extension):
+    return f'{BLOB_PREFIX}/{digest[:2]}/{digest}{extension.lower()}'
+
+
+class HashedFile(File):
+    """A file whose SHA-256 the server computed itself while receiving it (quotes.uploads)."""
+
+    def __init__(self, file, sha256, name=None):
+        super().__init__(file, name)
+        self.sha256 = sha256
+
+
+def content_digest(content):
+    """SHA-256 of a File's content. Only a ``HashedFile`` skips the hashing."""
+    if isinstance(content, HashedFile):
+        return content.sha256
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(READ_SIZE):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = content_digest(content)
+        name = blob_name(digest, os.path.splitext(name or '')[1])
+        # Touch the row before looking at the file: gc_documents re-checks it under a row lock,
+        # so a blob being reused here is never collected underneath us.
+        _touch_blob(digest, name, content.size)
+        if not self.exists(name):
+            self._write(name, content)
+        return name
+
+    def _write(self, name, content):
+        # Written to a temporary file and renamed into place: concurrent writers of the same blob
+        # both produce identical bytes, and a reader never sees a partial file.
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks(READ_SIZE):
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def _touch_blob(digest, name, size):
+    from .models import DocumentBlob
+    if DocumentBlob.objects.filter(name=name).update(updated_at=timezone.now()):
+        return
+    try:
+        with transaction.atomic():
+            DocumentBlob.objects.create(name=name, sha256=digest, size=size)
+    except IntegrityError:
+        # Registered concurrently by another request.
+        DocumentBlob.objects.filter(name=name).update(updated_at=timezone.now())
+
+
+def retain(name, count=1):
+    from .models import DocumentBlob
+    if name and count:
+        DocumentBlob.objects.filter(name=name).update(ref_count=F('ref_count') + count)
+
+
+def release(name, count=1):
+    from .models import DocumentBlob
+    if name and count:
+        DocumentBlob.objects.filter(name=name).update(ref_count=F('ref_count') - count)
+
+
+def recount():
+    """Recompute every blob's reference count from the quote table. Returns the number of blobs updated."""
+    from .models import DocumentBlob, Quote
+    with transaction.atomic():
+        counts = dict(
+            Quote.objects.filter(supporting_document__startswith=f'{BLOB_PREFIX}/')
+            .order_by().values_list('supporting_document').annotate(count=Count('id'))
+        )
+        changed = []
+        for blob in DocumentBlob.objects.select_for_update():
+            if blob.ref_count != counts.get(blob.name, 0):
+                blob.ref_count = counts.get(blob.name, 0)
+                changed.append(blob)
+        DocumentBlob.objects.bulk_update(changed, ['ref_count'])
+    return len(changed)
+
+
+def collect_garbage(older_than, dry_run=False):
+    """
+    Delete unreferenced blobs last touched before ``older_than`` (the grace
+    period covers uploads whose quote has not committed yet), then blob
+    files that have no row at all, e.g. from a rolled-back upload. Returns
+    (blobs deleted, bytes freed).
+    """
+    from .models import DocumentBlob
+    storage = document_storage()
+    deleted = freed = 0
+    candidates = DocumentBlob.objects.filter(ref_count__lte=0, updated_at__lt=older_than).values_list('pk', flat=True)
+    for pk in list(candidates):
+        with transaction.atomic():
+            blob = DocumentBlob.objects.select_for_update().filter(
+                pk=pk, ref_count__lte=0, updated_at__lt=older_than
+            ).first()
+            if blob is None:
+                continue
+            deleted += 1
+            freed += blob.size
+            if dry_run:
+                continue
+            blob.delete()
+            storage.delete(blob.name)
+
+    known = set(DocumentBlob.objects.values_list('name', flat=True))
+    cutoff = older_than.timestamp()
+    for name in _blob_files(storage):
+        path = storage.path(name)
+        if name in known or os.path.getmtime(path) >= cutoff:
+            continue
+        deleted += 1
+        freed += os.path.getsize(path)
+        if not dry_run:
+            storage.delete(name)
+    return deleted, freed
+
+
+def _blob_files(storage):
+    if not storage.exists(BLOB_PREFIX):
+        return
+    for directory in storage.listdir(BLOB_PREFIX)[0]:
+        for filename in storage.listdir(f'{BLOB_PREFIX}/{directory}')[1]:
+            yield f'{BLOB_PREFIX}/{directory}/{filename}'
@@ -1,11 +1,70 @@
 
-from django.urls import reverse
-from rest_framework.test import APITestCase, APIClient
+from django.urls import resolve, reverse
+from rest_framework.test import APITestCase, APIClient, APITransactionTestCase
 from rest_framework import status
 from django.contrib.auth.models import User
-from .models import Quote
-from io import BytesIO
+from .models import Quote, IntegrationLog, IntegrationOutbox, PipelineCounter, UploadSession, DocumentBlob
+from .storage import ContentAddressedStorage, document_storage
+from .integrations import BulkheadFullError, CircuitBreaker, CircuitOpenError, IntegrationClient, IntegrationError, get_client, reset_clients
+from . import (
+    audit, checks, instrumentation, list_cache, loadtest, metrics, partitioning, retention, search, sessions, stats,
+    throttling, tokens, uploads,
+)
+from .outbox import claim_batch, deliver, drain, enqueue_erp_order
+from .views import QuoteViewSet, IntegrationLogViewSet
+from .renderers import FastJSONRenderer
+from .serializers import IntegrationLogSerializer, QuoteSerializer
+import csv
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import shutil
+from datetime import date, timedelta
+import tempfile
+import threading
+import time
+import uuid
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+import requests
+from asgiref.sync import iscoroutinefunction
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from types import SimpleNamespace
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import caches
+from django.conf import settings
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from takehome.openapi import generate
+
+# List responses are only cached in ListCacheTest; elsewhere they would leak between tests,
+# since on_commit invalidation never fires inside TestCase. The auth and throttle caches get directories of their own.
+_cache_dir = tempfile.mkdtemp()
+_no_list_cache = override_settings(CACHES={
+    **settings.CACHES,
+    'lists': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'auth': {**settings.CACHES['auth'], 'LOCATION': os.path.join(_cache_dir, 'auth')},
+    'throttle': {**settings.CACHES['throttle'], 'LOCATION': os.path.join(_cache_dir, 'throttle')},
+})
+
+
+def setUpModule():
+    _no_list_cache.enable()
+
+
+def tearDownModule():
+    _no_list_cache.disable()
+    shutil.rmtree(_cache_dir, ignore_errors=True)
+
 
 class QuoteFileUploadTest(APITestCase):
     def setUp(self):
@@ -33,3 +92,1779 @@ class QuoteFileUploadTest(APITestCase):
         response = self.client.post(url, {'supporting_document': file}, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('File type not allowed.', str(response.data))
+
+
+class CursorPaginationTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.client = APIClient()
+        self.client.login(username='admin', password='adminpass')
+        for i in range(5):
+            quote = Quote.objects.create(
+                opportunity_id=f'OPP-{i}',
+                customer_name='Customer',
+                customer_email='customer@email.com',
+                submitted_by=self.admin
+            )
+            IntegrationLog.objects.create(user=self.admin, quote=quote, action='STATUS', status='Approved', payload={})
+
+    def _walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_quotes_walk_all_pages_newest_first(self):
+        ids = self._walk(reverse('quote-list') + '?page_size=2')
+        expected = list(Quote.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_log_actions_are_paginated(self):
+        quote = Quote.objects.first()
+        response = self.client.get(reverse('log-by-quote') + f'?quote_id={quote.id}&page_size=1')
+        self.assertEqual(len(response.data['results']), 1)
+        ids = self._walk(reverse('log-by-action') + '?action=STATUS&page_size=2')
+        self.assertEqual(len(ids), 5)
+
+    def test_approximate_total_is_opt_in(self):
+        response = self.client.get(reverse('log-list'))
+        self.assertNotIn('approximate_total', response.data)
+        response = self.client.get(reverse('log-list') + '?include_total=true')
+        self.assertEqual(response.data['approximate_total'], 5)
+
+
+class QueryPlanTest(APITestCase):
+    """
+    Every viewset access path must be served by an index. The plans are
+    checked on SQLite. PostgreSQL's cost-based planner rightly scans tables
+    this small sequentially, so there the test checks that the indexes exist
+    and are valid instead of forcing a plan.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.users = [User.objects.create_user(username=f'sales{i}', password='pass') for i in range(4)]
+        quotes = Quote.objects.bulk_create(
+            Quote(
+                opportunity_id=f'OPP-{i}',
+                customer_name='Customer',
+                customer_email='customer@email.com',
+                submitted_by=self.users[i % len(self.users)]
+            )
+            for i in range(200)
+        )
+        IntegrationLog.objects.bulk_create(
+            IntegrationLog(
+                user=quote.submitted_by,
+                quote=quote,
+                action=action,
+                status=quote.status,
+                payload={}
+            )
+            for quote in quotes for action in ('CREATE', 'STATUS')
+        )
+
+    def _get_queryset(self, viewset_class, user):
+        view = viewset_class(request=SimpleNamespace(user=user), format_kwarg=None)
+        return view.get_queryset()
+
+    def assertIndexed(self, queryset):
+        if connection.vendor != 'sqlite':
+            return
+        plan = queryset[:50].explain()
+        self.assertNotRegex(plan, r'SCAN quotes_\w+(?! USING)\b|USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_postgres_indexes_are_valid(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('PostgreSQL only')
+        names = {index.name for model in (Quote, IntegrationLog) for index in model._meta.indexes}
+        names.add('quote_search_idx')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                'WHERE c.relname = ANY(%s) AND i.indisvalid AND i.indisready',
+                [sorted(names)]
+            )
+            valid = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(valid, names)
+
+    def test_quote_querysets_use_indexes(self):
+        for user in (self.admin, self.users[0]):
+            with self.subTest(is_staff=user.is_staff):
+                self.assertIndexed(self._get_queryset(QuoteViewSet, user))
+
+    def test_log_querysets_use_indexes(self):
+        quote = Quote.objects.first()
+        for user in (self.admin, self.users[0]):
+            queryset = self._get_queryset(IntegrationLogViewSet, user)
+            with self.subTest(is_staff=user.is_staff, path='list'):
+                self.assertIndexed(queryset)
+            with self.subTest(is_staff=user.is_staff, path='by_quote'):
+                self.assertIndexed(queryset.filter(quote_id=quote.id))
+            with self.subTest(is_staff=user.is_staff, path='by_action'):
+                self.assertIndexed(queryset.filter(action='STATUS'))
+
+
+class QueryBudgetTest(APITestCase):
+    """Query counts per endpoint must stay flat no matter how many rows come back."""
+
+    # The session and user come from the auth cache (quotes.sessions) once the first request has
+    # loaded them; collections add one aggregate query for their ETag.
+    BUDGETS = {
+        'quote-list': 2,
+        'quote-detail': 1,
+        'log-list': 2,
+        'log-by-quote': 2,
+        'log-by-action': 2,
+        'user-info': 0,
+    }
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.client = APIClient()
+        self.client.login(username='admin', password='adminpass')
+        self.client.get(reverse('user-info'))
+        self.quote = self._seed(1)[0]
+
+    def _seed(self, count):
+        quotes = Quote.objects.bulk_create(
+            Quote(
+                opportunity_id=f'OPP-{i}',
+                customer_name='Customer',
+                customer_email='customer@email.com',
+                submitted_by=User.objects.create_user(username=f'sales-{Quote.objects.count()}-{i}')
+            )
+            for i in range(count)
+        )
+        IntegrationLog.objects.bulk_create(
+            IntegrationLog(user=quote.submitted_by, quote=quote, action='STATUS', status=quote.status, payload={})
+            for quote in quotes
+        )
+        return quotes
+
+    def _urls(self):
+        return {
+            'quote-list': reverse('quote-list'),
+            'quote-detail': reverse('quote-detail', args=[self.quote.id]),
+            'log-list': reverse('log-list'),
+            'log-by-quote': reverse('log-by-quote') + f'?quote_id={self.quote.id}',
+            'log-by-action': reverse('log-by-action') + '?action=STATUS',
+            'user-info': reverse('user-info'),
+        }
+
+    def assertQueryBudget(self, name, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(
+            len(queries), self.BUDGETS[name],
+            f'{name} ran {len(queries)} queries:\n' + '\n'.join(q['sql'] for q in queries)
+        )
+        return len(queries)
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        small = {name: self.assertQueryBudget(name, url) for name, url in self._urls().items()}
+        self._seed(40)
+        large = {name: self.assertQueryBudget(name, url) for name, url in self._urls().items()}
+        self.assertEqual(small, large)
+
+
+@override_settings(OUTBOX_BACKOFF_BASE_SECONDS=0, OUTBOX_MAX_ATTEMPTS=2)
+class IntegrationOutboxTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.client = APIClient()
+        self.client.login(username='admin', password='adminpass')
+        self.quote = Quote.objects.create(
+            opportunity_id='OPP-1',
+            customer_name='Customer',
+            customer_email='customer@email.com',
+            submitted_by=self.admin
+        )
+        reset_clients()
+        self.addCleanup(reset_clients)
+
+    def _erp_response(self, ok=True):
+        response = mock.Mock()
+        if ok:
+            response.json.return_value = {'message': 'Order received by ERP mock!'}
+        else:
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError('503 Server Error')
+        return response
+
+    def test_set_status_enqueues_without_calling_erp(self):
+        url = reverse('quote-set-status', args=[self.quote.id])
+        with mock.patch.object(requests.Session, 'post') as post:
+            response = self.client.post(url, {'status': 'Approved'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        post.assert_not_called()
+        job = IntegrationOutbox.objects.get()
+        self.assertEqual(job.status, IntegrationOutbox.PENDING)
+        self.assertEqual(job.payload['status'], 'Approved')
+
+    def test_worker_delivers_and_logs_success(self):
+        enqueue_erp_order(self.admin, self.quote)
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch.object(requests.Session, 'post', return_value=self._erp_response()):
+            call_command('process_outbox', once=True, stdout=StringIO())
+        self.assertEqual(IntegrationOutbox.objects.get().status, IntegrationOutbox.DONE)
+        self.assertTrue(IntegrationLog.objects.filter(action='ERP_SUCCESS', quote=self.quote).exists())
+
+    def test_failures_retry_then_dead_letter(self):
+        job = enqueue_erp_order(self.admin, self.quote)
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch.object(requests.Session, 'post', return_value=self._erp_response(ok=False)):
+            self.assertEqual(drain(10), (0, 1))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (IntegrationOutbox.PENDING, 1))
+            self.assertEqual(drain(10), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, IntegrationOutbox.DEAD)
+        self.assertTrue(IntegrationLog.objects.filter(action='ERP_FAILURE', quote=self.quote).exists())
+
+    def test_open_circuit_reschedules_without_using_an_attempt(self):
+        job = enqueue_erp_order(self.admin, self.quote)
+        breaker = get_client('ERP').breaker
+        breaker._opened_at = time.monotonic() - (breaker.reset_timeout - 30)
+        with mock.patch.object(requests.Session, 'post') as post:
+            self.assertEqual(drain(10), (0, 1))
+        post.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (IntegrationOutbox.PENDING, 0))
+        self.assertGreater(job.next_attempt_at, timezone.now() + timedelta(seconds=25))
+        self.assertFalse(IntegrationLog.objects.filter(action='ERP_FAILURE').exists())
+
+    def test_jobs_for_a_quote_are_delivered_in_order(self):
+        first = enqueue_erp_order(self.admin, self.quote)
+        second = enqueue_erp_order(self.admin, self.quote)
+        self.assertEqual([job.id for job in claim_batch(10)], [first.id])
+        self.assertEqual(claim_batch(10), [])
+        with mock.patch.object(requests.Session, 'post', return_value=self._erp_response()):
+            deliver(IntegrationOutbox.objects.get(id=first.id))
+        self.assertEqual([job.id for job in claim_batch(10)], [second.id])
+
+
+class IntegrationClientTest(SimpleTestCase):
+    def _client(self, **kwargs):
+        options = dict(connect_timeout=1, read_timeout=1, pool_size=2, max_in_flight=2, failure_threshold=2, reset_timeout=60)
+        options.update(kwargs)
+        return IntegrationClient('ERP', **options)
+
+    def test_circuit_opens_after_threshold_and_fails_fast(self):
+        client = self._client()
+        with mock.patch.object(client.session, 'post', side_effect=requests.exceptions.ConnectionError('refused')) as post:
+            for _ in range(2):
+                with self.assertRaises(IntegrationError):
+                    client.post('http://erp.local/orders/', json={})
+            with self.assertRaises(CircuitOpenError) as ctx:
+                client.post('http://erp.local/orders/', json={})
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(ctx.exception.state['circuit'], CircuitBreaker.OPEN)
+
+    def test_half_open_allows_a_single_trial(self):
+        client = self._client(reset_timeout=0)
+        client.breaker.record_failure()
+        client.breaker.record_failure()
+        self.assertEqual(client.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(client.breaker.allow())
+        self.assertFalse(client.breaker.allow())
+        client.breaker.record_success()
+        self.assertEqual(client.state()['circuit'], CircuitBreaker.CLOSED)
+
+    def test_unexpected_error_does_not_keep_the_half_open_trial(self):
+        client = self._client(reset_timeout=0)
+        client.breaker.record_failure()
+        client.breaker.record_failure()
+        with mock.patch.object(client.session, 'post', side_effect=TypeError('not serializable')):
+            with self.assertRaises(TypeError):
+                client.post('http://erp.local/orders/', json={})
+        self.assertTrue(client.breaker.allow())
+
+    def test_client_errors_do_not_trip_the_circuit(self):
+        client = self._client(failure_threshold=1)
+        response = mock.Mock(status_code=400)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError('400 Client Error', response=response)
+        with mock.patch.object(client.session, 'post', return_value=response):
+            with self.assertRaises(IntegrationError):
+                client.post('http://erp.local/orders/', json={})
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_bulkhead_rejects_calls_beyond_limit(self):
+        client = self._client(max_in_flight=1)
+        client._bulkhead.acquire()
+        with self.assertRaises(BulkheadFullError):
+            client.post('http://erp.local/orders/', json={})
+
+
+class BulkSetStatusTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.client = APIClient()
+        self.client.login(username='admin', password='adminpass')
+        self.url = reverse('quote-bulk-set-status')
+
+    def _quotes(self, count, **kwargs):
+        return Quote.objects.bulk_create(
+            Quote(
+                opportunity_id=f'OPP-{i}',
+                customer_name='Customer',
+                customer_email='customer@email.com',
+                submitted_by=self.admin,
+                **kwargs
+            )
+            for i in range(count)
+        )
+
+    def test_bulk_approve_writes_logs_and_outbox_jobs(self):
+        ids = [quote.id for quote in self._quotes(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'ids': ids, 'status': 'Approved'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(Quote.objects.filter(status='Approved').count(), 3)
+        self.assertEqual(IntegrationLog.objects.filter(action='STATUS').count(), 3)
+        self.assertEqual(IntegrationOutbox.objects.count(), 3)
+
+    def test_conversion_rules_are_reported_per_id(self):
+        approved_with_doc = self._quotes(1, status='Approved', supporting_document='quotes/a.pdf')[0]
+        approved_without_doc = self._quotes(1, status='Approved')[0]
+        pending = self._quotes(1)[0]
+        ids = [approved_with_doc.id, approved_without_doc.id, pending.id, 999999]
+        response = self.client.post(self.url, {'ids': ids, 'status': 'Converted to Order'}, format='json')
+        errors = {row['id']: row['error'] for row in response.data['results']}
+        self.assertIsNone(errors[approved_with_doc.id])
+        self.assertEqual(errors[approved_without_doc.id], 'A supporting document is required for conversion.')
+        self.assertEqual(errors[pending.id], 'Quote must be approved before it can be converted.')
+        self.assertEqual(errors[999999], 'Quote not found.')
+        self.assertEqual(Quote.objects.get(id=approved_with_doc.id).status, 'Converted')
+        self.assertEqual(Quote.objects.get(id=pending.id).status, 'Pending Review')
+
+    # One shard, so the warm-up creates every counter row the measured requests update.
+    @override_settings(PIPELINE_COUNTER_SHARDS=1)
+    def test_query_count_does_not_depend_on_batch_size(self):
+        # Warm up: the first transition also creates the pipeline counter rows.
+        self.client.post(self.url, {'ids': [self._quotes(1)[0].id], 'status': 'Approved'}, format='json')
+        counts = []
+        for size in (2, 50):
+            ids = [quote.id for quote in self._quotes(size)]
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(self.url, {'ids': ids, 'status': 'Approved'}, format='json')
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_sales_users_cannot_bulk_update(self):
+        User.objects.create_user(username='sales', password='salespass')
+        self.client.login(username='sales', password='salespass')
+        response = self.client.post(self.url, {'ids': [1], 'status': 'Approved'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class QuoteStatusConcurrencyTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.client.login(username='admin', password='adminpass')
+        self.quote = Quote.objects.create(
+            opportunity_id='OPP-1', customer_name='Customer', customer_email='customer@email.com', submitted_by=self.admin
+        )
+        self.url = reverse('quote-set-status', args=[self.quote.id])
+
+    def _set_status(self, new_status, **headers):
+        return self.client.post(self.url, {'status': new_status}, format='json', **headers)
+
+    def test_matching_if_match_applies_and_returns_the_new_etag(self):
+        etag = self.client.get(reverse('quote-detail', args=[self.quote.id]))['ETag']
+        response = self._set_status('Approved', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response['ETag'], self.client.get(reverse('quote-detail', args=[self.quote.id]))['ETag'])
+        self.assertEqual(Quote.objects.get(id=self.quote.id).version, 2)
+
+    def test_stale_if_match_returns_412(self):
+        etag = self.client.get(reverse('quote-detail', args=[self.quote.id]))['ETag']
+        self.assertEqual(self._set_status('Rejected').status_code, status.HTTP_200_OK)
+        response = self._set_status('Approved', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Quote.objects.get(id=self.quote.id).status, 'Rejected')
+        self.assertFalse(IntegrationOutbox.objects.exists())
+
+    def test_change_between_read_and_write_returns_409(self):
+        def concurrent_change(quote, new_status):
+            Quote.objects.filter(id=quote.id).update(status='Rejected', version=quote.version + 1)
+            return None
+
+        with mock.patch('quotes.views.quotes.transition_error', side_effect=concurrent_change):
+            response = self._set_status('Approved')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Quote.objects.get(id=self.quote.id).status, 'Rejected')
+        self.assertFalse(IntegrationOutbox.objects.exists())
+        self.assertFalse(IntegrationLog.objects.filter(action='STATUS').exists())
+
+    def test_update_writes_only_the_changed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._set_status('Approved')
+        update = next(q['sql'] for q in queries if q['sql'].startswith('UPDATE "quotes_quote"'))
+        self.assertNotIn('customer_name', update)
+        self.assertIn('"version"', update.split('WHERE')[1])
+
+    def test_save_increments_the_version_in_the_database(self):
+        first, second = Quote.objects.get(id=self.quote.id), Quote.objects.get(id=self.quote.id)
+        first.save()
+        second.save(update_fields=['customer_name'])
+        self.assertEqual((first.version, second.version), (2, 3))
+
+
+class QuoteStatusRaceTest(APITransactionTestCase):
+    def test_parallel_transitions_apply_once(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Writers to a shared in-memory SQLite database fail instead of waiting for each other.')
+        admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        quote = Quote.objects.create(
+            opportunity_id='OPP-1', customer_name='Customer', customer_email='customer@email.com', submitted_by=admin
+        )
+        workers = 4
+        # Every request has read the quote before any of them writes.
+        read_barrier = threading.Barrier(workers, timeout=10)
+
+        def transition_after_all_reads(*args):
+            read_barrier.wait()
+            return None
+
+        codes = []
+
+        def approve():
+            client = APIClient()
+            client.force_authenticate(admin)
+            try:
+                codes.append(client.post(
+                    reverse('quote-set-status', args=[quote.id]), {'status': 'Approved'}, format='json'
+                ).status_code)
+            finally:
+                connection.close()
+
+        with mock.patch('quotes.views.quotes.transition_error', side_effect=transition_after_all_reads):
+            threads = [threading.Thread(target=approve) for _ in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(codes), [200] + [409] * (workers - 1))
+        self.assertEqual(IntegrationOutbox.objects.filter(quote=quote).count(), 1)
+        self.assertEqual(IntegrationLog.objects.filter(quote=quote, action='STATUS').count(), 1)
+        self.assertEqual(Quote.objects.get(id=quote.id).version, 2)
+
+
+class QuoteImportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sales', password='salespass')
+        self.client = APIClient()
+        self.client.login(username='sales', password='salespass')
+        self.url = reverse('quote-import-quotes')
+
+    def test_csv_import_reports_rejected_lines(self):
+        body = (
+            'opportunity_id,customer_name,customer_email,customer_company\n'
+            'OPP-1,Ada,ada@example.com,ACME\n'
+            'OPP-2,Bob,not-an-email,\n'
+            'OPP-3,Cy,cy@example.com,\n'
+        )
+        response = self.client.post(self.url + '?chunk_size=1', body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual([row['line'] for row in response.data['rejected']], [3])
+        self.assertIn('customer_email', response.data['rejected'][0]['errors'])
+        self.assertEqual(Quote.objects.filter(submitted_by=self.user).count(), 2)
+        self.assertEqual(IntegrationLog.objects.filter(action='CREATE', user=self.user).count(), 2)
+
+    def test_ndjson_import(self):
+        body = (
+            '{"opportunity_id": "OPP-1", "customer_name": "Ada", "customer_email": "ada@example.com"}\n'
+            '\n'
+            'not json\n'
+            '{"opportunity_id": "OPP-2", "customer_name": "Bob", "customer_email": "bob@example.com"}\n'
+        )
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(response.data['rejected'][0]['line'], 3)
+
+    def test_undecodable_line_returns_400_and_keeps_earlier_rows(self):
+        body = (
+            b'opportunity_id,customer_name,customer_email\n'
+            b'OPP-1,Ada,ada@example.com\n'
+            b'OPP-2,Caf\xe9,cafe@example.com\n'
+            b'OPP-3,Cy,cy@example.com\n'
+        )
+        response = self.client.post(self.url, body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['line'], 3)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(list(Quote.objects.values_list('opportunity_id', flat=True)), ['OPP-1'])
+
+    @override_settings(QUOTE_IMPORT_MAX_CHUNK_SIZE=10)
+    def test_chunk_size_is_capped(self):
+        with mock.patch('quotes.views.quotes.import_quotes', return_value={}) as importer:
+            self.client.post(self.url + '?chunk_size=1000000', '', content_type='text/csv')
+        self.assertEqual(importer.call_args.args[3], 10)
+
+    def test_unsupported_content_type(self):
+        response = self.client.post(self.url, '{}', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('opportunity_id,customer_name,customer_email\nOPP-1,Ada,ada@example.com\n')
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command('import_quotes', f.name, user='sales', stdout=out)
+        self.assertIn('Imported 1 quote(s), rejected 0.', out.getvalue())
+
+
+class StreamingExportTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.sales = User.objects.create_user(username='sales', password='salespass')
+        self.client = APIClient()
+        self.client.login(username='admin', password='adminpass')
+        for user in (self.admin, self.sales):
+            quote = Quote.objects.create(
+                opportunity_id=f'OPP-{user.username}',
+                customer_name='Customer',
+                customer_email='customer@email.com',
+                submitted_by=user
+            )
+            IntegrationLog.objects.create(user=user, quote=quote, action='CREATE', status=quote.status, payload={'a': 1})
+            IntegrationLog.objects.create(user=user, quote=quote, action='STATUS', status=quote.status, payload={'b': [2]})
+
+    def _lines(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_log_export_matches_list_shape(self):
+        exported = self._lines(self.client.get(reverse('log-export')))
+        listed = self.client.get(reverse('log-list')).json()['results']
+        self.assertEqual(exported, listed)
+
+    def test_quote_export_matches_list_shape(self):
+        exported = self._lines(self.client.get(reverse('quote-export')))
+        listed = self.client.get(reverse('quote-list')).json()['results']
+        self.assertEqual(exported, listed)
+
+    def test_csv_export_with_filters(self):
+        response = self.client.get(reverse('log-export') + '?format=csv&action=STATUS')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual([row['action'] for row in rows], ['STATUS', 'STATUS'])
+        self.assertEqual(json.loads(rows[0]['payload']), {'b': [2]})
+
+    def test_date_range_and_visibility(self):
+        tomorrow = (timezone.now() + timedelta(days=1)).date().isoformat()
+        self.assertEqual(self._lines(self.client.get(reverse('log-export') + f'?since={tomorrow}')), [])
+        self.client.login(username='sales', password='salespass')
+        exported = self._lines(self.client.get(reverse('quote-export') + f'?until={tomorrow}'))
+        self.assertEqual([row['submitted_by'] for row in exported], [self.sales.id])
+
+    def test_invalid_date(self):
+        response = self.client.get(reverse('log-export') + '?since=yesterday')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LogRetentionTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sales', password='salespass')
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        logs = IntegrationLog.objects.bulk_create(
+            IntegrationLog(user=self.user, action='STATUS', status='Approved', payload={'n': i}) for i in range(5)
+        )
+        IntegrationLog.objects.filter(id__in=[log.id for log in logs[:3]]).update(
+            created_at=timezone.now() - timedelta(days=400)
+        )
+
+    def test_archives_old_logs_in_batches_and_keeps_recent_ones(self):
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries, \
+                mock.patch.object(list_cache, 'invalidate_logs', wraps=list_cache.invalidate_logs) as invalidate_logs:
+            call_command('archive_logs', older_than_days=180, batch_size=2, archive_dir=self.archive_dir, stdout=out)
+        self.assertIn('Archived 3 log(s)', out.getvalue())
+        # One invalidation and one set-based DELETE per batch, without loading the rows again.
+        self.assertEqual(invalidate_logs.call_count, 2)
+        log_queries = [query['sql'].split()[0] for query in queries if 'FROM "quotes_integrationlog"' in query['sql']]
+        self.assertEqual(log_queries, ['SELECT', 'DELETE'] * 2 + ['SELECT'])
+        self.assertEqual(IntegrationLog.objects.count(), 2)
+        [archive] = os.listdir(self.archive_dir)
+        with gzip.open(os.path.join(self.archive_dir, archive), 'rt') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row['payload'] for row in rows], [{'n': 0}, {'n': 1}, {'n': 2}])
+
+    def test_archiving_keeps_the_pipeline_counters_in_line_with_a_rebuild(self):
+        stats.rebuild()
+        self.assertEqual(stats.summary()['status_changes'], 5)
+        retention.archive_logs(timezone.now() - timedelta(days=180), self.archive_dir, batch_size=2)
+        archived = stats.summary()
+        self.assertEqual(archived['status_changes'], 2)
+        stats.rebuild()
+        self.assertEqual(stats.summary(), archived)
+
+    def test_dry_run_deletes_nothing(self):
+        out = StringIO()
+        call_command('archive_logs', older_than_days=180, dry_run=True, archive_dir=self.archive_dir, stdout=out)
+        self.assertIn('3 log(s)', out.getvalue())
+        self.assertEqual(IntegrationLog.objects.count(), 5)
+        self.assertEqual(os.listdir(self.archive_dir), [])
+
+    def test_partition_month_arithmetic(self):
+        self.assertEqual(partitioning.add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(partitioning.partition_name(date(2025, 2, 1)), 'quotes_integrationlog_p202502')
+
+
+class AuditLogWriterTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sales', password='salespass')
+
+    def _log(self, action='STATUS'):
+        return audit.log(user=self.user, quote=None, action=action, status='Approved', payload={})
+
+    def test_entries_are_written_in_one_insert_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for _ in range(3):
+                    self._log()
+                self.assertEqual(IntegrationLog.objects.count(), 0)
+        self.assertEqual(IntegrationLog.objects.count(), 3)
+
+    def test_single_insert_for_many_entries(self):
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for _ in range(5):
+                        self._log()
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "quotes_integrationlog"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_rolled_back_work_leaves_no_log(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self._log()
+                try:
+                    with transaction.atomic():
+                        self._log(action='UPLOAD')
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+        self.assertEqual(list(IntegrationLog.objects.values_list('action', flat=True)), ['STATUS'])
+
+    def test_request_scope_batches_autocommit_entries(self):
+        outside_transaction = SimpleNamespace(in_atomic_block=False)
+        with audit.request_scope():
+            with mock.patch.object(audit.transaction, 'get_connection', return_value=outside_transaction):
+                self._log()
+                self._log()
+            self.assertEqual(IntegrationLog.objects.count(), 0)
+        self.assertEqual(IntegrationLog.objects.count(), 2)
+
+    @override_settings(AUDIT_LOG_GUARANTEES={'STATUS': audit.IMMEDIATE})
+    def test_immediate_guarantee(self):
+        with transaction.atomic():
+            self._log()
+            self.assertEqual(IntegrationLog.objects.count(), 1)
+
+    @override_settings(AUDIT_LOG_GUARANTEES={'STATUS': audit.BACKGROUND})
+    def test_background_guarantee(self):
+        with mock.patch.object(audit._background_writer, 'put', side_effect=audit._background_writer.queue.put):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._log()
+        audit.flush_background()
+        self.assertEqual(IntegrationLog.objects.count(), 1)
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.client.login(username='admin', password='adminpass')
+        self.quote = Quote.objects.create(
+            opportunity_id='OPP-1', customer_name='Customer', customer_email='customer@email.com', submitted_by=self.admin
+        )
+        IntegrationLog.objects.create(user=self.admin, quote=self.quote, action='STATUS', status='Pending Review', payload={})
+
+    def test_unchanged_collections_return_304_without_serializing(self):
+        for url in [reverse('quote-list'), reverse('log-list'), reverse('log-by-quote') + f'?quote_id={self.quote.id}']:
+            etag = self.client.get(url)['ETag']
+            with mock.patch('rest_framework.serializers.ListSerializer.to_representation') as serialize, \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(response['ETag'], etag)
+            self.assertEqual(len(queries), 1)
+            serialize.assert_not_called()
+
+    def test_changes_invalidate_the_etag(self):
+        url = reverse('quote-list')
+        etag = self.client.get(url)['ETag']
+        self.quote.status = 'Approved'
+        self.quote.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        url = reverse('log-list')
+        etag = self.client.get(url)['ETag']
+        IntegrationLog.objects.create(user=self.admin, quote=self.quote, action='STATUS', status='Approved', payload={})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_deleting_a_row_changes_the_list_validators(self):
+        other = Quote.objects.create(
+            opportunity_id='OPP-2', customer_name='Other', customer_email='other@email.com', submitted_by=self.admin
+        )
+        url = reverse('quote-list')
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        since = http_date(time.time() + 60)
+        other.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, status.HTTP_200_OK)
+
+    def test_detail_validators(self):
+        url = reverse('quote-detail', args=[self.quote.id])
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_etag_differs_per_page_and_filter(self):
+        url = reverse('log-by-action')
+        self.assertNotEqual(self.client.get(url + '?action=STATUS')['ETag'], self.client.get(url + '?action=ERP')['ETag'])
+
+
+@override_settings(CACHES={
+    **settings.CACHES,
+    'lists': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'list-cache-test'},
+})
+class ListCacheTest(APITestCase):
+    def setUp(self):
+        caches['lists'].clear()
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.sales = User.objects.create_user(username='sales', password='salespass')
+        self.quote = Quote.objects.create(
+            opportunity_id='OPP-1', customer_name='Customer', customer_email='customer@email.com', submitted_by=self.sales
+        )
+        self.client.login(username='admin', password='adminpass')
+
+    def test_a_per_process_list_cache_fails_the_system_check_without_debug(self):
+        self.assertEqual([error.id for error in checks.check_shared_caches(None)], ['quotes.E003'])
+        with override_settings(DEBUG=True):
+            self.assertEqual(checks.check_shared_caches(None), [])
+
+    def test_second_request_is_served_from_cache(self):
+        url = reverse('quote-list')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.quote.id])
+        # The session and user come from the auth cache too.
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(self.client.get(reverse('list-cache-stats')).data, {'hits': 1, 'misses': 1})
+
+    def test_keys_are_per_user_and_query(self):
+        url = reverse('quote-list')
+        self.client.get(url)
+        self.client.login(username='sales', password='salespass')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url + '?page_size=1')['X-Cache'], 'MISS')
+
+    def test_writes_invalidate_owner_and_staff_lists(self):
+        url = reverse('quote-list')
+        sales_client = APIClient()
+        sales_client.login(username='sales', password='salespass')
+        self.client.get(url)
+        sales_client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quote.status = 'Approved'
+            self.quote.save()
+        for client in (self.client, sales_client):
+            response = client.get(url)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(response.data['results'][0]['status'], 'Approved')
+
+        url = reverse('log-list')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                audit.log(user=self.sales, quote=self.quote, action='STATUS', status='Approved', payload={})
+        response = self.client.get(url)
+        self.assertEqual((response['X-Cache'], len(response.data['results'])), ('MISS', 1))
+
+    def test_cached_lists_still_answer_conditional_requests(self):
+        url = reverse('log-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['X-Cache']), (status.HTTP_304_NOT_MODIFIED, 'HIT'))
+
+    def test_file_backend(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(CACHES={
+            **settings.CACHES,
+            'lists': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory},
+        }):
+            url = reverse('quote-list')
+            self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+    def test_stats_are_admin_only(self):
+        self.client.login(username='sales', password='salespass')
+        self.assertEqual(self.client.get(reverse('list-cache-stats')).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PipelineStatsTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.sales = User.objects.create_user(username='sales', password='salespass')
+        self.client.login(username='sales', password='salespass')
+        for i in range(3):
+            response = self.client.post(reverse('quote-list'), {
+                'opportunity_id': f'OPP-{i}', 'customer_name': 'Customer', 'customer_email': 'customer@email.com',
+            })
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.login(username='admin', password='adminpass')
+
+    def _set_status(self, quote, new_status):
+        response = self.client.post(reverse('quote-set-status', args=[quote.id]), {'status': new_status}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+    def _stats(self):
+        response = self.client.get(reverse('pipeline-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_counters_follow_the_pipeline_and_match_a_rebuild(self):
+        first, second, third = Quote.objects.order_by('id')
+        with self.captureOnCommitCallbacks(execute=True):
+            self._set_status(first, 'Approved')
+            Quote.objects.filter(id=first.id).update(supporting_document='quotes/po.pdf')
+            self._set_status(first, 'Converted to Order')
+            self.client.post(reverse('quote-bulk-set-status'), {'ids': [second.id, third.id], 'status': 'Rejected'}, format='json')
+            with mock.patch.object(requests.Session, 'post', return_value=mock.Mock(**{'json.return_value': {}})):
+                drain(10)
+
+        stats = self._stats()
+        self.assertEqual(stats['total_quotes'], 3)
+        self.assertEqual(stats['quotes_by_status'], {'Pending Review': 0, 'Approved': 0, 'Rejected': 2, 'Converted': 1})
+        self.assertEqual(stats['conversion_rate'], round(1 / 3, 4))
+        self.assertEqual(stats['status_changes'], 4)
+        self.assertEqual(stats['erp'], {'success': 2, 'failure': 0, 'success_rate': 1.0})
+        self.assertEqual(stats['by_sales_rep'], [{'user_id': self.sales.id, 'username': 'sales', 'quotes': 3, 'converted': 1}])
+
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(self._stats(), stats)
+
+    @override_settings(PIPELINE_COUNTER_SHARDS=4)
+    def test_counters_are_spread_over_shards_and_summed(self):
+        quotes = Quote.objects.order_by('id')
+        with mock.patch('quotes.stats.random.randrange', side_effect=[1, 1, 2, 2, 3, 3]):
+            for quote in quotes:
+                self._set_status(quote, 'Approved')
+        self.assertEqual(
+            sorted(PipelineCounter.objects.filter(name='status:Approved').values_list('shard', 'value')),
+            [(1, 1), (2, 1), (3, 1)]
+        )
+        self.assertEqual(self._stats()['quotes_by_status']['Approved'], 3)
+        self.assertEqual(self._stats()['quotes_by_status']['Pending Review'], 0)
+
+    def test_rolled_back_changes_do_not_count(self):
+        quote = Quote.objects.first()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Quote.objects.create(opportunity_id='OPP-X', customer_name='C', customer_email='c@email.com', submitted_by=self.sales)
+            raise RuntimeError
+        quote.delete()
+        self.assertEqual(self._stats()['total_quotes'], 2)
+
+    def test_read_cost_does_not_grow_with_history(self):
+        def queries():
+            with CaptureQueriesContext(connection) as captured:
+                self._stats()
+            return len(captured)
+
+        queries()  # loads the session and user into the auth cache
+        before = queries()
+        call_command('import_quotes', self._import_file(200), user='sales', stdout=StringIO())
+        self.assertEqual(self._stats()['total_quotes'], 203)
+        self.assertEqual(queries(), before)
+
+    def _import_file(self, rows):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as f:
+            f.write('opportunity_id,customer_name,customer_email\n')
+            f.writelines(f'IMP-{i},Customer,customer@email.com\n' for i in range(rows))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_admin_only(self):
+        self.client.login(username='sales', password='salespass')
+        self.assertEqual(self.client.get(reverse('pipeline-stats')).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SearchIndexMigrationTest(TransactionTestCase):
+    # sqlmigrate needs SQLite's schema editor, which cannot run inside TestCase's transaction.
+    def test_models_match_migrations_and_search_index_is_postgres_only(self):
+        call_command('makemigrations', 'quotes', check=True, dry_run=True, stdout=StringIO())
+        out = StringIO()
+        call_command('sqlmigrate', 'quotes', '0006', stdout=out)
+        if connection.vendor == 'postgresql':
+            self.assertRegex(out.getvalue(), r'CREATE INDEX CONCURRENTLY "quote_search_idx" ON "quotes_quote" USING gin')
+        else:
+            self.assertNotIn('"quote_search_idx"', out.getvalue())
+        self.assertIn('CREATE INDEX', out.getvalue())
+
+
+class QuoteSearchTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.client.login(username='admin', password='adminpass')
+        rows = [
+            ('OPP-100', 'Acme Corp', 'ana@acme.com', 'Acme', 'Approved'),
+            ('OPP-200', 'Globex', 'hank@globex.com', 'Globex', 'Pending Review'),
+            ('ACME-1', 'Initech', 'bill@initech.com', 'Initech', 'Pending Review'),
+        ]
+        self.quotes = {
+            row[0]: Quote.objects.create(
+                opportunity_id=row[0], customer_name=row[1], customer_email=row[2],
+                customer_company=row[3], status=row[4], submitted_by=self.admin
+            )
+            for row in rows
+        }
+
+    def _ids(self, query):
+        response = self.client.get(reverse('quote-list') + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [row['id'] for row in response.data['results']]
+
+    def test_search_matches_text_fields_and_ranks(self):
+        self.assertEqual(self._ids('?search=globex'), [self.quotes['OPP-200'].id])
+        self.assertEqual(self._ids('?search=hank@globex.com'), [self.quotes['OPP-200'].id])
+        # The exact opportunity ID ranks above a customer-name match.
+        self.assertEqual(self._ids('?search=ACME-1')[0], self.quotes['ACME-1'].id)
+        self.assertEqual(set(self._ids('?search=acme')), {self.quotes['OPP-100'].id, self.quotes['ACME-1'].id})
+
+    def test_filters_combine_with_search(self):
+        self.assertEqual(self._ids('?search=acme&status=Approved'), [self.quotes['OPP-100'].id])
+        self.assertEqual(len(self._ids('?status=Pending Review')), 2)
+        tomorrow = (timezone.now() + timedelta(days=1)).date().isoformat()
+        self.assertEqual(self._ids(f'?since={tomorrow}'), [])
+
+    def test_ranked_results_paginate(self):
+        for i in range(5):
+            Quote.objects.create(opportunity_id=f'ACME-{i + 10}', customer_name='Acme', customer_email='x@acme.com', submitted_by=self.admin)
+        ids = []
+        url = reverse('quote-list') + '?search=acme&page_size=2'
+        while url:
+            response = self.client.get(url)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+
+    def test_invalid_filters(self):
+        self.assertEqual(self.client.get(reverse('quote-list') + '?status=Lost').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('quote-list') + '?since=yesterday').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_status_filter_uses_index(self):
+        plan = search.filter_quotes(Quote.objects.order_by('-created_at', '-id'), {'status': 'Approved'})[:50].explain()
+        self.assertIn('quote_status_created_idx', plan)
+
+
+class ResumableUploadTest(APITestCase):
+    PDF = b'%PDF-1.7\n' + b'x' * 3000
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        settings_override = override_settings(
+            UPLOAD_TEMP_DIR=os.path.join(temp_dir, 'parts'), MEDIA_ROOT=os.path.join(temp_dir, 'media')
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='sales', password='salespass')
+        self.client.login(username='sales', password='salespass')
+        self.quote = Quote.objects.create(
+            opportunity_id='OPP-1', customer_name='Customer', customer_email='customer@email.com', submitted_by=self.user
+        )
+
+    def _start(self, size, filename='po.pdf'):
+        response = self.client.post(
+            reverse('quote-start-upload', args=[self.quote.id]), {'filename': filename, 'size': size}, format='json'
+        )
+        return response
+
+    def _chunk_url(self, upload_id):
+        return reverse('quote-upload-chunk', args=[self.quote.id, upload_id])
+
+    def _put(self, upload_id, offset, data):
+        return self.client.put(
+            self._chunk_url(upload_id), data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def _finalize(self, upload_id, **data):
+        return self.client.post(reverse('quote-finalize-upload', args=[self.quote.id, upload_id]), data, format='json')
+
+    def test_chunked_upload_attaches_document(self):
+        upload_id = self._start(len(self.PDF)).data['id']
+        self.assertEqual(self._put(upload_id, 0, self.PDF[:1000]).data['offset'], 1000)
+        # A resume after a dropped connection: ask for the offset, continue from there in another process.
+        self.assertEqual(self.client.get(self._chunk_url(upload_id)).data['offset'], 1000)
+        uploads._hashers.clear()
+        self.assertEqual(self._put(upload_id, 1000, self.PDF[1000:]).data['offset'], len(self.PDF))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._finalize(upload_id, sha256=hashlib.sha256(self.PDF).hexdigest())
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.quote.refresh_from_db()
+        self.assertTrue(self.quote.supporting_document.name.endswith('.pdf'))
+        with self.quote.supporting_document.open('rb') as f:
+            self.assertEqual(f.read(), self.PDF)
+        self.assertTrue(IntegrationLog.objects.filter(quote=self.quote, action='UPLOAD').exists())
+        self.assertFalse(os.listdir(settings.UPLOAD_TEMP_DIR))
+        self.assertEqual(self._finalize(upload_id).status_code, status.HTTP_409_CONFLICT)
+
+    def test_offset_mismatch_and_overflow_are_rejected(self):
+        upload_id = self._start(len(self.PDF)).data['id']
+        response = self._put(upload_id, 10, self.PDF[10:20])
+        self.assertEqual((response.status_code, response.data['offset']), (status.HTTP_409_CONFLICT, 0))
+        response = self._put(upload_id, 0, self.PDF + b'extra')
+        self.assertEqual((response.status_code, response.data['offset']), (status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, 0))
+        self.assertEqual(self._finalize(upload_id).status_code, status.HTTP_409_CONFLICT)
+
+    def test_type_comes_from_magic_bytes(self):
+        upload_id = self._start(100, filename='invoice.pdf').data['id']
+        response = self._put(upload_id, 0, b'MZ' + b'\0' * 98)
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        self.assertEqual(self.client.get(self._chunk_url(upload_id)).data['offset'], 0)
+
+    def test_size_limit_and_checksum(self):
+        self.assertEqual(self._start(5 * 1024 * 1024 + 1).status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        upload_id = self._start(len(self.PDF)).data['id']
+        self._put(upload_id, 0, self.PDF)
+        response = self._finalize(upload_id, sha256='0' * 64)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.quote.refresh_from_db()
+        self.assertFalse(self.quote.supporting_document)
+
+    def test_only_owner_or_admin(self):
+        User.objects.create_user(username='other', password='otherpass')
+        self.client.login(username='other', password='otherpass')
+        self.assertEqual(self._start(10).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stale_sessions_are_purged(self):
+        upload_id = self._start(len(self.PDF)).data['id']
+        UploadSession.objects.filter(pk=upload_id).update(updated_at=timezone.now() - timedelta(days=2))
+        call_command('purge_uploads', stdout=StringIO())
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(os.listdir(settings.UPLOAD_TEMP_DIR))
+
+
+class DocumentStorageTest(APITestCase):
+    PDF = b'%PDF-1.4\nprice sheet\n'
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='sales', password='salespass')
+        self.client.login(username='sales', password='salespass')
+        self.quotes = [
+            Quote.objects.create(
+                opportunity_id=f'OPP-{i}', customer_name='Customer', customer_email='customer@email.com', submitted_by=self.user
+            )
+            for i in range(2)
+        ]
+
+    def _upload(self, quote, content, filename='price-sheet.pdf'):
+        file = SimpleUploadedFile(filename, content, content_type='application/pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('quote-upload-file', args=[quote.id]), {'supporting_document': file}, format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        quote.refresh_from_db()
+        return quote.supporting_document.name
+
+    def _blob(self, name):
+        return DocumentBlob.objects.get(name=name)
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self._upload(self.quotes[0], self.PDF)
+        with mock.patch.object(ContentAddressedStorage, '_write') as write:
+            second = self._upload(self.quotes[1], self.PDF, filename='copy.pdf')
+        write.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(first, f'quotes/blobs/{hashlib.sha256(self.PDF).hexdigest()[:2]}/{hashlib.sha256(self.PDF).hexdigest()}.pdf')
+        self.assertEqual(self._blob(first).ref_count, 2)
+        with self.quotes[1].supporting_document.open('rb') as f:
+            self.assertEqual(f.read(), self.PDF)
+
+    def test_replacing_and_deleting_move_reference_counts(self):
+        shared = self._upload(self.quotes[0], self.PDF)
+        self._upload(self.quotes[1], self.PDF)
+        replacement = self._upload(self.quotes[0], self.PDF + b'v2')
+        self.assertEqual((self._blob(shared).ref_count, self._blob(replacement).ref_count), (1, 1))
+        self.quotes[1].delete()
+        self.assertEqual(self._blob(shared).ref_count, 0)
+
+    def test_bulk_writes_move_reference_counts(self):
+        first = self._upload(self.quotes[0], self.PDF)
+        second = self._upload(self.quotes[1], self.PDF + b'v2')
+        Quote.objects.filter(id__in=[quote.id for quote in self.quotes]).update(supporting_document=first)
+        self.assertEqual((self._blob(first).ref_count, self._blob(second).ref_count), (2, 0))
+        Quote.objects.bulk_create([
+            Quote(opportunity_id='OPP-X', customer_name='C', customer_email='c@email.com',
+                  submitted_by=self.user, supporting_document=first),
+        ])
+        self.assertEqual(self._blob(first).ref_count, 3)
+        Quote.objects.filter(supporting_document=first).delete()
+        self.assertEqual(self._blob(first).ref_count, 0)
+
+    def test_a_digest_attribute_on_an_uploaded_file_is_not_trusted(self):
+        file = SimpleUploadedFile('price-sheet.pdf', self.PDF + b'forged', content_type='application/pdf')
+        file.sha256 = hashlib.sha256(self.PDF).hexdigest()
+        name = document_storage().save('quotes/price-sheet.pdf', file)
+        self.assertIn(hashlib.sha256(self.PDF + b'forged').hexdigest(), name)
+
+    def test_gc_deletes_only_unreferenced_blobs_past_the_grace_period(self):
+        kept = self._upload(self.quotes[0], self.PDF)
+        dropped = self._upload(self.quotes[1], self.PDF + b'old')
+        self.quotes[1].delete()
+        storage = document_storage()
+        orphan = f'quotes/blobs/00/{"0" * 64}.pdf'
+        os.makedirs(os.path.dirname(storage.path(orphan)), exist_ok=True)
+        with open(storage.path(orphan), 'wb') as f:
+            f.write(b'rolled back upload')
+
+        call_command('gc_documents', stdout=StringIO())
+        self.assertTrue(storage.exists(dropped))
+
+        past = timezone.now() + timedelta(hours=settings.DOCUMENT_GC_GRACE_HOURS + 1)
+        with mock.patch('django.utils.timezone.now', return_value=past):
+            call_command('gc_documents', stdout=StringIO())
+        self.assertFalse(storage.exists(dropped))
+        self.assertFalse(storage.exists(orphan))
+        self.assertTrue(storage.exists(kept))
+        self.assertEqual(list(DocumentBlob.objects.values_list('name', flat=True)), [kept])
+
+    def test_recount_repairs_drift(self):
+        name = self._upload(self.quotes[0], self.PDF)
+        DocumentBlob.objects.filter(name=name).update(ref_count=7)
+        call_command('gc_documents', recount=True, stdout=StringIO())
+        self.assertEqual(self._blob(name).ref_count, 1)
+
+
+class DocumentDownloadTest(APITestCase):
+    PDF = b'%PDF-1.4\n' + bytes(range(256)) * 4
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.owner = User.objects.create_user(username='sales', password='salespass')
+        self.other = User.objects.create_user(username='other', password='otherpass')
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.quote = Quote.objects.create(
+            opportunity_id='OPP-1', customer_name='Customer', customer_email='customer@email.com', submitted_by=self.owner
+        )
+        self.quote.supporting_document.save('price sheet.pdf', ContentFile(self.PDF))
+        self.url = reverse('quote-document', args=[self.quote.id])
+        self.etag = f'"{hashlib.sha256(self.PDF).hexdigest()}"'
+        self.client.login(username='sales', password='salespass')
+
+    def test_owner_and_staff_download_the_document(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.getvalue(), self.PDF)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Disposition'], f"attachment; filename*=UTF-8''quote-{self.quote.id}-document.pdf")
+
+        self.client.login(username='admin', password='adminpass')
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT='application/pdf').status_code, status.HTTP_200_OK)
+
+    def test_other_users_and_anonymous_cannot_download(self):
+        self.client.login(username='other', password='otherpass')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_quote_without_document_returns_404(self):
+        quote = Quote.objects.create(
+            opportunity_id='OPP-2', customer_name='Customer', customer_email='customer@email.com', submitted_by=self.owner
+        )
+        response = self.client.get(reverse('quote-document', args=[quote.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_single_byte_ranges(self):
+        size = len(self.PDF)
+        for header, start, end in [('bytes=0-3', 0, 3), ('bytes=1000-', 1000, size - 1), ('bytes=-10', size - 10, size - 1),
+                                   ('bytes=10-99999', 10, size - 1)]:
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+                self.assertEqual(response.getvalue(), self.PDF[start:end + 1])
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.PDF)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.PDF)}')
+        for header in ['bytes=0-1,5-9', 'lines=1-2', 'bytes=9-3']:
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.getvalue(), self.PDF)
+
+    def test_conditional_requests(self):
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.getvalue(), self.PDF)
+
+    @override_settings(DOCUMENT_SENDFILE='x-accel-redirect', DOCUMENT_ACCEL_PREFIX='/protected-media/')
+    def test_sendfile_hands_the_transfer_to_the_proxy(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.quote.supporting_document.name}')
+        self.assertEqual(response['ETag'], self.etag)
+
+    def test_serialized_quote_links_to_the_download_endpoint(self):
+        response = self.client.get(reverse('quote-detail', args=[self.quote.id]))
+        self.assertEqual(response.data['supporting_document'], f'http://testserver{self.url}')
+
+
+@override_settings(ROOT_URLCONF='takehome.asgi_urls')
+class AsyncReadViewTest(APITestCase):
+    def setUp(self):
+        self.sales = User.objects.create_user(username='sales', password='salespass')
+        self.other = User.objects.create_user(username='other', password='otherpass')
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.quote = Quote.objects.create(
+            opportunity_id='OPP-1', customer_name='Acme', customer_email='buyer@acme.com', submitted_by=self.sales
+        )
+        self.other_quote = Quote.objects.create(
+            opportunity_id='OPP-2', customer_name='Globex', customer_email='buyer@globex.com', submitted_by=self.other
+        )
+        IntegrationLog.objects.create(user=self.sales, quote=self.quote, action='STATUS', status='Pending Review', payload={})
+        IntegrationLog.objects.create(user=self.admin, quote=self.quote, action='ERP', status='Approved', payload={})
+
+    def test_read_endpoints_resolve_to_async_views(self):
+        for name, args in [('quote-list', []), ('quote-detail', [self.quote.id]), ('log-list', []),
+                           ('log-by-quote', []), ('log-by-action', []), ('user-info', [])]:
+            with self.subTest(name=name):
+                self.assertTrue(iscoroutinefunction(resolve(reverse(name, args=args)).func))
+        self.assertFalse(iscoroutinefunction(resolve(reverse('quote-set-status', args=[self.quote.id])).func))
+
+    def test_async_responses_match_the_drf_views(self):
+        urls = [
+            reverse('quote-list'), reverse('quote-list') + '?search=acme', reverse('quote-detail', args=[self.quote.id]),
+            reverse('log-list'), reverse('log-by-quote') + f'?quote_id={self.quote.id}',
+            reverse('log-by-action') + '?action=ERP', reverse('user-info'),
+        ]
+        for user in [self.sales, self.admin]:
+            self.client.force_login(user)
+            for url in urls:
+                with self.subTest(user=user.username, url=url):
+                    # The test client runs async views through async_to_sync.
+                    async_response = self.client.get(url)
+                    with override_settings(ROOT_URLCONF='takehome.urls'):
+                        sync_response = self.client.get(url)
+                    self.assertEqual(async_response.status_code, sync_response.status_code)
+                    self.assertEqual(async_response.content, sync_response.content)
+                    self.assertEqual(async_response.get('ETag'), sync_response.get('ETag'))
+
+    async def test_visibility_and_conditional_requests(self):
+        await self.async_client.aforce_login(self.sales)
+        response = await self.async_client.get(reverse('quote-detail', args=[self.other_quote.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.get(reverse('quote-list'))
+        self.assertEqual([row['id'] for row in json.loads(response.content)['results']], [self.quote.id])
+        response = await self.async_client.get(reverse('quote-list'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = await self.async_client.get(reverse('log-by-quote'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = await self.async_client.get(reverse('quote-list') + '?status=bogus')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_other_requests_fall_through_to_drf(self):
+        response = await self.async_client.get(reverse('quote-list'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        await self.async_client.aforce_login(self.sales)
+        response = await self.async_client.post(reverse('quote-list'), {
+            'opportunity_id': 'OPP-3', 'customer_name': 'Initech', 'customer_email': 'buyer@initech.com'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await Quote.objects.filter(id=response.json()['id'], submitted_by=self.sales).aexists())
+        response = await self.async_client.get(reverse('quote-list') + '?format=json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    @override_settings(CACHES={
+        **settings.CACHES,
+        'lists': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'async-list-cache-test'},
+    })
+    def test_async_and_drf_views_share_the_list_cache(self):
+        caches['lists'].clear()
+        self.client.force_login(self.sales)
+        url = reverse('quote-list')
+        with override_settings(ROOT_URLCONF='takehome.urls'):
+            self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.quote.id])
+        self.assertEqual(self.client.get(reverse('log-list'))['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(reverse('log-list'))['X-Cache'], 'HIT')
+
+
+class LoadTestSupportTest(APITestCase):
+    def test_seed_replaces_earlier_runs_and_rebuilds_stats(self):
+        for _ in range(2):
+            loadtest.seed(users=3, admins=1, quotes=40, logs=60, password='loadtest', batch_size=16)
+        self.assertEqual(User.objects.filter(username__startswith='loadtest-sales-').count(), 3)
+        self.assertTrue(User.objects.get(username='loadtest-admin-0').is_staff)
+        self.assertTrue(self.client.login(username='loadtest-sales-0', password='loadtest'))
+        self.assertEqual(Quote.objects.count(), 40)
+        self.assertEqual(IntegrationLog.objects.count(), 60)
+        self.assertEqual(stats.summary()['total_quotes'], 40)
+
+    def test_compare_reports_regressions(self):
+        def result(p95, rps, queries):
+            return {'scenarios': {'quote-list': {
+                'latency_ms': {'p95': p95, 'p99': p95}, 'throughput_rps': rps, 'queries_per_request': queries,
+            }}}
+
+        baseline = result(100, 50, 3)
+        self.assertEqual(loadtest.compare(baseline, result(110, 48, 3), threshold=0.2), [])
+        regressions = loadtest.compare(baseline, result(130, 30, 4), threshold=0.2)
+        self.assertEqual(
+            [metric for _, metric, *_ in regressions], ['latency p95', 'latency p99', 'throughput', 'queries']
+        )
+
+
+class ProfilingTest(APITestCase):
+    def setUp(self):
+        metrics.reset()
+        self.sales = User.objects.create_user(username='sales', password='salespass')
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        Quote.objects.create(opportunity_id='OPP-1', customer_name='Acme', customer_email='buyer@acme.com', submitted_by=self.sales)
+        self.client.force_login(self.sales)
+
+    @override_settings(PROFILING_HEADERS=True)
+    def test_server_timing_and_query_count_headers(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('quote-list'))
+        self.assertEqual(response['X-Query-Count'], str(len(queries)))
+        timings = loadtest.server_timing(response['Server-Timing'])
+        self.assertEqual(list(timings), ['total', 'db', 'serialize', 'integration'])
+        self.assertIn(f'db;dur={timings["db"]};desc="{len(queries)} queries"', response['Server-Timing'])
+        # Rounded to 0.1 ms, so a fast serializer can report 0.0.
+        self.assertGreaterEqual(timings['serialize'], 0)
+
+    def test_headers_are_off_by_default(self):
+        response = self.client.get(reverse('user-info'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertNotIn('X-Query-Count', response)
+
+    @override_settings(ROOT_URLCONF='takehome.asgi_urls', PROFILING_HEADERS=True)
+    def test_async_views_are_profiled(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('quote-list'))
+        self.assertEqual(response['X-Query-Count'], str(len(queries)))
+        self.assertIn(
+            'http_requests_total{view="quote-list",method="GET",status="200"} 1', metrics.render().splitlines()
+        )
+
+    def test_nested_timed_blocks_count_once(self):
+        # Every clock reading is one second after the previous one.
+        with mock.patch.object(instrumentation.time, 'perf_counter', side_effect=itertools.count()), \
+                instrumentation.profile() as profile:
+            with instrumentation.timed(instrumentation.SERIALIZE):
+                with instrumentation.timed(instrumentation.SERIALIZE):
+                    pass
+                outer = profile.durations[instrumentation.SERIALIZE]
+        self.assertEqual(outer, 0.0)
+        self.assertEqual(profile.durations[instrumentation.SERIALIZE], 1.0)
+
+    def test_integration_calls_are_timed(self):
+        client = IntegrationClient('ERP', 1, 1, pool_size=1, max_in_flight=1, failure_threshold=5, reset_timeout=30)
+        with mock.patch.object(client, '_send', return_value={}), \
+                mock.patch.object(instrumentation.time, 'perf_counter', side_effect=itertools.count()), \
+                instrumentation.profile() as profile:
+            client.post('http://erp.invalid/orders/')
+        self.assertEqual(profile.durations[instrumentation.INTEGRATION], 1.0)
+
+    def test_sampled_requests_are_logged_as_json(self):
+        with override_settings(PROFILING_LOG_SAMPLE_RATE=1), self.assertLogs('quotes.profiling') as logs:
+            self.client.get(reverse('user-info'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['view'], record['status']), ('user-info', 200))
+        self.assertEqual(set(record) - {'view', 'method', 'path', 'status', 'queries'},
+                         {'total_ms', 'db_ms', 'serialize_ms', 'integration_ms'})
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('quote-list'))
+        self.client.get(reverse('quote-list'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('metrics'), HTTP_ACCEPT='text/plain;version=0.0.4;q=0.5,*/*;q=0.1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        lines = response.content.decode().splitlines()
+        self.assertIn('http_requests_total{view="quote-list",method="GET",status="200"} 2', lines)
+        self.assertIn('http_request_duration_seconds_count{view="quote-list",method="GET"} 2', lines)
+        self.assertIn('http_request_db_queries_bucket{view="quote-list",method="GET",le="+Inf"} 2', lines)
+        self.assertIn('# TYPE list_cache_hits_total counter', lines)
+
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_bearer_token(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token').status_code, status.HTTP_200_OK)
+
+    def test_metrics_dir_adds_up_worker_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(METRICS_DIR=directory):
+            self.client.get(reverse('user-info'))
+            other_worker = [[metrics.REQUESTS, [['view', 'user-info'], ['method', 'GET'], ['status', '200']], 3]]
+            with open(os.path.join(directory, '1.json'), 'w') as f:
+                json.dump(other_worker, f)
+            self.assertIn('http_requests_total{view="user-info",method="GET",status="200"} 4', metrics.render().splitlines())
+        self.assertTrue(os.path.exists(os.path.join(directory, f'{os.getpid()}.json')))
+
+
+class ReadFastPathTest(APITestCase):
+    def setUp(self):
+        self.sales = User.objects.create_user(username='sales', password='salespass')
+        self.admin = User.objects.create_user(username='admin', password='adminpass', is_staff=True)
+        self.quotes = [
+            Quote.objects.create(opportunity_id='OPP-1', customer_name='Zoë Ångström', customer_email='zoe@example.com',
+                                 customer_company='Ünïcode GmbH', submitted_by=self.sales),
+            Quote.objects.create(opportunity_id='OPP-2', customer_name='Line\u2028Break', customer_email='lb@example.com',
+                                 submitted_by=self.sales, supporting_document='quotes/blobs/ab/doc.pdf'),
+        ]
+        IntegrationLog.objects.create(user=self.sales, quote=self.quotes[0], action='CREATE', status='Pending Review',
+                                      payload={'amount': 12.5, 'items': [1, 2], 'note': 'café'}, response={'ok': True})
+        IntegrationLog.objects.create(user=self.admin, quote=None, action='ERP', status='Approved', payload={})
+
+    def _serializer_body(self, serializer_class, queryset, response):
+        data = serializer_class(queryset, many=True, context={'request': response.wsgi_request}).data
+        return JSONRenderer().render({'next': None, 'previous': None, 'results': data})
+
+    def test_quote_list_matches_the_serializer_byte_for_byte(self):
+        self.client.force_login(self.sales)
+        response = self.client.get(reverse('quote-list'))
+        queryset = Quote.objects.order_by('-created_at', '-id')
+        self.assertEqual(response.content, self._serializer_body(QuoteSerializer, queryset, response))
+
+    def test_log_lists_match_the_serializer_byte_for_byte(self):
+        self.client.force_login(self.admin)
+        queryset = IntegrationLog.objects.order_by('-created_at', '-id')
+        for url in [reverse('log-list'), reverse('log-by-action') + '?action=CREATE']:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                expected = queryset.filter(action='CREATE') if 'action=' in url else queryset
+                self.assertEqual(response.content, self._serializer_body(IntegrationLogSerializer, expected, response))
+
+    def test_search_results_still_page_by_rank(self):
+        for n in range(3):
+            Quote.objects.create(opportunity_id=f'OPP-S{n}', customer_name=f'Acme {n}', customer_email=f'a{n}@acme.com',
+                                 submitted_by=self.sales)
+        self.client.force_login(self.sales)
+        first = self.client.get(reverse('quote-list'), {'search': 'acme', 'page_size': 2}).data
+        second = self.client.get(first['next']).data
+        self.assertEqual(len(first['results']) + len(second['results']), 3)
+        self.assertNotIn('search_rank', first['results'][0])
+
+    def test_fast_renderer_matches_the_json_renderer(self):
+        data = {
+            'text': 'naïve \u2028 \u2029 "quoted" \\ </script>',
+            'when': timezone.now(),
+            'day': date(2024, 2, 29),
+            'amount': Decimal('12.50'),
+            'id': uuid.UUID(int=1),
+            'lazy': gettext_lazy('Not found.'),
+            'nested': [{'a': 1.5, 'b': None, 'c': True}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_fast_renderer_falls_back_for_what_orjson_refuses(self):
+        data = {'big': 2 ** 70}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2', {}),
+            JSONRenderer().render(data, 'application/json; indent=2', {}),
+        )
+
+
+class OpenAPISchemaTest(APITestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'openapi.json')
+
+    def test_checked_in_schema_matches_the_code(self):
+        call_command('build_openapi', '--check', stdout=StringIO())
+
+    def test_check_lists_the_operations_that_drifted(self):
+        call_command('build_openapi', '--output', self.path, stdout=StringIO())
+        with open(self.path) as f:
+            schema = json.load(f)
+        del schema['paths']['/quotes/']['get']
+        schema['paths']['/quotes/{id}/']['get']['description'] = 'Changed'
+        with open(self.path, 'w') as f:
+            json.dump(schema, f)
+        with self.assertRaises(CommandError) as raised:
+            call_command('build_openapi', '--check', '--output', self.path)
+        self.assertIn('+ GET /quotes/', str(raised.exception))
+        self.assertIn('~ GET /quotes/{id}/', str(raised.exception))
+
+    def test_schema_is_served_from_the_file_with_validators(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'{"swagger": "2.0"}\n')
+        with override_settings(OPENAPI_SCHEMA_FILE=self.path):
+            response = self.client.get('/swagger.json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.content, b'{"swagger": "2.0"}\n')
+            self.assertIn('Last-Modified', response)
+            cached = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            with open(self.path, 'wb') as f:
+                f.write(b'{"swagger": "2.0", "paths": {}}\n')
+            os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 10 ** 9))
+            changed = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(changed.status_code, status.HTTP_200_OK)
+            self.assertEqual(changed.content, b'{"swagger": "2.0", "paths": {}}\n')
+
+    def test_generation_documents_list_pages_without_view_errors(self):
+        with self.assertNoLogs('drf_yasg', 'WARNING'):
+            schema = json.loads(generate())
+        quote_list = schema['paths']['/quotes/']['get']['responses']['200']['schema']
+        self.assertEqual(quote_list, {'$ref': '#/definitions/QuotePage'})
+        self.assertIn('results', schema['definitions']['IntegrationLogPage']['properties'])
+
+    def test_swagger_ui_loads(self):
+        response = self.client.get('/swagger/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, 'swagger')
+
+
+class CachedAuthTest(APITestCase):
+    def setUp(self):
+        self.sales = User.objects.create_user(username='sales', password='salespass')
+        self.client.login(username='sales', password='salespass')
+        self.client.get(reverse('user-info'))
+
+    def test_user_changes_apply_on_the_next_request(self):
+        url = reverse('pipeline-stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.sales.is_staff = True
+        self.sales.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.sales.set_password('changed')
+        self.sales.save()
+        self.assertEqual(self.client.get(reverse('user-info')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cached_users_leave_out_the_password_hash(self):
+        entry = caches[settings.AUTH_CACHE_ALIAS].get(f'auth:user:{self.sales.pk}')
+        self.assertNotIn('password', entry['fields'])
+        self.assertNotIn(self.sales.password, str(entry))
+
+        user = sessions.CachedModelBackend().get_user(self.sales.pk)
+        self.assertEqual(user.get_session_auth_hash(), self.sales.get_session_auth_hash())
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('salespass'))
+
+    def test_sessions_signed_in_through_model_backend_stay_valid(self):
+        self.client.force_login(self.sales, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.client.get(reverse('user-info')).status_code, status.HTTP_200_OK)
+
+    def test_a_wrong_password_is_checked_once(self):
+        with mock.patch.object(User, 'check_password', autospec=True, return_value=False) as check_password:
+            self.assertFalse(self.client.login(username='sales', password='wrong'))
+        check_password.assert_called_once()
+
+    def test_a_per_process_auth_cache_fails_the_system_check_without_debug(self):
+        self.assertEqual(checks.check_shared_caches(None), [])
+        locmem = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        with override_settings(DEBUG=False, CACHES={**settings.CACHES, 'auth': locmem}):
+            self.assertEqual([error.id for error in checks.check_shared_caches(None)], ['quotes.E001'])
+        with override_settings(DEBUG=False, CACHES={**settings.CACHES, 'throttle': locmem}):
+            self.assertEqual([error.id for error in checks.check_shared_caches(None)], ['quotes.E002'])
+        with override_settings(DEBUG=True, CACHES={**settings.CACHES, 'auth': locmem, 'throttle': locmem}):
+            self.assertEqual(checks.check_shared_caches(None), [])
+
+    def test_logout_ends_the_cached_session(self):
+        session_cookie = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.client.post(reverse('logout'))
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session_cookie
+        self.assertEqual(self.client.get(reverse('user-info')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cached_sessions_expire_with_the_auth_cache(self):
+        store = sessions.SessionStore()
+        store['value'] = 1
+        store.save()
+        with mock.patch.object(caches[settings.AUTH_CACHE_ALIAS], 'set') as cache_set:
+            store.save()
+        self.assertEqual(cache_set.call_args.args[2], caches[settings.AUTH_CACHE_ALIAS].default_timeout)
+
+    @override_settings(SESSION_CLEANUP_BATCH_SIZE=2)
+    def test_clearsessions_deletes_expired_sessions_in_batches(self):
+        Session = sessions.SessionStore.get_model_class()
+        for n in range(5):
+            store = sessions.SessionStore()
+            store.set_expiry(timezone.now() - timedelta(minutes=n + 1))
+            store.save()
+        live = Session.objects.count() - 5
+
+        self.assertEqual(sessions.purge_expired(batch_size=2, max_batches=1), 2)
+        with CaptureQueriesContext(connection) as queries:
+            call_command('clearsessions')
+        self.assertEqual(Session.objects.count(), live)
+        self.assertEqual(sum(query['sql'].startswith('DELETE') for query in queries), 2)
+        self.assertEqual(self.client.get(reverse('user-info')).status_code, status.HTTP_200_OK)
+
+
+class SignedTokenTest(APITestCase):
+    def setUp(self):
+        self.machine = User.objects.create_user(username='erp-worker', password='workerpass')
+        self.token = tokens.issue(self.machine)
+        self.url = reverse('list-erp-orders')
+
+    def test_token_authenticates_without_session_or_user_queries(self):
+        self.assertEqual(tokens.verify(self.token), self.machine)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('create-erp-order'), {'customer': 'C', 'total': 1, 'status': 'Approved'},
+                                        format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 0)
+
+    def test_bad_expired_and_revoked_tokens_are_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}x')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        with override_settings(SIGNED_TOKEN_MAX_AGE_SECONDS=-1):
+            self.assertEqual(self.client.get(self.url).data['detail'], 'Token expired.')
+
+        self.machine.set_password('rotated')
+        self.machine.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_issue_token_command_and_integration_client_header(self):
+        out = StringIO()
+        call_command('issue_token', 'erp-worker', stdout=out, stderr=StringIO())
+        token = out.getvalue().strip()
+        self.assertEqual(tokens.verify(token), self.machine)
+        client = IntegrationClient('ERP', 1, 1, 1, 1, 1, 1, api_token=token)
+        self.assertEqual(client.session.headers['Authorization'], f'Token {token}')
+
+
+@override_settings(AUTH_THROTTLE_RATES={'login-ip': '3/min', 'login-username': '', 'register-ip': '2/hour'})
+class AuthThrottleTest(APITestCase):
+    def setUp(self):
+        caches[settings.THROTTLE_CACHE_ALIAS].clear()
+        self.sales = User.objects.create_user(username='sales', password='salespass')
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir)
+        settings_override = override_settings(PASSWORD_HASHING_LOCK_DIR=lock_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _login(self, username='sales', password='wrong', ip='10.0.0.1', **extra):
+        return self.client.post(reverse('login'), {'username': username, 'password': password}, REMOTE_ADDR=ip,
+                                **extra)
+
+    def test_ip_bucket_returns_429_with_retry_after_and_refills(self):
+        clock = [1000.0]
+        with mock.patch.object(throttling.TokenBucketThrottle, 'timer', side_effect=lambda: clock[0]):
+            for _ in range(3):
+                self.assertEqual(self._login().status_code, status.HTTP_401_UNAUTHORIZED)
+            response = self._login(password='salespass')
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(response['Retry-After'], '20')
+            self.assertEqual(self._login(ip='10.0.0.2').status_code, status.HTTP_401_UNAUTHORIZED)
+
+            clock[0] += 20
+            self.assertEqual(self._login(password='salespass').status_code, status.HTTP_200_OK)
+            self.assertEqual(self._login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_does_not_change_the_ip_bucket(self):
+        for n in range(3):
+            response = self._login(HTTP_X_FORWARDED_FOR=f'203.0.113.{n}')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self._login(HTTP_X_FORWARDED_FOR='203.0.113.9').status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            self.assertEqual(self._login(HTTP_X_FORWARDED_FOR='203.0.113.9').status_code,
+                             status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_THROTTLE_RATES={'login-ip': '', 'login-username': '2/min', 'register-ip': ''})
+    def test_username_bucket_spans_ips_and_case(self):
+        self._login(ip='10.0.0.1')
+        self._login(username=' SALES', ip='10.0.0.2')
+        self.assertEqual(self._login(ip='10.0.0.3').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self._login(username='other', ip='10.0.0.3').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_registration_is_throttled_per_ip(self):
+        for n in range(2):
+            response = self.client.post(reverse('user-register'), {'username': f'new-{n}', 'password': 'pass-word-1'})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(reverse('user-register'), {'username': 'new-2', 'password': 'pass-word-1'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(PASSWORD_HASHING_MAX_CONCURRENCY=1, PASSWORD_HASHING_WAIT_SECONDS=0)
+    def test_login_gets_503_while_every_hashing_slot_is_taken(self):
+        with throttling.hashing_slot():
+            response = self._login(password='salespass')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self._login(password='salespass').status_code, status.HTTP_200_OK)
+
+    @override_settings(PASSWORD_HASHING_MAX_CONCURRENCY=2, PASSWORD_HASHING_WAIT_SECONDS=5)
+    def test_hashing_slots_cap_parallel_work(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with throttling.hashing_slot():
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.05)
+                with lock:
+                    active.pop()
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(peak), 6)
+        self.assertEqual(max(peak), 2)
@@ -0,0 +1,132 @@
+"""
+Throttling for the endpoints that hash passwords (login and registration).
+
+One PBKDF2 check costs hundreds of milliseconds of CPU, so a burst of
+login attempts can keep every worker busy. Two limits protect the rest of
+the API:
+
+- ``TokenBucketThrottle`` subclasses keep token buckets in the
+  ``settings.THROTTLE_CACHE_ALIAS`` cache, per client IP and per username.
+  A rate of ``'10/min'`` in ``AUTH_THROTTLE_RATES`` means a burst of up to
+  10 requests, with tokens refilled at 10 per minute. A request that finds
+  the bucket empty gets 429 with ``Retry-After``.
+- ``hashing_slot()`` lets at most ``PASSWORD_HASHING_MAX_CONCURRENCY``
+  requests hash at once on the host. The slots are ``flock``ed files, so
+  the limit holds across threads and worker processes. A request that
+  cannot get a slot within ``PASSWORD_HASHING_WAIT_SECONDS`` gets 503 with
+  ``Retry-After``, and the worker moves on to other requests.
+
+Taking a token reads and writes the cache entry without an atomic
+operation. Two workers racing on one shared bucket can both take its last
+token, so the rates are approximate. The default cache is a FileBasedCache
+shared by the workers of the host; with LocMemCache each process would
+keep its own buckets (``quotes.checks`` rejects that with DEBUG off).
+
+Client IPs come from DRF's ``get_ident``. ``NUM_PROXIES`` defaults to 0,
+so the bucket is keyed on ``REMOTE_ADDR`` and a client cannot pick a new
+address with ``X-Forwarded-For``.
+"""
+import contextlib
+import fcntl
+import hashlib
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import exceptions, status
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+SLOT_POLL_SECONDS = 0.02
+
+_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """``'count/period'`` (DRF's format: period s, sec, m, min, h, hour, d or day) -> (count, seconds)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """A bucket per ``get_ident`` value, with the rate ``AUTH_THROTTLE_RATES[scope]``; an empty rate turns it off."""
+    scope = None
+    timer = time.time
+
+    def __init__(self):
+        self.rate = settings.AUTH_THROTTLE_RATES[self.scope]
+        self.delay = None
+
+    def allow_request(self, request, view):
+        ident = self.get_ident(request)
+        if not self.rate or ident is None:
+            return True
+        capacity, period = parse_rate(self.rate)
+        refill = capacity / period
+        key = f'throttle:{self.scope}:{hashlib.sha1(ident.encode()).hexdigest()}'
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        now = self.timer()
+        with _lock:
+            tokens, updated_at = cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill)
+            if tokens < 1:
+                self.delay = (1 - tokens) / refill
+                return False
+            # An untouched bucket is full again after one period, the same as a missing entry.
+            cache.set(key, (tokens - 1, now), timeout=math.ceil(period))
+        return True
+
+    def wait(self):
+        return self.delay
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = 'login-ip'
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    scope = 'login-username'
+
+    def get_ident(self, request):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        return username.strip().lower() if isinstance(username, str) and username.strip() else None
+
+
+class RegisterIPThrottle(TokenBucketThrottle):
+    scope = 'register-ip'
+
+
+class HashingBusy(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins in progress, try again shortly.'
+    default_code = 'hashing_busy'
+    wait = 1
+
+
+@contextlib.contextmanager
+def hashing_slot():
+    """Hold one of the host's password hashing slots for the block, or raise HashingBusy."""
+    limit = settings.PASSWORD_HASHING_MAX_CONCURRENCY
+    if not limit:
+        yield
+        return
+    os.makedirs(settings.PASSWORD_HASHING_LOCK_DIR, exist_ok=True)
+    deadline = time.monotonic() + settings.PASSWORD_HASHING_WAIT_SECONDS
+    while True:
+        for slot in range(limit):
+            handle = open(os.path.join(settings.PASSWORD_HASHING_LOCK_DIR, f'slot-{slot}.lock'), 'a')
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                continue
+            # Closing the file releases the lock, also when the process dies.
+            with handle:
+                yield
+            return
+        if time.monotonic() >= deadline:
+            raise HashingBusy()
+        time.sleep(SLOT_POLL_SECONDS)
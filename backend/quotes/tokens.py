@@ -0,0 +1,65 @@
+"""
+Stateless signed tokens for machine clients of the ERP/CRM endpoints.
+
+``issue(user)`` (``python manage.py issue_token <username>``) signs the
+user's id and part of their session auth hash with SECRET_KEY. Nothing is
+stored. ``SignedTokenAuthentication`` checks the signature and the age
+(``SIGNED_TOKEN_MAX_AGE_SECONDS``), then loads the user through
+``quotes.sessions.CachedModelBackend``. A request therefore runs no session
+or user query, and it needs no CSRF token.
+
+Changing the user's password or deactivating them revokes their tokens.
+Rotating SECRET_KEY revokes every token.
+"""
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+from rest_framework import authentication, exceptions
+from rest_framework.settings import api_settings
+
+from .sessions import CachedModelBackend
+
+SALT = 'quotes.tokens'
+KEYWORD = 'Token'
+# Enough of the session auth hash to notice a password change without putting all of it in the token.
+AUTH_HASH_LENGTH = 16
+
+
+def issue(user):
+    return signing.dumps(
+        {'user': user.pk, 'auth': user.get_session_auth_hash()[:AUTH_HASH_LENGTH]}, salt=SALT, compress=True,
+    )
+
+
+def verify(token):
+    """Return the user the token was issued to, or raise ``signing.BadSignature`` (or ``SignatureExpired``)."""
+    claims = signing.loads(token, salt=SALT, max_age=settings.SIGNED_TOKEN_MAX_AGE_SECONDS)
+    user = CachedModelBackend().get_user(claims['user'])
+    if user is None or not constant_time_compare(claims['auth'], user.get_session_auth_hash()[:AUTH_HASH_LENGTH]):
+        raise signing.BadSignature('Token revoked.')
+    return user
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """``Authorization: Token <token>`` with a token from ``issue``."""
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != KEYWORD.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            user = verify(auth[1].decode())
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed('Token expired.')
+        except (signing.BadSignature, UnicodeDecodeError):
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        return user, None
+
+    def authenticate_header(self, request):
+        return KEYWORD
+
+
+# For views that accept signed tokens as well as the usual session (and basic) authentication.
+AUTHENTICATION_CLASSES = [SignedTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
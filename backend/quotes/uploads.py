@@ -0,0 +1,229 @@
+"""
+Resumable, chunked supporting-document uploads.
+
+A client opens an ``UploadSession`` with the file name and total size,
+PUTs the bytes in order (each chunk at the offset the server reports),
+then finalizes. Each chunk is streamed to disk as it arrives, appended to
+a part file under ``settings.UPLOAD_TEMP_DIR`` and hashed incrementally,
+with the size limit enforced byte by byte. The type is taken
+from the file's magic bytes, never from the client. On finalize the file
+moves into storage and is attached to the quote in one transaction.
+"""
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from . import audit
+from .models import Quote, UploadSession
+from .storage import HashedFile, document_storage
+
+MAX_DOCUMENT_SIZE = 5 * 1024 * 1024
+READ_SIZE = 64 * 1024
+# (magic bytes, content type, extension)
+SIGNATURES = [
+    (b'%PDF-', 'application/pdf', '.pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', '.png'),
+    (b'\xff\xd8\xff', 'image/jpeg', '.jpg'),
+]
+SIGNATURE_LENGTH = max(len(magic) for magic, _, _ in SIGNATURES)
+# Running hashes of in-progress sessions, keyed by session id: (bytes hashed, hasher).
+_hashers = {}
+MAX_CACHED_HASHERS = 256
+
+
+class UploadError(Exception):
+    def __init__(self, message, status_code, **extra):
+        super().__init__(message)
+        self.status_code = status_code
+        self.extra = extra
+
+    def as_data(self):
+        return {'error': str(self), **self.extra}
+
+
+def sniff(head):
+    """Return (content type, extension) for the leading bytes of a file, or None if the type is not allowed."""
+    for magic, content_type, extension in SIGNATURES:
+        if head.startswith(magic):
+            return content_type, extension
+    return None
+
+
+def part_path(session):
+    return os.path.join(settings.UPLOAD_TEMP_DIR, f'{session.pk}.part')
+
+
+def _stem(filename):
+    try:
+        return os.path.splitext(get_valid_filename(filename))[0] or 'document'
+    except SuspiciousFileOperation:
+        return 'document'
+
+
+def _read_head(session):
+    with open(part_path(session), 'rb') as f:
+        return f.read(SIGNATURE_LENGTH)
+
+
+def _hasher(session):
+    cached = _hashers.get(session.pk)
+    if cached is not None and cached[0] == session.received:
+        return cached[1]
+    # Another process took the previous chunk (or this one restarted): rehash what is on disk.
+    hasher = hashlib.sha256()
+    with open(part_path(session), 'rb') as f:
+        remaining = session.received
+        while remaining:
+            data = f.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+
+def _remember(session, hasher):
+    if len(_hashers) >= MAX_CACHED_HASHERS:
+        _hashers.clear()
+    _hashers[session.pk] = (session.received, hasher)
+
+
+def start(quote, user, filename, size):
+    if not filename:
+        raise UploadError('filename is required.', 400)
+    if not isinstance(size, int) or isinstance(size, bool) or size < 1:
+        raise UploadError('size must be a positive integer.', 400)
+    if size > MAX_DOCUMENT_SIZE:
+        raise UploadError('File too large (max 5MB).', 413)
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    session = UploadSession.objects.create(quote=quote, user=user, filename=os.path.basename(filename)[:255], size=size)
+    open(part_path(session), 'xb').close()
+    return session
+
+
+def _check_offset(session, offset, length):
+    if session.completed_at is not None:
+        raise UploadError('Upload already finalized.', 409)
+    if offset != session.received:
+        raise UploadError('Offset does not match the bytes received so far.', 409, offset=session.received)
+    if length is not None and offset + length > session.size:
+        raise UploadError('Chunk goes past the declared file size.', 413, offset=session.received)
+
+
+def write_chunk(session_id, offset, stream, content_length=None):
+    """
+    Append the bytes read from ``stream`` at ``offset``. The chunk is first
+    spooled to its own file, so no lock is held while a slow client sends
+    it, then appended under a row lock. A chunk is all or nothing: on any
+    error the client resends it from the reported offset. Returns the
+    updated session.
+    """
+    session = UploadSession.objects.get(pk=session_id)
+    _check_offset(session, offset, content_length)
+    chunk_path = f'{part_path(session)}.{uuid.uuid4().hex}'
+    try:
+        length = 0
+        with open(chunk_path, 'xb') as chunk:
+            while stream is not None:
+                data = stream.read(READ_SIZE)
+                if not data:
+                    break
+                length += len(data)
+                # Enforced as bytes arrive: a lying or missing Content-Length cannot push past the limit.
+                if offset + length > session.size:
+                    raise UploadError('Chunk goes past the declared file size.', 413, offset=session.received)
+                chunk.write(data)
+
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session_id)
+            _check_offset(session, offset, length)
+            hasher = _hasher(session).copy()
+            with open(part_path(session), 'r+b') as part, open(chunk_path, 'rb') as chunk:
+                part.seek(offset)
+                try:
+                    while data := chunk.read(READ_SIZE):
+                        hasher.update(data)
+                        part.write(data)
+                    part.flush()
+                    os.fsync(part.fileno())
+                    if offset < SIGNATURE_LENGTH <= offset + length or offset + length == session.size:
+                        part.seek(0)
+                        if sniff(part.read(SIGNATURE_LENGTH)) is None:
+                            raise UploadError('File type not allowed.', 415, offset=session.received)
+                except BaseException:
+                    part.truncate(offset)
+                    raise
+                part.truncate(offset + length)
+            session.received = offset + length
+            session.save(update_fields=['received', 'updated_at'])
+    finally:
+        os.remove(chunk_path)
+    _remember(session, hasher)
+    return session
+
+
+def finalize(session_id, user, expected_sha256=None):
+    """Move the completed file into storage and attach it to the quote atomically. Returns the quote."""
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id)
+        if session.completed_at is not None:
+            raise UploadError('Upload already finalized.', 409)
+        if session.received != session.size:
+            raise UploadError('Upload is incomplete.', 409, offset=session.received)
+        detected = sniff(_read_head(session))
+        if detected is None:
+            raise UploadError('File type not allowed.', 415)
+        digest = _hasher(session).hexdigest()
+        if expected_sha256 and expected_sha256.lower() != digest:
+            raise UploadError('Checksum mismatch.', 400, sha256=digest)
+
+        content_type, extension = detected
+        stem = _stem(session.filename)
+        with open(part_path(session), 'rb') as f:
+            document = HashedFile(f, digest)
+            stored_name = document_storage().save(f'quotes/{stem}{extension}', document)
+
+        quote = Quote.objects.select_for_update().get(pk=session.quote_id)
+        quote.supporting_document.name = stored_name
+        quote.save()
+        session.content_type = content_type
+        session.sha256 = digest
+        session.completed_at = timezone.now()
+        session.save()
+        audit.log(
+            user=user,
+            quote=quote,
+            action='UPLOAD',
+            status=quote.status,
+            payload={'filename': session.filename, 'size': session.size, 'sha256': digest, 'content_type': content_type},
+            response={'message': 'Supporting document uploaded'}
+        )
+    discard_part(session)
+    return quote
+
+
+def discard_part(session):
+    _hashers.pop(session.pk, None)
+    try:
+        os.remove(part_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def abort(session):
+    discard_part(session)
+    session.delete()
+
+
+def purge_stale(older_than):
+    """Delete sessions untouched since ``older_than`` and their part files. Returns the number deleted."""
+    stale = list(UploadSession.objects.filter(updated_at__lt=older_than))
+    for session in stale:
+        abort(session)
+    return len(stale)
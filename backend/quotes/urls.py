@@ -8,6 +8,9 @@ from .views import (
 )
 from .views.auth_session import LoginView, LogoutView
 from .views.user import UserInfoView
+from .views.cache import ListCacheStatsView
+from .views.stats import PipelineStatsView
+from .views.metrics import MetricsView
 
 router = DefaultRouter()
 router.register(r'quotes', QuoteViewSet, basename='quote')
@@ -18,6 +21,9 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('api/register/', UserRegisterView.as_view(), name='user-register'),
     path('api/user/', UserInfoView.as_view(), name='user-info'),
+    path('api/cache/stats/', ListCacheStatsView.as_view(), name='list-cache-stats'),
+    path('api/stats/', PipelineStatsView.as_view(), name='pipeline-stats'),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
     path('api-auth/', include('rest_framework.urls')),
     path('api/crm/customers/', create_crm_customer, name='create-crm-customer'),
     path('api/crm/customers/list/', list_crm_customers, name='list-crm-customers'),
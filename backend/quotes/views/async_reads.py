@@ -0,0 +1,126 @@
+"""
+Async versions of the read-heavy endpoints, served under ASGI.
+
+``quotes.async_urls`` mounts these in front of the DRF routes (see
+``takehome.asgi_urls``). They answer authenticated JSON GETs; anything
+else (writes, HEAD, the browsable API, anonymous or Basic-auth requests)
+is handed to the DRF view for the same URL, so those responses do not
+change. Querysets, serializers, pagination, conditional GET and the list
+cache are the viewsets' own, and responses are encoded like DRF's
+(quotes.renderers.json_response), so the bodies are the same bytes.
+
+The user, the collection validators and single objects are loaded with
+the async ORM. A list page is fetched and serialized in one
+``sync_to_async`` call: DRF's cursor paginator is synchronous, and the
+async ORM would run the same query through ``sync_to_async`` anyway.
+"""
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.urls import resolve
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.request import Request
+
+from .. import list_cache
+from ..conditional import acollection_validators, conditional_response, object_validators
+from ..models import Quote
+from ..renderers import json_response
+from ..search import filter_quotes
+from ..serializers import UserSerializer
+from .logs import IntegrationLogViewSet
+from .quotes import QuoteViewSet
+
+
+def _handles(request):
+    return (
+        request.method == 'GET'
+        and 'HTTP_AUTHORIZATION' not in request.META
+        and 'format' not in request.GET
+        and 'text/html' not in request.headers.get('Accept', '')
+    )
+
+
+def async_read(handler):
+    @csrf_exempt
+    @wraps(handler)
+    async def view(request, *args, **kwargs):
+        if _handles(request):
+            user = await request.auser()
+            if user.is_authenticated:
+                # Replaces the lazy request.user, which would load the user again synchronously.
+                request.user = user
+                return await handler(request, *args, **kwargs)
+        match = resolve(request.path_info, urlconf='quotes.urls')
+        return await sync_to_async(match.func)(request, *match.args, **match.kwargs)
+    return view
+
+
+def _viewset(viewset_class, request, action, **kwargs):
+    drf_request = Request(request)
+    drf_request.user = request.user
+    return viewset_class(request=drf_request, args=(), kwargs=kwargs, format_kwarg=None, action=action)
+
+
+async def _render_page(view, queryset):
+    response = await sync_to_async(view._render_page)(queryset)
+    return response.data
+
+
+async def _cached_page(request, namespace, view, queryset, modified_field):
+    return await list_cache.acached_list(
+        request, namespace,
+        partial(acollection_validators, request, queryset, modified_field),
+        partial(_render_page, view, queryset)
+    )
+
+
+@async_read
+async def quote_list(request):
+    view = _viewset(QuoteViewSet, request, 'list')
+    try:
+        queryset = filter_quotes(view.get_queryset(), request.GET)
+    except ValueError as e:
+        return json_response({'error': str(e)}, status=400)
+    return await _cached_page(request, list_cache.QUOTES, view, queryset, 'updated_at')
+
+
+@async_read
+async def quote_detail(request, pk):
+    view = _viewset(QuoteViewSet, request, 'retrieve', pk=pk)
+    try:
+        quote = await view.get_queryset().aget(pk=pk)
+    except Quote.DoesNotExist:
+        return json_response({'detail': 'No Quote matches the given query.'}, status=404)
+    return conditional_response(
+        request, object_validators(request, quote, 'updated_at'),
+        lambda: json_response(view.get_serializer(quote).data)
+    )
+
+
+@async_read
+async def log_list(request):
+    view = _viewset(IntegrationLogViewSet, request, 'list')
+    return await _cached_page(request, list_cache.LOGS, view, view.filter_queryset(view.get_queryset()), 'created_at')
+
+
+@async_read
+async def log_by_quote(request):
+    quote_id = request.GET.get('quote_id')
+    if not quote_id:
+        return json_response({'error': 'quote_id parameter is required'}, status=400)
+    view = _viewset(IntegrationLogViewSet, request, 'by_quote')
+    return await _cached_page(request, list_cache.LOGS, view, view.get_queryset().filter(quote_id=quote_id), 'created_at')
+
+
+@async_read
+async def log_by_action(request):
+    action = request.GET.get('action')
+    if not action:
+        return json_response({'error': 'action parameter is required'}, status=400)
+    view = _viewset(IntegrationLogViewSet, request, 'by_action')
+    return await _cached_page(request, list_cache.LOGS, view, view.get_queryset().filter(action=action), 'created_at')
+
+
+@async_read
+async def user_info(request):
+    return json_response(UserSerializer(request.user).data)
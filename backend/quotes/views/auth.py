@@ -1,6 +1,7 @@
 from rest_framework import generics, permissions
 from django.contrib.auth.models import User
 from ..serializers import UserRegisterSerializer
+from ..throttling import RegisterIPThrottle, hashing_slot
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -8,6 +9,7 @@ class UserRegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterIPThrottle]
 
     @swagger_auto_schema(
         operation_summary="Register a new user",
@@ -15,8 +17,11 @@ class UserRegisterView(generics.CreateAPIView):
         responses={
             201: openapi.Response('User created', UserRegisterSerializer),
             400: 'Validation error',
+            429: 'Too many registrations from this IP; see Retry-After',
+            503: 'Too many sign-ins in progress; see Retry-After',
         },
         tags=["Auth"]
     )
     def post(self, request, *args, **kwargs):
-        return super().post(request, *args, **kwargs)
+        with hashing_slot():
+            return super().post(request, *args, **kwargs)
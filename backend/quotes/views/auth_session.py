@@ -6,9 +6,11 @@ from rest_framework.permissions import AllowAny
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from quotes.serializers import LoginSerializer
+from quotes.throttling import LoginIPThrottle, LoginUsernameThrottle, hashing_slot
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
 
     @swagger_auto_schema(
         operation_summary="Login with username and password (session auth)",
@@ -16,6 +18,8 @@ class LoginView(APIView):
         responses={
             200: openapi.Response('Login successful', LoginSerializer),
             401: openapi.Response('Invalid credentials'),
+            429: openapi.Response('Too many attempts for this IP or username; see Retry-After'),
+            503: openapi.Response('Too many sign-ins in progress; see Retry-After'),
         },
         tags=["Auth"]
     )
@@ -24,7 +28,8 @@ class LoginView(APIView):
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data['username']
         password = serializer.validated_data['password']
-        user = authenticate(request, username=username, password=password)
+        with hashing_slot():
+            user = authenticate(request, username=username, password=password)
         if user is not None:
             login(request, user)
             return Response({'detail': 'Login successful.'}, status=status.HTTP_200_OK)
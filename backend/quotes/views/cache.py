@@ -0,0 +1,17 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from drf_yasg.utils import swagger_auto_schema
+from .. import list_cache
+
+
+class ListCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="List cache counters",
+        operation_description="Hit and miss counters of the quote/log list response cache.",
+        tags=["Cache"]
+    )
+    def get(self, request):
+        return Response(list_cache.stats())
@@ -1,11 +1,13 @@
 
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from ..tokens import AUTHENTICATION_CLASSES
+
 @swagger_auto_schema(
     method='post',
     operation_description="Simulate CRM customer creation. Accepts customer data as JSON.",
@@ -20,6 +22,7 @@ from drf_yasg import openapi
     responses={200: openapi.Response('Customer received by CRM mock!')}
 )
 @api_view(['POST'])
+@authentication_classes(AUTHENTICATION_CLASSES)
 def create_crm_customer(request):
     print('Payload received for CRM (create customer):', request.data)
     return Response({
@@ -33,6 +36,7 @@ def create_crm_customer(request):
     responses={200: openapi.Response('List of customers')}
 )
 @api_view(['GET'])
+@authentication_classes(AUTHENTICATION_CLASSES)
 def list_crm_customers(request):
     customers = [
         {'id': 1, 'name': 'Customer 1', 'email': 'customer1@gmail.com'},
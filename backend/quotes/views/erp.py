@@ -1,11 +1,13 @@
 
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from ..tokens import AUTHENTICATION_CLASSES
+
 @swagger_auto_schema(
     method='post',
     operation_description="Simulate ERP order creation. Accepts order data as JSON.",
@@ -21,6 +23,7 @@ from drf_yasg import openapi
     responses={200: openapi.Response('Order received by ERP mock!')}
 )
 @api_view(['POST'])
+@authentication_classes(AUTHENTICATION_CLASSES)
 def create_erp_order(request):
     print('Payload received for ERP:', request.data)
     return Response({
@@ -34,6 +37,7 @@ def create_erp_order(request):
     responses={200: openapi.Response('List of orders')}
 )
 @api_view(['GET'])
+@authentication_classes(AUTHENTICATION_CLASSES)
 def list_erp_orders(request):
     orders = [
         {'id': 1, 'customer': 'Customer 1', 'total': 1000, 'status': 'Approved'},
@@ -1,8 +1,16 @@
+from functools import partial
+
+from django.conf import settings
 from rest_framework import viewsets, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from .. import instrumentation, list_cache
 from ..models import IntegrationLog
-from ..serializers import IntegrationLogSerializer
+from ..serializers import IntegrationLogPageSerializer, IntegrationLogSerializer
+from ..conditional import collection_validators, conditional_response, object_validators
+from ..exporter import export_bounds, filter_created_at, log_rows, streaming_export
+from ..rows import LOG_FIELDS, log_shaper, log_values
+from ..renderers import EXPORT_RENDERERS
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -11,19 +19,28 @@ class IntegrationLogViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            # Schema generation (takehome.openapi) runs without a user.
+            return IntegrationLog.objects.none()
         user = self.request.user
-        if user.is_staff:
-            return IntegrationLog.objects.all().order_by('-created_at')
-        return IntegrationLog.objects.filter(user=user).order_by('-created_at')
+        queryset = IntegrationLog.objects.select_related('user', 'quote')
+        if not user.is_staff:
+            queryset = queryset.filter(user=user)
+        return queryset.order_by('-created_at', '-id')
 
     @swagger_auto_schema(
         operation_summary="List integration logs",
         operation_description="Returns a list of integration logs. Sales users see their own logs; admins see all logs.",
-        responses={200: IntegrationLogSerializer(many=True)},
+        responses={200: IntegrationLogPageSerializer},
         tags=["Logs"]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return list_cache.cached_list(
+            request, list_cache.LOGS,
+            partial(collection_validators, request, queryset, 'created_at'),
+            partial(self._render_page, queryset)
+        )
 
     @swagger_auto_schema(
         operation_summary="Retrieve a log entry",
@@ -32,13 +49,17 @@ class IntegrationLogViewSet(viewsets.ReadOnlyModelViewSet):
         tags=["Logs"]
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        log = self.get_object()
+        return conditional_response(
+            request, object_validators(request, log, 'created_at'),
+            lambda: Response(self.get_serializer(log).data)
+        )
 
     @swagger_auto_schema(
         method='get',
         operation_summary="Get logs by quote ID",
-        operation_description="Returns all logs associated with a specific quote.",
-        responses={200: IntegrationLogSerializer(many=True)},
+        operation_description="Returns a cursor-paginated page of logs associated with a specific quote.",
+        responses={200: IntegrationLogPageSerializer},
         tags=["Logs"]
     )
     @action(detail=False, methods=['get'])
@@ -48,17 +69,16 @@ class IntegrationLogViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({'error': 'quote_id parameter is required'}, status=400)
         
         queryset = self.get_queryset().filter(quote_id=quote_id)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._paginated_response(queryset)
 
     @swagger_auto_schema(
         method='get',
         operation_summary="Get logs by action type",
-        operation_description="Returns all logs filtered by action type (ERP, CRM, STATUS, etc.).",
+        operation_description="Returns a cursor-paginated page of logs filtered by action type (ERP, CRM, STATUS, etc.).",
         manual_parameters=[
             openapi.Parameter('action', openapi.IN_QUERY, description="Action type", type=openapi.TYPE_STRING, enum=['ERP', 'CRM', 'STATUS'])
         ],
-        responses={200: IntegrationLogSerializer(many=True)},
+        responses={200: IntegrationLogPageSerializer},
         tags=["Logs"]
     )
     @action(detail=False, methods=['get'])
@@ -68,5 +88,50 @@ class IntegrationLogViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({'error': 'action parameter is required'}, status=400)
         
         queryset = self.get_queryset().filter(action=action)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._paginated_response(queryset)
+
+    def _paginated_response(self, queryset):
+        return list_cache.cached_list(
+            self.request, list_cache.LOGS,
+            partial(collection_validators, self.request, queryset, 'created_at'),
+            partial(self._render_page, queryset)
+        )
+
+    def _render_page(self, queryset):
+        # Read-only fast path (quotes.rows): same output as IntegrationLogSerializer.
+        rows = log_values(queryset)
+        page = self.paginate_queryset(rows)
+        with instrumentation.timed(instrumentation.SERIALIZE):
+            data = list(map(log_shaper(), page if page is not None else rows))
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    @swagger_auto_schema(
+        method='get',
+        operation_summary="Export integration logs",
+        operation_description="Streams the logs visible to the user as NDJSON (default) or CSV, newest first. Choose the format with `?format=ndjson|csv` or the Accept header. Rows are read from the database in chunks, so memory use does not depend on the export size.",
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, description="Only logs created at or after this date/datetime", type=openapi.TYPE_STRING),
+            openapi.Parameter('until', openapi.IN_QUERY, description="Only logs created before this datetime, or on or before this date", type=openapi.TYPE_STRING),
+            openapi.Parameter('action', openapi.IN_QUERY, description="Action type", type=openapi.TYPE_STRING),
+        ],
+        responses={200: 'NDJSON or CSV stream', 400: 'Invalid date'},
+        tags=["Logs"]
+    )
+    @action(detail=False, methods=['get'], renderer_classes=EXPORT_RENDERERS, pagination_class=None)
+    def export(self, request):
+        try:
+            since, until = export_bounds(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        queryset = filter_created_at(self.get_queryset(), since, until)
+        action = request.query_params.get('action')
+        if action:
+            queryset = queryset.filter(action=action)
+
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        return streaming_export(
+            log_rows(queryset, chunk_size), LOG_FIELDS, request.accepted_renderer.format, 'integration-logs', chunk_size
+        )
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import BasePermission
+from drf_yasg.utils import swagger_auto_schema
+from .. import metrics
+from ..renderers import PrometheusRenderer
+
+
+class CanReadMetrics(BasePermission):
+    """Staff sessions, or scrapers sending ``Authorization: Bearer <METRICS_TOKEN>``."""
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    permission_classes = [CanReadMetrics]
+    renderer_classes = [PrometheusRenderer]
+
+    @swagger_auto_schema(
+        operation_summary="Request metrics (Prometheus)",
+        operation_description="Per-URL-name histograms of request, SQL, serializer and integration time, SQL queries per request, request counts and list cache counters, in the Prometheus text format. Staff, or `Authorization: Bearer <METRICS_TOKEN>`.",
+        tags=["Metrics"]
+    )
+    def get(self, request):
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,17 +1,37 @@
-import requests
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from ..models import Quote, IntegrationLog
-from ..serializers import QuoteSerializer, QuoteFileUploadSerializer
+from .. import audit, downloads, instrumentation, list_cache, stats, uploads
+from ..models import Quote, IntegrationOutbox, UploadSession
+from ..serializers import QuotePageSerializer, QuoteSerializer, QuoteFileUploadSerializer
+from ..parsers import ChunkStreamParser, CSVStreamParser, NDJSONStreamParser, OctetStreamParser
+from ..outbox import enqueue_erp_order, erp_order_job
+from ..exporter import export_bounds, filter_created_at, quote_rows, streaming_export
+from ..rows import QUOTE_FIELDS, quote_shaper, quote_values
+from ..renderers import EXPORT_RENDERERS, DocumentRenderer
+from ..conditional import collection_validators, conditional_response, object_validators, precondition_failed
+from ..search import filter_quotes
+from ..importer import detect_format, import_quotes
+from ..status import ALLOWED_STATUSES, ERP_TRIGGER_STATUSES, normalize_status, transition_error
 
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from drf_yasg.utils import swagger_auto_schema
+from rest_framework.renderers import JSONRenderer
+from drf_yasg.utils import no_body, swagger_auto_schema
 from drf_yasg import openapi
 
 
 from rest_framework import mixins
 
+BULK_STATUS_MAX_IDS = 1000
+
 class QuoteViewSet(
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -23,30 +43,55 @@ class QuoteViewSet(
     parser_classes = [MultiPartParser, FormParser]
 
     def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            # Schema generation (takehome.openapi) runs without a user.
+            return Quote.objects.none()
         user = self.request.user
         if user.is_staff:
-            return Quote.objects.all().order_by('-created_at')
-        return Quote.objects.filter(submitted_by=user).order_by('-created_at')
+            return Quote.objects.all().order_by('-created_at', '-id')
+        return Quote.objects.filter(submitted_by=user).order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
-        quote = serializer.save(submitted_by=self.request.user)
-        IntegrationLog.objects.create(
-            user=self.request.user,
-            quote=quote,
-            action='CREATE',
-            status=quote.status,
-            payload=serializer.data,
-            response={'message': 'Quote submitted successfully'}
-        )
+        with transaction.atomic():
+            quote = serializer.save(submitted_by=self.request.user)
+            audit.log(
+                user=self.request.user,
+                quote=quote,
+                action='CREATE',
+                status=quote.status,
+                payload=serializer.data,
+                response={'message': 'Quote submitted successfully'}
+            )
 
     @swagger_auto_schema(
         operation_summary="List quotes",
-        operation_description="Returns a list of quotes. Sales users see their own quotes; admins see all quotes.",
-        responses={200: QuoteSerializer(many=True)},
+        operation_description="Returns a cursor-paginated list of quotes. Sales users see their own quotes; admins see all quotes. With `search`, results are ranked by relevance (best match first); otherwise newest first.",
+        manual_parameters=[
+            openapi.Parameter('search', openapi.IN_QUERY, description="Words matched (as prefixes) against customer name, company, email and opportunity ID", type=openapi.TYPE_STRING),
+            openapi.Parameter('status', openapi.IN_QUERY, description="Quote status", type=openapi.TYPE_STRING),
+            openapi.Parameter('since', openapi.IN_QUERY, description="Only quotes created at or after this date/datetime", type=openapi.TYPE_STRING),
+            openapi.Parameter('until', openapi.IN_QUERY, description="Only quotes created before this datetime, or on or before this date", type=openapi.TYPE_STRING),
+        ],
+        responses={200: QuotePageSerializer, 400: 'Invalid filter value'},
         tags=["Quotes"]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        try:
+            queryset = filter_quotes(self.get_queryset(), request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return list_cache.cached_list(
+            request, list_cache.QUOTES,
+            partial(collection_validators, request, queryset, 'updated_at'),
+            partial(self._render_page, queryset)
+        )
+
+    def _render_page(self, queryset):
+        # Read-only fast path (quotes.rows): same output as QuoteSerializer.
+        page = self.paginate_queryset(quote_values(queryset))
+        with instrumentation.timed(instrumentation.SERIALIZE):
+            data = list(map(quote_shaper(self.request), page))
+        return self.get_paginated_response(data)
 
     @swagger_auto_schema(
         operation_summary="Retrieve a quote",
@@ -55,7 +100,11 @@ class QuoteViewSet(
         tags=["Quotes"]
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        quote = self.get_object()
+        return conditional_response(
+            request, object_validators(request, quote, 'updated_at'),
+            lambda: Response(self.get_serializer(quote).data)
+        )
 
     @swagger_auto_schema(
         operation_summary="Submit a new quote",
@@ -86,22 +135,214 @@ class QuoteViewSet(
 
         serializer = QuoteFileUploadSerializer(quote, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-            IntegrationLog.objects.create(
-                user=request.user,
-                quote=quote,
-                action='UPLOAD',
-                status=quote.status,
-                payload={'filename': request.data.get('supporting_document').name},
-                response={'message': 'Supporting document uploaded'}
-            )
+            with transaction.atomic():
+                serializer.save()
+                audit.log(
+                    user=request.user,
+                    quote=quote,
+                    action='UPLOAD',
+                    status=quote.status,
+                    payload={'filename': request.data.get('supporting_document').name},
+                    response={'message': 'Supporting document uploaded'}
+                )
             return Response(QuoteSerializer(quote).data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _upload_quote(self, request):
+        quote = self.get_object()
+        if not (request.user.is_staff or quote.submitted_by == request.user):
+            return None
+        return quote
+
+    def _upload_session(self, request, quote, upload_id):
+        return get_object_or_404(UploadSession, pk=upload_id, quote=quote, user=request.user)
+
+    def _upload_state(self, session):
+        return {
+            'id': session.pk,
+            'filename': session.filename,
+            'size': session.size,
+            'offset': session.received,
+            'complete': session.completed_at is not None,
+        }
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Start a resumable document upload",
+        operation_description="Opens an upload session for a supporting document of `size` bytes (max 5MB). Send the bytes with PUT to the returned session in chunks (`chunk_size` is the suggested size), each at the current `offset`, then call finalize.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['filename', 'size'],
+            properties={
+                'filename': openapi.Schema(type=openapi.TYPE_STRING),
+                'size': openapi.Schema(type=openapi.TYPE_INTEGER, description="Total size in bytes"),
+            },
+        ),
+        responses={201: openapi.Response('Upload session'), 400: 'Bad Request', 403: 'Permission denied', 413: 'File too large'},
+        tags=["Quotes"]
+    )
+    @action(detail=True, methods=['post'], url_path='uploads', parser_classes=[JSONParser])
+    def start_upload(self, request, pk=None):
+        quote = self._upload_quote(request)
+        if quote is None:
+            return Response({'error': 'You do not have permission to upload a file to this quote.'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            session = uploads.start(quote, request.user, request.data.get('filename'), request.data.get('size'))
+        except uploads.UploadError as e:
+            return Response(e.as_data(), status=e.status_code)
+        data = self._upload_state(session)
+        data['chunk_size'] = settings.UPLOAD_CHUNK_SIZE
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        methods=['get', 'put', 'delete'],
+        operation_summary="Resumable upload session",
+        operation_description="GET reports the current offset to resume from. PUT appends a chunk: the raw bytes as `application/offset+octet-stream` (or `application/octet-stream`) with the `Upload-Offset` header set to the current offset. A chunk is stored entirely or not at all; a wrong offset returns 409 with the expected one. DELETE abandons the upload.",
+        manual_parameters=[
+            openapi.Parameter('Upload-Offset', openapi.IN_HEADER, description="Byte offset of this chunk (PUT)", type=openapi.TYPE_INTEGER)
+        ],
+        responses={200: openapi.Response('Upload session'), 404: 'Not found', 409: 'Offset mismatch', 413: 'Past the declared size', 415: 'File type not allowed'},
+        tags=["Quotes"]
+    )
+    @action(
+        detail=True, methods=['get', 'put', 'delete'], url_path=r'uploads/(?P<upload_id>[0-9a-f-]{36})',
+        parser_classes=[ChunkStreamParser, OctetStreamParser]
+    )
+    def upload_chunk(self, request, pk=None, upload_id=None):
+        quote = self._upload_quote(request)
+        if quote is None:
+            return Response({'error': 'You do not have permission to upload a file to this quote.'}, status=status.HTTP_403_FORBIDDEN)
+        session = self._upload_session(request, quote, upload_id)
+        if request.method == 'GET':
+            return Response(self._upload_state(session))
+        if request.method == 'DELETE':
+            uploads.abort(session)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response({'error': 'Upload-Offset header is required.', 'offset': session.received}, status=status.HTTP_400_BAD_REQUEST)
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0) or None
+        # The stream parsers return the unread body; an empty body parses to an empty dict.
+        body = request.data if hasattr(request.data, 'read') else None
+        try:
+            session = uploads.write_chunk(session.pk, offset, body, content_length)
+        except uploads.UploadError as e:
+            return Response(e.as_data(), status=e.status_code)
+        return Response(self._upload_state(session))
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Finalize a resumable upload",
+        operation_description="Checks that every byte arrived and that the content is a PDF, PNG or JPEG (by its magic bytes), optionally verifies the client's SHA-256, and attaches the file to the quote.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={'sha256': openapi.Schema(type=openapi.TYPE_STRING, description="Optional hex digest to verify")},
+        ),
+        responses={200: openapi.Response('Document attached', QuoteSerializer), 400: 'Checksum mismatch', 409: 'Upload incomplete', 415: 'File type not allowed'},
+        tags=["Quotes"]
+    )
+    @action(
+        detail=True, methods=['post'], url_path=r'uploads/(?P<upload_id>[0-9a-f-]{36})/finalize', parser_classes=[JSONParser]
+    )
+    def finalize_upload(self, request, pk=None, upload_id=None):
+        quote = self._upload_quote(request)
+        if quote is None:
+            return Response({'error': 'You do not have permission to upload a file to this quote.'}, status=status.HTTP_403_FORBIDDEN)
+        session = self._upload_session(request, quote, upload_id)
+        try:
+            quote = uploads.finalize(session.pk, request.user, request.data.get('sha256'))
+        except uploads.UploadError as e:
+            return Response(e.as_data(), status=e.status_code)
+        return Response(QuoteSerializer(quote, context=self.get_serializer_context()).data, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        method='get',
+        operation_summary="Download the supporting document",
+        operation_description="Sends the quote's supporting document to its owner or an admin. Supports conditional requests (`If-None-Match`, `If-Modified-Since`) and a single byte `Range` (206 Partial Content, honouring `If-Range`); an unsatisfiable range returns 416.",
+        manual_parameters=[
+            openapi.Parameter('Range', openapi.IN_HEADER, description="e.g. `bytes=0-1023`", type=openapi.TYPE_STRING)
+        ],
+        responses={200: 'The document', 206: 'Partial content', 304: 'Not modified', 404: 'No document', 416: 'Range not satisfiable'},
+        tags=["Quotes"]
+    )
+    @action(detail=True, methods=['get'], renderer_classes=[JSONRenderer, DocumentRenderer])
+    def document(self, request, pk=None):
+        return downloads.serve_document(request, self.get_object())
+
+    @swagger_auto_schema(
+        method='get',
+        operation_summary="Export quotes",
+        operation_description="Streams the quotes visible to the user as NDJSON (default) or CSV, newest first. Choose the format with `?format=ndjson|csv` or the Accept header. Rows are read from the database in chunks, so memory use does not depend on the export size.",
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, description="Only quotes created at or after this date/datetime", type=openapi.TYPE_STRING),
+            openapi.Parameter('until', openapi.IN_QUERY, description="Only quotes created before this datetime, or on or before this date", type=openapi.TYPE_STRING),
+            openapi.Parameter('status', openapi.IN_QUERY, description="Quote status", type=openapi.TYPE_STRING),
+        ],
+        responses={200: 'NDJSON or CSV stream', 400: 'Invalid date'},
+        tags=["Quotes"]
+    )
+    @action(detail=False, methods=['get'], renderer_classes=EXPORT_RENDERERS, pagination_class=None)
+    def export(self, request):
+        try:
+            since, until = export_bounds(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = filter_created_at(self.get_queryset(), since, until)
+        if request.query_params.get('status'):
+            quote_status = normalize_status(request.query_params['status'])
+            if quote_status is None:
+                return Response({'error': f'Invalid status. Must be one of {ALLOWED_STATUSES}'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(status=quote_status)
+
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        return streaming_export(
+            quote_rows(queryset, chunk_size, request), QUOTE_FIELDS, request.accepted_renderer.format, 'quotes', chunk_size
+        )
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Import quotes from CSV or NDJSON",
+        operation_description="Streams a `text/csv` (with a header row) or `application/x-ndjson` request body row by row. Each row is validated like a quote submission and valid rows are inserted in chunks of `chunk_size`. Quotes are owned by the requesting user. Returns the number imported and the rejected rows by line number. A line that is not UTF-8 stops the import with 400; the rows before it are kept.",
+        manual_parameters=[
+            openapi.Parameter('chunk_size', openapi.IN_QUERY, description=f"Rows per bulk insert, at most {settings.QUOTE_IMPORT_MAX_CHUNK_SIZE}", type=openapi.TYPE_INTEGER)
+        ],
+        responses={
+            200: openapi.Response('Import report'),
+            400: 'Invalid chunk_size, or a line that is not UTF-8',
+            415: 'Unsupported content type'
+        },
+        request_body=no_body,
+        tags=["Quotes"]
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[CSVStreamParser, NDJSONStreamParser])
+    def import_quotes(self, request):
+        try:
+            chunk_size = int(request.query_params.get('chunk_size', settings.QUOTE_IMPORT_CHUNK_SIZE))
+        except ValueError:
+            chunk_size = 0
+        if chunk_size < 1:
+            return Response({'error': 'chunk_size must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        # Each chunk is held in memory until it is inserted.
+        chunk_size = min(chunk_size, settings.QUOTE_IMPORT_MAX_CHUNK_SIZE)
+
+        # The stream parsers return the unread body; an empty body parses to an empty dict.
+        body = request.data if hasattr(request.data, 'readline') else []
+        report = import_quotes(body, detect_format(request.content_type), request.user, chunk_size)
+        return Response(report, status=status.HTTP_400_BAD_REQUEST if 'error' in report else status.HTTP_200_OK)
+
     @swagger_auto_schema(
         method='post',
         operation_summary="Set quote status (Admin only)",
-        operation_description="Changes the status of a quote. This action is restricted to admin users. Valid statuses are 'Approved' and 'Rejected'. For conversions, other conditions apply.",
+        operation_description="Changes the status of a quote. This action is restricted to admin users. Valid statuses are 'Approved' and 'Rejected'. For conversions, other conditions apply. Send the quote's ETag in `If-Match` to change it only if nobody else has since; a change that loses a race with another one returns 409 and is not applied.",
+        manual_parameters=[
+            openapi.Parameter(
+                'If-Match', openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+                description='ETag from GET /api/quotes/{id}/ or a previous status change',
+            ),
+        ],
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             required=['status'],
@@ -116,68 +357,135 @@ class QuoteViewSet(
         responses={
             200: openapi.Response('Status updated successfully', QuoteSerializer),
             400: 'Invalid status or missing requirements for conversion',
-            403: 'Permission denied'
+            403: 'Permission denied',
+            409: 'The quote was changed by another request while this one ran',
+            412: 'If-Match does not match the current version of the quote'
         },
         tags=["Quotes"]
     )
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser], parser_classes=[JSONParser])
     def set_status(self, request, pk=None):
         quote = self.get_object()
-        new_status = request.data.get('status')
-        allowed_statuses = [choice[0] for choice in quote._meta.get_field('status').choices]
+        new_status = normalize_status(request.data.get('status'))
+
+        if new_status is None:
+            return Response({'error': f'Invalid status. Must be one of {ALLOWED_STATUSES}'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if new_status not in allowed_statuses:
-            return Response({'error': f'Invalid status. Must be one of {allowed_statuses}'}, status=status.HTTP_400_BAD_REQUEST)
+        # Validators of the quote as GET /api/quotes/{id}/ serves it, which is where clients get the ETag.
+        location = reverse('quote-detail', args=[quote.pk])
+        validators = object_validators(request, quote, 'updated_at', location)
+        if precondition_failed(request, validators):
+            return Response(
+                {'error': 'The quote has changed since it was read. Fetch it again and retry.'},
+                status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': validators[0]}
+            )
 
         old_status = quote.status
 
-        if new_status == 'Converted to Order':
-            if quote.status != 'Approved':
-                return Response({'error': 'Quote must be approved before it can be converted.'}, status=status.HTTP_400_BAD_REQUEST)
-            if not quote.supporting_document:
-                return Response({'error': 'A supporting document is required for conversion.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        quote.status = new_status
-        quote.save()
-
-        log_entry = IntegrationLog.objects.create(
-            user=request.user,
-            quote=quote,
-            action='STATUS',
-            status=new_status,
-            payload={'old_status': old_status, 'new_status': new_status},
-            response={'message': 'Status changed successfully'}
-        )
+        error = transition_error(quote, new_status)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
-        if new_status in ['Approved', 'Converted to Order']:
-            self._perform_mock_erp_integration(request.user, quote, log_entry)
+        now = timezone.now()
+        with transaction.atomic():
+            # Applied only if the quote is still the one validated above; no row lock is held while validating.
+            changed = Quote.objects.filter(pk=quote.pk, status=old_status, version=quote.version).update(
+                status=new_status, version=F('version') + 1, updated_at=now
+            )
+            if not changed:
+                return Response(
+                    {'error': 'The quote was changed by another request. Fetch it again and retry.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            quote.status, quote.version, quote.updated_at = new_status, quote.version + 1, now
+            stats.record_status_changes([(quote, old_status, new_status)])
+            list_cache.invalidate_quotes([quote.submitted_by_id])
 
-        return Response(QuoteSerializer(quote).data, status=status.HTTP_200_OK)
+            audit.log(
+                user=request.user,
+                quote=quote,
+                action='STATUS',
+                status=new_status,
+                payload={'old_status': old_status, 'new_status': new_status},
+                response={'message': 'Status changed successfully'}
+            )
 
-    def _perform_mock_erp_integration(self, user, quote, log_entry):
-        erp_url = 'http://localhost:8000/api/erp/orders/' 
-        payload = {
-            'quote_id': quote.id,
-            'opportunity_id': quote.opportunity_id,
-            'customer_name': quote.customer_name,
-            'status': quote.status,
-            'updated_at': quote.updated_at.isoformat(),
-        }
+            if new_status in ERP_TRIGGER_STATUSES:
+                enqueue_erp_order(request.user, quote)
 
-        try:
-            erp_response = requests.post(erp_url, json=payload, timeout=5)
-            erp_response.raise_for_status() 
-            erp_result = erp_response.json()
-            log_action = 'ERP_SUCCESS'
-        except requests.exceptions.RequestException as e:
-            erp_result = {'error': str(e)}
-            log_action = 'ERP_FAILURE'
-
-        IntegrationLog.objects.create(
-            user=user,
-            quote=quote,
-            action=log_action,
-            status=quote.status,
-            payload=payload,
-            response=erp_result,
-        )
+        etag = object_validators(request, quote, 'updated_at', location)[0]
+        return Response(QuoteSerializer(quote).data, status=status.HTTP_200_OK, headers={'ETag': etag})
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Set the status of many quotes (Admin only)",
+        operation_description=f"Applies the same rules as set_status to every quote in `ids` inside one transaction. Returns one result per ID; IDs that fail validation are reported with an error and left unchanged. At most {BULK_STATUS_MAX_IDS} IDs per request.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['ids', 'status'],
+            properties={
+                'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                'status': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    enum=['Pending Review', 'Approved', 'Rejected', 'Converted to Order']
+                ),
+            },
+        ),
+        responses={
+            200: openapi.Response('Per-ID results'),
+            400: 'Invalid status or ID list',
+            403: 'Permission denied'
+        },
+        tags=["Quotes"]
+    )
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser], parser_classes=[JSONParser])
+    def bulk_set_status(self, request):
+        new_status = normalize_status(request.data.get('status'))
+        if new_status is None:
+            return Response({'error': f'Invalid status. Must be one of {ALLOWED_STATUSES}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids or not all(type(i) is int for i in ids):
+            return Response({'error': 'ids must be a non-empty list of quote IDs.'}, status=status.HTTP_400_BAD_REQUEST)
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > BULK_STATUS_MAX_IDS:
+            return Response({'error': f'At most {BULK_STATUS_MAX_IDS} IDs per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        with transaction.atomic():
+            quotes = Quote.objects.select_for_update().in_bulk(ids)
+            now = timezone.now()
+            changed = []
+            for quote_id in ids:
+                quote = quotes.get(quote_id)
+                if quote is None:
+                    results.append({'id': quote_id, 'status': None, 'error': 'Quote not found.'})
+                    continue
+                error = transition_error(quote, new_status)
+                if error:
+                    results.append({'id': quote_id, 'status': quote.status, 'error': error})
+                    continue
+                changed.append((quote, quote.status))
+                quote.status = new_status
+                quote.updated_at = now
+                results.append({'id': quote_id, 'status': new_status, 'error': None})
+
+            if changed:
+                Quote.objects.filter(id__in=[quote.id for quote, _ in changed]).update(
+                    status=new_status, version=F('version') + 1, updated_at=now
+                )
+                stats.record_status_changes((quote, old_status, new_status) for quote, old_status in changed)
+                list_cache.invalidate_quotes({quote.submitted_by_id for quote, _ in changed})
+                for quote, old_status in changed:
+                    audit.log(
+                        user=request.user,
+                        quote=quote,
+                        action='STATUS',
+                        status=new_status,
+                        payload={'old_status': old_status, 'new_status': new_status},
+                        response={'message': 'Status changed successfully'}
+                    )
+                if new_status in ERP_TRIGGER_STATUSES:
+                    IntegrationOutbox.objects.bulk_create(erp_order_job(request.user, quote) for quote, _ in changed)
+
+        return Response({'status': new_status, 'updated': len(changed), 'results': results}, status=status.HTTP_200_OK)
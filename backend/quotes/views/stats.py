@@ -0,0 +1,17 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from drf_yasg.utils import swagger_auto_schema
+from .. import stats
+
+
+class PipelineStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Quote pipeline statistics (Admin only)",
+        operation_description="Counts by status, conversion rate, ERP success versus failure and volume per sales rep. Read from incrementally maintained summary tables; `python manage.py rebuild_stats` recomputes them.",
+        tags=["Stats"]
+    )
+    def get(self, request):
+        return Response(stats.summary())
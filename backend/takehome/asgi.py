@@ -10,7 +10,11 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'takehome.settings')
 
 application = get_asgi_application()
+
+# Import the URLconf, and with it every view, while the worker starts instead of on its first request.
+get_resolver().url_patterns
@@ -0,0 +1,13 @@
+"""
+URL configuration used when ASYNC_READ_VIEWS is on (only useful under
+takehome.asgi): the async read views first, then everything in
+takehome.urls.
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('', include('quotes.async_urls')),
+    *sync_urlpatterns,
+]
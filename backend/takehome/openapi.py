@@ -0,0 +1,90 @@
+"""
+The OpenAPI (Swagger 2.0) schema, built ahead of time.
+
+``python manage.py build_openapi`` generates the schema from the views in
+``takehome.urls`` and writes it to ``settings.OPENAPI_SCHEMA_FILE``, the
+checked-in ``openapi.json``. ``--check`` fails when that file no longer
+matches the code. ``/swagger.json`` serves the file with an ETag and
+Last-Modified instead of walking every view per request. The Swagger UI
+loads it from there (``SWAGGER_SETTINGS['SPEC_URL']``).
+
+drf-yasg's generator and views are only imported when the schema is
+built or the UI is opened, so API workers start without them.
+"""
+import functools
+import hashlib
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+TITLE = 'Quote Portal API'
+VERSION = 'v1'
+DESCRIPTION = 'API documentation for Quote Portal'
+
+# (path, mtime_ns) -> (body, etag, last-modified timestamp); the file is re-read when it changes
+_loaded = {}
+
+
+def info():
+    from drf_yasg import openapi
+    return openapi.Info(title=TITLE, default_version=VERSION, description=DESCRIPTION)
+
+
+def generate():
+    """Build the schema from the views and return it as the JSON bytes ``build_openapi`` writes."""
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    # Without a request there is no host in the schema, so the UI calls the server it was loaded from.
+    schema = OpenAPISchemaGenerator(info(), urlconf='takehome.urls').get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[], pretty=True).encode(schema) + b'\n'
+
+
+@functools.cache
+def _generated():
+    body = generate()
+    return body, quote_etag(hashlib.sha256(body).hexdigest()), None
+
+
+def _load():
+    path = settings.OPENAPI_SCHEMA_FILE
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        # Not built (a development checkout): generate once per process.
+        return _generated()
+    key = (str(path), stat.st_mtime_ns)
+    if key not in _loaded:
+        with open(path, 'rb') as f:
+            body = f.read()
+        _loaded.clear()
+        _loaded[key] = (body, quote_etag(hashlib.sha256(body).hexdigest()), int(stat.st_mtime))
+    return _loaded[key]
+
+
+def schema_json(request):
+    body, etag, last_modified = _load()
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@functools.cache
+def _swagger_ui_view():
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    schema_view = get_schema_view(info(), public=True, permission_classes=(permissions.AllowAny,))
+    return schema_view.with_ui('swagger', cache_timeout=0)
+
+
+def swagger_ui(request, *args, **kwargs):
+    return _swagger_ui_view()(request, *args, **kwargs)
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'quotes.middleware.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,9 +56,13 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'quotes.middleware.AuditLogMiddleware',
 ]
 
-ROOT_URLCONF = 'takehome.urls'
+# Serve the read-heavy endpoints with async views (quotes.async_urls) under takehome.asgi. Off by default:
+# on the measured CPU-bound load, sync gunicorn workers outperform it (see README, Application Server).
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False') == 'True'
+ROOT_URLCONF = 'takehome.asgi_urls' if ASYNC_READ_VIEWS else 'takehome.urls'
 
 TEMPLATES = [
     {
@@ -129,6 +134,24 @@ USE_TZ = True
 STATIC_URL = 'static/'
 
 # Media files (uploads)
+# Quote documents are stored once per content (quotes.storage); gc_documents removes unreferenced ones.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    'documents': {
+        'BACKEND': 'quotes.storage.ContentAddressedStorage',
+    },
+}
+DOCUMENT_GC_GRACE_HOURS = int(os.getenv('DOCUMENT_GC_GRACE_HOURS', '24'))
+# Documents are only served through GET /api/quotes/{id}/document/. Set to 'x-accel-redirect' (nginx, with an
+# internal location at DOCUMENT_ACCEL_PREFIX aliased to MEDIA_ROOT) or 'x-sendfile' to let the proxy send the bytes.
+DOCUMENT_SENDFILE = os.getenv('DOCUMENT_SENDFILE', '')
+DOCUMENT_ACCEL_PREFIX = os.getenv('DOCUMENT_ACCEL_PREFIX', '/protected-media/')
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -136,6 +159,167 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Django REST Framework
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'quotes.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 50,
+    'DEFAULT_RENDERER_CLASSES': [
+        'quotes.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Client IPs for throttling: 0 uses REMOTE_ADDR and ignores X-Forwarded-For; behind n proxies set n
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+}
+
+# OpenAPI schema, prebuilt by python manage.py build_openapi and served at /swagger.json (takehome.openapi)
+OPENAPI_SCHEMA_FILE = Path(os.getenv('OPENAPI_SCHEMA_FILE', BASE_DIR.parent / 'openapi.json'))
+SWAGGER_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+
+# Caches. The "lists" cache holds quote/log list responses (quotes.list_cache), the "auth" cache
+# sessions and users (quotes.sessions), the "throttle" cache login/register token buckets
+# (quotes.throttling). All three must be shared by every worker: a list invalidation, a logout or a
+# revoked staff flag otherwise only applies in the worker that made it, and every worker keeps its
+# own throttle buckets. They default to FileBasedCache directories, which cover one host. Use a
+# Redis cache (django.core.cache.backends.redis.RedisCache) for several hosts.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'lists': {
+        'BACKEND': os.getenv('LIST_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('LIST_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'lists')),
+        'TIMEOUT': int(os.getenv('LIST_CACHE_TIMEOUT', '300')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('LIST_CACHE_MAX_ENTRIES', '2000')),
+        },
+    },
+    'auth': {
+        'BACKEND': os.getenv('AUTH_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('AUTH_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'auth')),
+        'TIMEOUT': int(os.getenv('AUTH_CACHE_TIMEOUT', '60')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('AUTH_CACHE_MAX_ENTRIES', '10000')),
+        },
+    },
+    'throttle': {
+        'BACKEND': os.getenv('THROTTLE_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'throttle')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('THROTTLE_CACHE_MAX_ENTRIES', '10000')),
+        },
+    },
+}
+LIST_CACHE_ALIAS = 'lists'
+
+# Sessions and users are read from the "auth" cache and written through to the database (quotes.sessions)
+AUTH_CACHE_ALIAS = 'auth'
+SESSION_ENGINE = 'quotes.sessions'
+# ModelBackend stays listed so sessions signed in before CachedModelBackend remain valid
+AUTHENTICATION_BACKENDS = ['quotes.sessions.CachedModelBackend', 'django.contrib.auth.backends.ModelBackend']
+# python manage.py clearsessions deletes expired sessions this many at a time
+SESSION_CLEANUP_BATCH_SIZE = int(os.getenv('SESSION_CLEANUP_BATCH_SIZE', '1000'))
+# Signed tokens for machine clients of the ERP/CRM endpoints (python manage.py issue_token)
+SIGNED_TOKEN_MAX_AGE_SECONDS = int(os.getenv('SIGNED_TOKEN_MAX_AGE_SECONDS', str(30 * 24 * 3600)))
+
+# Login/register protection (quotes.throttling). A rate of 'count/period' allows bursts of count and
+# refills count tokens per period; an empty rate turns that bucket off.
+THROTTLE_CACHE_ALIAS = 'throttle'
+AUTH_THROTTLE_RATES = {
+    'login-ip': os.getenv('LOGIN_IP_THROTTLE_RATE', '30/min'),
+    'login-username': os.getenv('LOGIN_USERNAME_THROTTLE_RATE', '10/min'),
+    'register-ip': os.getenv('REGISTER_IP_THROTTLE_RATE', '10/hour'),
+}
+# Password hashes computed at once on this host (0 = no limit), and how long a request waits for a slot
+# (about one hash, so overlapping sign-ins queue instead of failing)
+PASSWORD_HASHING_MAX_CONCURRENCY = int(os.getenv('PASSWORD_HASHING_MAX_CONCURRENCY', str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASHING_WAIT_SECONDS = float(os.getenv('PASSWORD_HASHING_WAIT_SECONDS', '0.5'))
+PASSWORD_HASHING_LOCK_DIR = Path(os.getenv('PASSWORD_HASHING_LOCK_DIR', BASE_DIR / 'locks'))
+
+# Resumable document uploads (POST /api/quotes/{id}/uploads/); part files live outside MEDIA_ROOT
+UPLOAD_TEMP_DIR = Path(os.getenv('UPLOAD_TEMP_DIR', BASE_DIR / 'uploads'))
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv('UPLOAD_SESSION_TTL_HOURS', '24'))
+
+# Bulk quote import (POST /api/quotes/import/, python manage.py import_quotes)
+QUOTE_IMPORT_CHUNK_SIZE = int(os.getenv('QUOTE_IMPORT_CHUNK_SIZE', '500'))
+# Upper bound for ?chunk_size= on the import endpoint
+QUOTE_IMPORT_MAX_CHUNK_SIZE = int(os.getenv('QUOTE_IMPORT_MAX_CHUNK_SIZE', '5000'))
+
+# Streaming exports (GET /api/quotes/export/, /api/logs/export/)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Pipeline statistics (GET /api/stats/): rows each counter is split over, so concurrent writers rarely share one
+PIPELINE_COUNTER_SHARDS = int(os.getenv('PIPELINE_COUNTER_SHARDS', '8'))
+
+# Integration log writer (quotes.audit): 'transactional', 'immediate' or 'background' per action
+AUDIT_LOG_DEFAULT_GUARANTEE = 'transactional'
+AUDIT_LOG_GUARANTEES = {
+    'CREATE': 'transactional',
+    'UPLOAD': 'transactional',
+    'STATUS': 'transactional',
+    'ERP_SUCCESS': 'transactional',
+    'ERP_FAILURE': 'transactional',
+}
+AUDIT_LOG_BACKGROUND_BATCH_SIZE = 500
+AUDIT_LOG_BACKGROUND_INTERVAL_SECONDS = 1.0
+
+# Integration log retention (python manage.py archive_logs / partition_logs)
+LOG_RETENTION_DAYS = int(os.getenv('LOG_RETENTION_DAYS', '180'))
+LOG_ARCHIVE_DIR = Path(os.getenv('LOG_ARCHIVE_DIR', BASE_DIR / 'archive' / 'logs'))
+LOG_ARCHIVE_BATCH_SIZE = int(os.getenv('LOG_ARCHIVE_BATCH_SIZE', '5000'))
+LOG_PARTITION_MONTHS_AHEAD = int(os.getenv('LOG_PARTITION_MONTHS_AHEAD', '3'))
+
+# Integrations
+ERP_ORDERS_URL = os.getenv('ERP_ORDERS_URL', 'http://localhost:8000/api/erp/orders/')
+
+# Outbound integration clients (quotes.integrations.get_client)
+INTEGRATION_CLIENTS = {
+    name: {
+        'CONNECT_TIMEOUT_SECONDS': float(os.getenv(f'{name}_CONNECT_TIMEOUT_SECONDS', '2')),
+        'READ_TIMEOUT_SECONDS': float(os.getenv(f'{name}_READ_TIMEOUT_SECONDS', '5')),
+        'POOL_SIZE': int(os.getenv(f'{name}_POOL_SIZE', '10')),
+        'MAX_IN_FLIGHT': int(os.getenv(f'{name}_MAX_IN_FLIGHT', '10')),
+        'FAILURE_THRESHOLD': int(os.getenv(f'{name}_FAILURE_THRESHOLD', '5')),
+        'RESET_TIMEOUT_SECONDS': float(os.getenv(f'{name}_RESET_TIMEOUT_SECONDS', '30')),
+        # A token from python manage.py issue_token, sent as Authorization: Token (quotes.tokens)
+        'API_TOKEN': os.getenv(f'{name}_API_TOKEN', ''),
+    }
+    for name in ('ERP', 'CRM')
+}
+
+# Integration outbox worker (python manage.py process_outbox)
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '100'))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv('OUTBOX_POLL_INTERVAL_SECONDS', '1'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '8'))
+OUTBOX_BACKOFF_BASE_SECONDS = float(os.getenv('OUTBOX_BACKOFF_BASE_SECONDS', '2'))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv('OUTBOX_BACKOFF_MAX_SECONDS', '600'))
+OUTBOX_VISIBILITY_TIMEOUT_SECONDS = float(os.getenv('OUTBOX_VISIBILITY_TIMEOUT_SECONDS', '300'))
+
+# Request profiling (quotes.middleware.ProfilingMiddleware) and metrics (GET /api/metrics/)
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'True') == 'True'
+# Server-Timing and X-Query-Count response headers (python manage.py loadtest reads them)
+PROFILING_HEADERS = os.getenv('PROFILING_HEADERS', 'False') == 'True'
+PROFILING_LOG_SAMPLE_RATE = float(os.getenv('PROFILING_LOG_SAMPLE_RATE', '0'))
+PROFILING_SLOW_REQUEST_MS = float(os.getenv('PROFILING_SLOW_REQUEST_MS', '0'))
+# Shared by all worker processes of one server; empty keeps metrics per process
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+# Bearer token for scrapers; staff sessions can read the metrics too
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'quotes.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # CORS settings
 #CORS_ALLOW_ALL_ORIGINS = True  # Para desenvolvimento apenas
 CORS_ALLOW_CREDENTIALS = True
@@ -7,7 +7,11 @@ import {
   CrmApi,
   ErpApi,
 } from "../../api-client";
-import { QuotesSetStatusRequestStatusEnum } from "../../api-client/models";
+import {
+  QuotesSetStatusRequestStatusEnum,
+  QuoteFromJSON,
+  IntegrationLogFromJSON,
+} from "../../api-client/models";
 import apiClient from "../api-client";
 
 const configuration = new Configuration({
@@ -117,7 +121,8 @@ const mapBackendStatusToFrontend = (
 export const quotesApiCompat = {
   list: async (): Promise<Quote[]> => {
     try {
-      const result = await quotesApi.quotesList();
+      const response = await apiClient.get("/api/quotes/");
+      const result = (response.data.results as unknown[]).map(QuoteFromJSON);
       return result.map((quote) => ({
         id: quote.id || 0,
         opportunity_id: quote.opportunityId,
@@ -291,7 +296,8 @@ export const authApiCompat = {
 export const logsApiCompat = {
   list: async (): Promise<IntegrationLog[]> => {
     try {
-      const result = await logsApi.logsList();
+      const response = await apiClient.get("/api/logs/");
+      const result = (response.data.results as unknown[]).map(IntegrationLogFromJSON);
       return result.map((log) => ({
         id: log.id || 0,
         user: log.user || "",
@@ -22,14 +22,14 @@ export interface IntegrationLog {
 export const logsApi = {
   list: async (): Promise<IntegrationLog[]> => {
     const response = await apiClient.get("/api/logs/");
-    return response.data;
+    return response.data.results;
   },
 
   getByQuote: async (quoteId: number): Promise<IntegrationLog[]> => {
     const response = await apiClient.get(
       `/api/logs/by_quote/?quote_id=${quoteId}`
     );
-    return response.data;
+    return response.data.results;
   },
 
   getByAction: async (
@@ -38,6 +38,6 @@ export const logsApi = {
     const response = await apiClient.get(
       `/api/logs/by_action/?action=${action}`
     );
-    return response.data;
+    return response.data.results;
   },
 };
@@ -21,14 +21,21 @@ export interface QuoteCreateRequest {
   supporting_document?: File;
 }
 
+export interface QuoteFilters {
+  search?: string;
+  status?: Quote["status"];
+  since?: string;
+  until?: string;
+}
+
 export interface SetStatusRequest {
   status: Quote["status"];
 }
 
 export const quotesApi = {
-  list: async (): Promise<Quote[]> => {
-    const response = await apiClient.get("/api/quotes/");
-    return response.data;
+  list: async (filters: QuoteFilters = {}): Promise<Quote[]> => {
+    const response = await apiClient.get("/api/quotes/", { params: filters });
+    return response.data.results;
   },
 
   create: async (data: QuoteCreateRequest): Promise<Quote> => {